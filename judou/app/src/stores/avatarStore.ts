@@ -27,6 +27,14 @@ export interface Avatar {
   order_index: number
 }
 
+// 頭像圖集坐標表（images/sprite_atlas.py 生成的 avatars-atlas.json）
+export interface AvatarAtlas {
+  cols: number
+  rows: number
+  images: { file: string; cell_size: number; format: string }[]
+  frames: Record<string, { index: number; col: number; row: number }>
+}
+
 export interface UserAvatar {
   avatar_id: string
   unlocked_at: string
@@ -54,6 +62,8 @@ export const useAvatarStore = defineStore('avatar', () => {
   const currentAvatarId = ref<string | null>(null)
   const isLoading = ref(false)
   const error = ref<string | null>(null)
+  // 頭像圖集（未生成時為 null，逐個文件加載）
+  const atlas = ref<AvatarAtlas | null>(null)
 
   // 計算屬性：按稀有度分組的頭像
   const avatarsByRarity = computed(() => {
@@ -105,6 +115,42 @@ export const useAvatarStore = defineStore('avatar', () => {
     return `${import.meta.env.BASE_URL}images/avatars/${avatar.filename}`
   }
 
+  /**
+   * 獲取頭像在圖集中的背景樣式；沒有圖集或圖集中沒有此頭像時返回 null，
+   * 調用方回退到 getAvatarUrl 的單個文件
+   */
+  function getAtlasStyle(avatar: Avatar): Record<string, string> | null {
+    const frame = atlas.value?.frames[avatar.filename.replace(/\.png$/i, '')]
+    if (!atlas.value || !frame) return null
+
+    const { cols, rows, images } = atlas.value
+    const x = cols > 1 ? (frame.col * 100) / (cols - 1) : 0
+    const y = rows > 1 ? (frame.row * 100) / (rows - 1) : 0
+    return {
+      backgroundImage: `url(${import.meta.env.BASE_URL}images/avatars/${images[0].file})`,
+      backgroundSize: `${cols * 100}% ${rows * 100}%`,
+      backgroundPosition: `${x}% ${y}%`
+    }
+  }
+
+  /**
+   * 加載頭像圖集坐標表（只加載一次；失敗時保持逐個文件加載）
+   */
+  async function fetchAtlas() {
+    if (atlas.value) return
+
+    try {
+      const response = await fetch(`${import.meta.env.BASE_URL}images/avatars/avatars-atlas.json`)
+      if (!response.ok) return
+      const data = await response.json()
+      if (data?.frames && data.images?.length) {
+        atlas.value = data
+      }
+    } catch (err: any) {
+      console.warn('頭像圖集不可用，改為逐個加載:', err)
+    }
+  }
+
   /**
    * 檢查頭像是否已解鎖
    */
@@ -184,7 +230,7 @@ export const useAvatarStore = defineStore('avatar', () => {
    * 初始化頭像系統
    */
   async function initialize() {
-    await fetchAvatars()
+    await Promise.all([fetchAvatars(), fetchAtlas()])
     
     if (authStore.isAuthenticated) {
       await Promise.all([
@@ -319,6 +365,7 @@ export const useAvatarStore = defineStore('avatar', () => {
     currentAvatarId,
     isLoading,
     error,
+    atlas,
 
     // 計算屬性
     avatarsByRarity,
@@ -329,6 +376,7 @@ export const useAvatarStore = defineStore('avatar', () => {
 
     // 方法
     getAvatarUrl,
+    getAtlasStyle,
     isUnlocked,
     fetchAvatars,
     fetchUserAvatars,
@@ -8,14 +8,409 @@
 2. 將配置文件保存為 avatar-crop-config.json（與此腳本同目錄）
 3. 確保原始圖片文件存在（與配置中指定的尺寸匹配）
 4. 運行：python3 apply-crop-config.py
+   並行編碼：python3 apply-crop-config.py --jobs 0（0 = 使用全部 CPU 核心）
+   多尺寸多格式：python3 apply-crop-config.py --sizes 64,128,256,512 --formats png,webp
+   同時打包圖集：python3 apply-crop-config.py --atlas --atlas-sizes 64,128
+   忽略緩存全部重建：python3 apply-crop-config.py --force
+   只輸出到本目錄：python3 apply-crop-config.py --no-publish
+   PNG 編碼檔位：python3 apply-crop-config.py --png-tier balanced --png-report
+   批量處理多張原圖：python3 apply-crop-config.py --batch crop-jobs.json --jobs 0 --on-mismatch rescale
+   自動裁剪：python3 apply-crop-config.py --auto-trim（在每個裁剪框內按內容裁成居中的正方形）
 5. 頭像將保存到 avatars/ 文件夾
+
+多尺寸輸出：每個頭像只裁剪一次，先縮放到最大尺寸，再逐級縮小得到較小尺寸。
+512 的文件沿用原文件名（書法豆.png / 書法豆.webp），其他尺寸為 書法豆-64.png 等；
+同時在輸出目錄寫入 manifest.json，列出每個變體的文件名和字節數。
+
+增量重建：每個頭像按「原圖內容 + 裁剪參數 + 輸出設置」計算哈希，記錄在
+avatars/.build-cache.json；哈希不變且文件仍在的頭像直接跳過，只重新渲染改動過的。
+
+自動裁剪：--auto-trim 時在配置的裁剪框內再按內容遮罩收緊成居中的正方形（與 split-avatars.py
+的 --auto-trim 相同，見 auto_trim.py）；裁剪在渲染時進行，閾值和留白計入構建鍵。
+
+輸出目標：頭像只渲染一次，再以硬鏈接（或複製）放到 app/public/images/avatars 等目標並校驗。
+
+批量模式：--batch 讀取任務清單（原圖、配置、輸出目錄、名稱），先校驗全部任務，
+再用同一個進程池渲染；尺寸不符按 --on-mismatch 處理，不會停下來等待輸入。
+清單中沒有 targets 的任務與單次運行一樣放到 --target（默認 app/public/images/avatars），
+--no-publish 時所有任務都不放到其他目錄。
 """
 
 from PIL import Image
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from sprite_atlas import add_atlas_arguments, atlas_options, write_atlas
+from publish_targets import add_target_arguments, publish, report, target_dirs
+from png_tiers import add_tier_arguments, baseline_size, encode_png, print_savings
+from phase_timing import new_phases, print_phases, sum_phases, timed
+from auto_trim import add_trim_arguments, content_mask, trim_box
+import argparse
+import hashlib
+import io
 import json
 import os
+import sys
+import time
+
+# 工作進程中共享的原始圖片（每個進程只接收一次）
+_worker_image = None
+
+def _init_worker(image):
+    """進程池初始化：接收已解碼的圖片（以原始像素傳輸），避免每個任務重新解碼"""
+    global _worker_image
+    _worker_image = image
+
+# 默認輸出：512x512 PNG（沿用原文件名）
+BASE_SIZE = 512
+DEFAULT_SIZES = (BASE_SIZE,)
+DEFAULT_FORMATS = ('png',)
+
+# 格式 → (擴展名, PIL 格式名)
+FORMAT_INFO = {
+    'png': ('png', 'PNG'),
+    'webp': ('webp', 'WEBP'),
+}
+
+def variant_path(base_path, size, fmt):
+    """頭像變體的文件路徑：512 沿用原文件名，其他尺寸加 -尺寸 後綴"""
+    ext = FORMAT_INFO[fmt][0]
+    if size == BASE_SIZE:
+        return f"{base_path}.{ext}"
+    return f"{base_path}-{size}.{ext}"
+
+# 不指定 --png-tier 時的 PNG 編碼設置（也是 --png-report 的參照）
+LEGACY_PNG_OPTIONS = {'optimize': True}
+
+def encode_variant(image, fmt, webp_quality=None, png_tier=None):
+    """按格式編碼並返回字節；WebP 默認無損，指定 webp_quality 時有損；PNG 指定檔位時按檔位編碼"""
+    if fmt == 'png' and png_tier:
+        return encode_png(image, png_tier)
+    
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        if webp_quality is None:
+            image.save(buffer, "WEBP", lossless=True, method=6)
+        else:
+            image.save(buffer, "WEBP", quality=webp_quality, method=6)
+    else:
+        image.save(buffer, "PNG", **LEGACY_PNG_OPTIONS)
+    return buffer.getvalue()
+
+def render_avatar(img, box, base_path, sizes=DEFAULT_SIZES, formats=DEFAULT_FORMATS, webp_quality=None,
+                  png_tier=None, png_report=False, trim=None):
+    """
+    裁剪並保存一個頭像的所有變體，返回 (變體列表 [{file, size, format, bytes}], 各階段耗時)
+    
+    trim 為 (閾值, 留白) 時在裁剪框內按內容再收緊成居中的正方形。
+    先縮放到最大尺寸，再由上一級逐級縮小（LANCZOS），每個尺寸只縮放一次。
+    png_report 時 PNG 變體另記 baseline_bytes（原來的 optimize=True 編碼的大小）。
+    計時在調用所在的進程內進行，並行時由工作進程隨結果返回。
+    """
+    phases = new_phases()
+    with timed(phases, 'crop'):
+        avatar = img.crop(box)
+        if trim:
+            threshold, margin = trim
+            avatar = avatar.crop(trim_box(content_mask(avatar, threshold), (0, 0) + avatar.size, margin))
+    variants = []
+    
+    for size in sorted(sizes, reverse=True):
+        # 調整為正方形
+        with timed(phases, 'resize'):
+            avatar = avatar.resize((size, size), Image.Resampling.LANCZOS)
+        
+        for fmt in formats:
+            output_path = variant_path(base_path, size, fmt)
+            with timed(phases, 'encode'):
+                data = encode_variant(avatar, fmt, webp_quality, png_tier)
+            with timed(phases, 'write'):
+                with open(output_path, 'wb') as f:
+                    f.write(data)
+            variant = {
+                'file': os.path.basename(output_path),
+                'size': size,
+                'format': fmt,
+                'bytes': len(data)
+            }
+            if png_report and fmt == 'png':
+                # 沒有指定檔位時文件本身就是原來的編碼，不必重新編碼
+                variant['baseline_bytes'] = (baseline_size(avatar, **LEGACY_PNG_OPTIONS) if png_tier
+                                             else variant['bytes'])
+            variants.append(variant)
+    
+    return variants, phases
+
+def _render_in_worker(box, base_path, sizes, formats, webp_quality, png_tier, png_report, trim):
+    return render_avatar(_worker_image, box, base_path, sizes, formats, webp_quality, png_tier, png_report, trim)
+
+def render_avatars(img, tasks, jobs=1, sizes=DEFAULT_SIZES, formats=DEFAULT_FORMATS, webp_quality=None,
+                   png_tier=None, png_report=False, trim=None):
+    """
+    渲染一組 (裁剪區域, 輸出路徑（不含擴展名）)，返回每個頭像的 (變體列表, 各階段耗時)
+    
+    jobs > 1 時用進程池並行編碼（PNG optimize 編碼是主要耗時），
+    原始圖片只解碼一次，以原始像素傳給每個工作進程；輸出與串行完全相同。
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return [render_avatar(img, box, base_path, sizes, formats, webp_quality, png_tier, png_report, trim)
+                for box, base_path in tasks]
+    
+    with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)), initializer=_init_worker,
+                             initargs=(img,)) as pool:
+        boxes, paths = zip(*tasks)
+        n = len(tasks)
+        return list(pool.map(_render_in_worker, boxes, paths,
+                             [sizes] * n, [formats] * n, [webp_quality] * n,
+                             [png_tier] * n, [png_report] * n, [trim] * n))
+
+def write_manifest(output_dir, tasks, results):
+    """寫出 manifest.json：每個頭像的所有變體及字節數"""
+    manifest = {
+        'avatars': [
+            {'name': os.path.basename(base_path), 'variants': variants}
+            for (_, base_path), variants in zip(tasks, results)
+        ]
+    }
+    manifest['total_bytes'] = sum(v['bytes'] for item in manifest['avatars'] for v in item['variants'])
+    
+    path = os.path.join(output_dir, 'manifest.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return path, manifest['total_bytes']
+
+# 構建緩存文件（放在輸出目錄中）；渲染邏輯改變時提升版本號使舊緩存失效
+BUILD_CACHE_FILE = '.build-cache.json'
+BUILD_CACHE_VERSION = 1
 
-def apply_crop_config(config_path, source_image_path, output_dir):
+def file_hash(path):
+    """文件內容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def avatar_cache_key(source_hash, crop_config, box, sizes, formats, webp_quality, png_tier=None, trim=None):
+    """單個頭像的構建鍵：原圖、裁剪參數和輸出設置任一變化都會改變"""
+    payload = {
+        'version': BUILD_CACHE_VERSION,
+        'source': source_hash,
+        'crop': crop_config,
+        'box': box,
+        'sizes': list(sizes),
+        'formats': list(formats),
+        'webp_quality': webp_quality,
+        'png_tier': png_tier
+    }
+    # 只在自動裁剪時加入，不使未啟用時已有的緩存失效
+    if trim:
+        payload['trim'] = list(trim)
+    payload = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def load_build_cache(output_dir):
+    """讀取構建緩存：{頭像名: {'key': ..., 'variants': [...]}}"""
+    path = os.path.join(output_dir, BUILD_CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # 緩存損壞時當作沒有緩存，全部重建
+        return {}
+
+def save_build_cache(output_dir, cache):
+    with open(os.path.join(output_dir, BUILD_CACHE_FILE), 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, indent=2)
+
+def is_cached(entry, key, output_dir):
+    """緩存鍵相同且所有變體文件都還在"""
+    return (entry is not None and entry.get('key') == key and
+            all(os.path.exists(os.path.join(output_dir, v['file'])) for v in entry.get('variants', [])))
+
+# 頭像名稱（與編輯器中的順序一致）
+AVATAR_NAMES = [
+    "書法豆", "仙子豆", "墨池豆", "夫子豆", "儒袍豆", "招財豆",
+    "竹食豆", "卷靈豆", "鳳鳴豆", "月兔豆", "文龜豆", "禪定豆",
+    "瓶靈豆", "劍客豆", "狐仙豆", "面譜豆", "星際豆", "冥想豆"
+]
+
+# 圖片尺寸與配置不符時的處理方式
+MISMATCH_POLICIES = ('ask', 'fail', 'rescale', 'skip')
+
+# 渲染設置（構建鍵和工作進程都使用；trim 為 (閾值, 留白) 或 None）
+RenderSettings = namedtuple('RenderSettings', ['sizes', 'formats', 'webp_quality', 'png_tier', 'png_report', 'trim'])
+DEFAULT_SETTINGS = RenderSettings(DEFAULT_SIZES, DEFAULT_FORMATS, None, None, False, None)
+
+def avatar_name(names, i):
+    return names[i] if i < len(names) else f"avatar_{i + 1}"
+
+def crop_box(crop_config, width, height):
+    """根據一條裁剪配置計算裁剪區域，返回 ((left, top, right, bottom), 實際尺寸)"""
+    x = crop_config['x']
+    y = crop_config['y']
+    size = crop_config['size']
+    scale = crop_config.get('scale', 1.0)
+    
+    # 計算實際裁剪區域（考慮縮放）
+    actual_size = size * scale
+    offset_x = (size - actual_size) / 2
+    offset_y = (size - actual_size) / 2
+    
+    # 計算裁剪區域
+    left = x + offset_x
+    top = y + offset_y
+    right = left + actual_size
+    bottom = top + actual_size
+    
+    # 確保在圖片範圍內
+    left = max(0, min(left, width))
+    top = max(0, min(top, height))
+    right = max(left, min(right, width))
+    bottom = max(top, min(bottom, height))
+    
+    return (int(left), int(top), int(right), int(bottom)), actual_size
+
+def rescale_config(config, width, height):
+    """把配置按比例換算到實際圖片尺寸（正方形邊長按較小的比例縮放）"""
+    scale_x = width / config['imageWidth']
+    scale_y = height / config['imageHeight']
+    return dict(config, imageWidth=width, imageHeight=height, cropConfigs=[
+        dict(crop, x=crop['x'] * scale_x, y=crop['y'] * scale_y, size=crop['size'] * min(scale_x, scale_y))
+        for crop in config['cropConfigs']
+    ])
+
+def check_image_size(config, width, height, mismatch='ask'):
+    """
+    按策略處理圖片尺寸與配置不符的情況
+    
+    Returns:
+        要使用的配置；跳過時返回 None
+    
+    Raises:
+        ValueError: 策略為 fail 時
+    """
+    if width == config['imageWidth'] and height == config['imageHeight']:
+        return config
+    
+    message = f"圖片尺寸不匹配（配置 {config['imageWidth']} x {config['imageHeight']}，實際 {width} x {height}）"
+    if mismatch == 'fail':
+        raise ValueError(message)
+    if mismatch == 'rescale':
+        print(f"警告: {message}，按比例換算裁剪區域")
+        return rescale_config(config, width, height)
+    if mismatch == 'skip':
+        print(f"警告: {message}，跳過")
+        return None
+    
+    print(f"警告: 圖片尺寸不匹配！")
+    print(f"  配置: {config['imageWidth']} x {config['imageHeight']}")
+    print(f"  實際: {width} x {height}")
+    response = input("是否繼續？(y/n): ")
+    return config if response.lower() == 'y' else None
+
+def plan_job(config, source_image_path, output_dir, names, width, height, settings, force=False):
+    """
+    計算一個任務的所有裁剪區域，並對照構建緩存找出需要重新渲染的頭像
+    
+    Returns:
+        dict：source、output_dir、tasks [(裁剪區域, 輸出路徑（不含擴展名）)]、keys、
+        pending（需要渲染的序號）、skipped（跳過的名稱）、cache、phases（各階段耗時）
+    """
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # 構建緩存
+    source_hash = file_hash(source_image_path)
+    cache = {} if force else load_build_cache(output_dir)
+    
+    job = {'source': source_image_path, 'output_dir': output_dir, 'tasks': [], 'keys': [],
+           'pending': [], 'skipped': [], 'cache': cache, 'phases': new_phases()}
+    
+    if settings.trim:
+        print(f"自動裁剪: 閾值 {settings.trim[0]}，留白 {settings.trim[1]*100:.0f}%")
+    
+    for i, crop_config in enumerate(config['cropConfigs']):
+        box, actual_size = crop_box(crop_config, width, height)
+        
+        # 生成文件名
+        name = avatar_name(names, i)
+        base_path = os.path.join(output_dir, name)
+        output_path = variant_path(base_path, max(settings.sizes), settings.formats[0])
+        
+        key = avatar_cache_key(source_hash, crop_config, box, settings.sizes, settings.formats,
+                               settings.webp_quality, settings.png_tier, settings.trim)
+        job['tasks'].append((box, base_path))
+        job['keys'].append(key)
+        
+        if is_cached(cache.get(name), key, output_dir):
+            job['skipped'].append(name)
+            print(f"· 跳過: {output_path}（未改動）")
+        else:
+            job['pending'].append(i)
+            print(f"⏳ 待渲染: {output_path} (位置: {box[0]}, {box[1]}, 尺寸: {int(actual_size)})")
+    
+    job['phases']['plan'] = time.perf_counter() - start
+    return job
+
+def finish_job(job, rendered, settings, atlas=None, targets=()):
+    """
+    記錄渲染結果，保存構建緩存，按需寫出變體清單、圖集並放到其他輸出目標
+    
+    rendered 為待渲染頭像的 [(變體列表, 各階段耗時)]；返回本任務累計的各階段耗時
+    """
+    output_dir, tasks, cache = job['output_dir'], job['tasks'], job['cache']
+    sizes, formats = settings.sizes, settings.formats
+    phases = sum_phases([job['phases']] + [item[1] for item in rendered])
+    rendered = [variants for variants, _ in rendered]
+    
+    # 寫入成功的頭像才記錄到緩存並打印
+    for i, variants in zip(job['pending'], rendered):
+        cache[os.path.basename(tasks[i][1])] = {'key': job['keys'][i], 'variants': variants}
+        for v in variants:
+            print(f"✓ 保存: {os.path.join(output_dir, v['file'])} ({v['bytes'] / 1024:.0f} KB)")
+    
+    if settings.png_report:
+        print_savings([(v['file'], v['baseline_bytes'], v['bytes'])
+                       for variants in rendered for v in variants if 'baseline_bytes' in v])
+    
+    # 只保留本次配置中的頭像
+    names = [os.path.basename(base_path) for _, base_path in tasks]
+    cache = {name: cache[name] for name in names}
+    save_build_cache(output_dir, cache)
+    results = [cache[name]['variants'] for name in names]
+    outputs = [os.path.join(output_dir, v['file']) for variants in results for v in variants]
+    
+    if job['skipped']:
+        print(f"\n跳過 {len(job['skipped'])} 個未改動的頭像: {'、'.join(job['skipped'])}")
+    
+    # 輸出多個變體時，寫出清單供頁面選擇合適的尺寸和格式
+    if tuple(sizes) != DEFAULT_SIZES or tuple(formats) != DEFAULT_FORMATS:
+        manifest_path, total_bytes = write_manifest(output_dir, tasks, results)
+        outputs.append(manifest_path)
+        print(f"\n變體清單: {manifest_path}（{len(sizes)} 種尺寸 × {len(formats)} 種格式，共 {total_bytes / 1024:.0f} KB）")
+    
+    # 打包圖集：由最大尺寸的頭像縮放到各個格子尺寸
+    if atlas:
+        sprites = []
+        for _, base_path in tasks:
+            with Image.open(variant_path(base_path, max(sizes), formats[0])) as avatar:
+                sprites.append((os.path.basename(base_path), avatar.convert('RGBA')))
+        print()
+        outputs += write_atlas(sprites, output_dir, 'avatars-atlas', *atlas)
+    
+    # 放到其他輸出目標
+    if targets:
+        report(publish(outputs, targets), targets)
+    
+    print()
+    print_phases(phases)
+    return phases
+
+def apply_crop_config(config_path, source_image_path, output_dir, jobs=1,
+                      sizes=DEFAULT_SIZES, formats=DEFAULT_FORMATS, webp_quality=None, atlas=None, force=False, targets=(),
+                      png_tier=None, png_report=False, mismatch='ask', names=AVATAR_NAMES, trim=None):
     """
     應用裁剪配置
     
@@ -23,78 +418,268 @@ def apply_crop_config(config_path, source_image_path, output_dir):
         config_path: 配置文件路徑
         source_image_path: 原始圖片路徑
         output_dir: 輸出目錄
+        jobs: 並行進程數（默認 1，即串行）
+        sizes: 輸出尺寸列表（默認只有 512）
+        formats: 輸出格式列表（png / webp，默認只有 png）
+        webp_quality: WebP 質量（默認 None = 無損）
+        atlas: (尺寸列表, 格式列表)；提供時把生成的頭像打包成 avatars-atlas 圖集
+        force: 忽略構建緩存，全部重新渲染
+        targets: 其他輸出目錄；生成的文件以硬鏈接或複製放到這些目錄
+        png_tier: PNG 編碼檔位（fast / balanced / max；默認沿用 optimize=True）
+        png_report: 列出本次渲染的 PNG 相對原來的編碼（optimize=True）節省的字節數
+        mismatch: 圖片尺寸與配置不符時的處理：ask（詢問）、fail、rescale、skip
+        names: 頭像名稱（按配置順序；不足時用 avatar_N）
+        trim: (閾值, 留白)；提供時在每個裁剪框內按內容自動裁剪成居中的正方形
+    
+    Returns:
+        各階段耗時（秒；規劃、解碼、裁剪、縮放、編碼、寫入，並行時為各進程之和）；跳過時返回 None
     """
+    settings = RenderSettings(sizes, formats, webp_quality, png_tier, png_report, trim)
+    
     # 讀取配置
     with open(config_path, 'r', encoding='utf-8') as f:
         config = json.load(f)
     
-    # 打開原始圖片
+    # 打開原始圖片（只讀取文件頭；確實需要渲染時才解碼）
     img = Image.open(source_image_path)
     width, height = img.size
     
     # 驗證圖片尺寸
-    if width != config['imageWidth'] or height != config['imageHeight']:
-        print(f"警告: 圖片尺寸不匹配！")
-        print(f"  配置: {config['imageWidth']} x {config['imageHeight']}")
-        print(f"  實際: {width} x {height}")
-        response = input("是否繼續？(y/n): ")
-        if response.lower() != 'y':
-            return
-    
-    # 創建輸出目錄
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # 頭像名稱（與編輯器中的順序一致）
-    avatar_names = [
-        "書法豆", "仙子豆", "墨池豆", "夫子豆", "儒袍豆", "招財豆",
-        "竹食豆", "卷靈豆", "鳳鳴豆", "月兔豆", "文龜豆", "禪定豆",
-        "瓶靈豆", "劍客豆", "狐仙豆", "面譜豆", "星際豆", "冥想豆"
-    ]
+    config = check_image_size(config, width, height, mismatch)
+    if config is None:
+        return
     
     print(f"開始處理 {len(config['cropConfigs'])} 個頭像...")
     print()
     
-    # 處理每個頭像
-    for i, crop_config in enumerate(config['cropConfigs']):
-        x = crop_config['x']
-        y = crop_config['y']
-        size = crop_config['size']
-        scale = crop_config.get('scale', 1.0)
+    job = plan_job(config, source_image_path, output_dir, names, width, height, settings, force)
+    
+    # 裁剪、縮放並保存（只渲染緩存失效的頭像）
+    rendered = []
+    if job['pending']:
+        with timed(job['phases'], 'decode'):
+            img.load()
+        rendered = render_avatars(img, [job['tasks'][i] for i in job['pending']], jobs,
+                                  sizes, formats, webp_quality, png_tier, png_report, trim)
+    
+    phases = finish_job(job, rendered, settings, atlas, targets)
+    
+    print(f"\n完成！共處理 {len(config['cropConfigs'])} 個頭像到 {output_dir}/（渲染 {len(job['pending'])} 個，跳過 {len(job['skipped'])} 個）")
+    return phases
+
+def load_batch_manifest(manifest_path, mismatch='fail', default_targets=()):
+    """
+    讀取並校驗批量任務清單，全部通過後才開始渲染
+    
+    清單格式：{"jobs": [{"sheet": 原圖, "config": 裁剪配置, "output_dir": 輸出目錄,
+                         "names": [頭像名稱, ...]（可選）, "targets": [其他輸出目錄]（可選）}]}
+    相對路徑以清單所在目錄為基準；沒有 targets 的任務使用 default_targets
+    （命令行的 --target，默認 app/public/images/avatars），"targets": [] 表示不放到其他目錄。
+    
+    Returns:
+        [{'label', 'sheet', 'config', 'output_dir', 'names', 'targets', 'width', 'height'}]
+    
+    Raises:
+        ValueError: 任何任務校驗失敗（錯誤信息列出所有問題）
+    """
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    entries = manifest['jobs'] if isinstance(manifest, dict) else manifest
+    
+    resolve = lambda path: os.path.normpath(os.path.join(base_dir, path))
+    jobs = []
+    errors = []
+    outputs = {}
+    
+    for index, entry in enumerate(entries):
+        label = entry.get('name') or f"任務 {index + 1}"
+        missing = [key for key in ('sheet', 'config', 'output_dir') if not entry.get(key)]
+        if missing:
+            errors.append(f"{label}: 缺少 {', '.join(missing)}")
+            continue
         
-        # 計算實際裁剪區域（考慮縮放）
-        actual_size = size * scale
-        offset_x = (size - actual_size) / 2
-        offset_y = (size - actual_size) / 2
+        sheet, config_path, output_dir = (resolve(entry[key]) for key in ('sheet', 'config', 'output_dir'))
         
-        # 計算裁剪區域
-        left = x + offset_x
-        top = y + offset_y
-        right = left + actual_size
-        bottom = top + actual_size
+        try:
+            with Image.open(sheet) as img:
+                width, height = img.size
+        except (OSError, ValueError) as e:
+            errors.append(f"{label}: 無法讀取原圖 {sheet}（{e}）")
+            continue
         
-        # 確保在圖片範圍內
-        left = max(0, min(left, width))
-        top = max(0, min(top, height))
-        right = max(left, min(right, width))
-        bottom = max(top, min(bottom, height))
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            config['imageWidth'], config['imageHeight']
+            for crop in config['cropConfigs']:
+                float(crop['x']), float(crop['y']), float(crop['size'])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            errors.append(f"{label}: 配置 {config_path} 無效（{e}）")
+            continue
         
-        # 裁剪頭像
-        avatar = img.crop((int(left), int(top), int(right), int(bottom)))
+        try:
+            config = check_image_size(config, width, height, mismatch)
+        except ValueError as e:
+            errors.append(f"{label}: {e}")
+            continue
         
-        # 調整為正方形（512x512）
-        avatar = avatar.resize((512, 512), Image.Resampling.LANCZOS)
+        if config is None:
+            continue
         
-        # 生成文件名
-        name = avatar_names[i] if i < len(avatar_names) else f"avatar_{i + 1}"
-        output_path = os.path.join(output_dir, f"{name}.png")
+        names = entry.get('names', AVATAR_NAMES)
+        if len(set(names)) != len(names):
+            errors.append(f"{label}: 頭像名稱有重複")
+            continue
+        
+        # 空的裁剪區域和輸出文件衝突
+        for i, crop in enumerate(config['cropConfigs']):
+            box, _ = crop_box(crop, width, height)
+            if box[2] <= box[0] or box[3] <= box[1]:
+                errors.append(f"{label}: 第 {i + 1} 個裁剪區域超出圖片範圍")
+            path = os.path.join(output_dir, avatar_name(names, i))
+            if path in outputs:
+                errors.append(f"{label}: 輸出 {path} 與{outputs[path]}重複")
+            outputs[path] = label
         
-        # 保存頭像
-        avatar.save(output_path, "PNG", optimize=True)
-        print(f"✓ 保存: {output_path} (位置: {int(left)}, {int(top)}, 尺寸: {int(actual_size)})")
+        jobs.append({
+            'label': label,
+            'sheet': sheet,
+            'config': config,
+            'output_dir': output_dir,
+            'names': names,
+            'targets': ([resolve(target) for target in entry['targets']] if 'targets' in entry
+                        else list(default_targets)),
+            'width': width,
+            'height': height
+        })
     
-    print(f"\n完成！共處理 {len(config['cropConfigs'])} 個頭像到 {output_dir}/")
+    if errors:
+        raise ValueError("\n".join(errors))
+    
+    return jobs
+
+# 工作進程中已解碼的原圖（批量模式按路徑載入，每個進程每張圖只解碼一次）
+_worker_sheets = {}
+
+def _load_sheet(path):
+    sheet = _worker_sheets.get(path)
+    if sheet is None:
+        # 任務按原圖順序提交，只保留最近的幾張，避免多張大圖同時佔用內存
+        if len(_worker_sheets) >= 2:
+            _worker_sheets.clear()
+        sheet = _worker_sheets[path] = Image.open(path)
+        sheet.load()
+    return sheet
+
+def _render_sheet_in_worker(path, box, base_path, settings):
+    """按路徑取原圖並渲染；首次用到某張原圖時的解碼耗時記在這個頭像上"""
+    start = time.perf_counter()
+    sheet = _load_sheet(path)
+    decode = time.perf_counter() - start
+    variants, phases = render_avatar(sheet, box, base_path, *settings)
+    phases['decode'] += decode
+    return variants, phases
+
+def apply_batch(manifest_path, jobs=1, settings=DEFAULT_SETTINGS, atlas=None, force=False, mismatch='fail',
+                targets=(), publish=True):
+    """
+    批量應用裁剪配置：先校驗所有任務，再用同一個進程池渲染所有原圖中需要更新的頭像
+    
+    targets 是沒有寫 targets 的任務的輸出目標；publish 為假（--no-publish）時所有任務都不放到其他目錄。
+    
+    Returns:
+        是否成功（校驗失敗時不渲染任何頭像）
+    """
+    try:
+        batch = load_batch_manifest(manifest_path, mismatch, targets)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ 批量任務校驗失敗:\n{e}")
+        return False
+    
+    print(f"📋 {len(batch)} 個任務校驗通過")
+    
+    planned = []
+    for entry in batch:
+        print(f"\n== {entry['label']}: {entry['sheet']} → {entry['output_dir']}")
+        planned.append(plan_job(entry['config'], entry['sheet'], entry['output_dir'], entry['names'],
+                                entry['width'], entry['height'], settings, force))
+    
+    # 所有任務的待渲染頭像放進同一個隊列
+    queue = [(job['source'],) + job['tasks'][i] for job in planned for i in job['pending']]
+    print(f"\n開始渲染 {len(queue)} 個頭像（{len(planned)} 張原圖）...")
+    
+    if jobs <= 1 or len(queue) <= 1:
+        rendered = [_render_sheet_in_worker(path, box, base_path, settings) for path, box, base_path in queue]
+        _worker_sheets.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(queue))) as pool:
+            n = len(queue)
+            paths, boxes, base_paths = zip(*queue)
+            rendered = list(pool.map(_render_sheet_in_worker, paths, boxes, base_paths, [settings] * n))
+    
+    total_skipped = 0
+    for entry, job in zip(batch, planned):
+        count = len(job['pending'])
+        job_rendered, rendered = rendered[:count], rendered[count:]
+        finish_job(job, job_rendered, settings, atlas, entry['targets'] if publish else ())
+        total_skipped += len(job['skipped'])
+    
+    print(f"\n完成！共 {len(batch)} 個任務（渲染 {len(queue)} 個頭像，跳過 {total_skipped} 個）")
+    return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='根據裁剪配置重新生成頭像')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='並行進程數（默認 1；0 = 使用全部 CPU 核心）')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='輸出尺寸，逗號分隔（默認 512），如 64,128,256,512')
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help='輸出格式，逗號分隔：png、webp（默認 png）')
+    parser.add_argument('--webp-quality', type=int, default=None,
+                        help='WebP 有損質量 0-100（默認無損）')
+    parser.add_argument('--force', action='store_true',
+                        help='忽略構建緩存，重新渲染所有頭像')
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help='批量模式：按任務清單處理多張原圖 / 配置（不詢問，見 load_batch_manifest）')
+    parser.add_argument('--on-mismatch', choices=MISMATCH_POLICIES,
+                        help='圖片尺寸與配置不符時：ask 詢問、fail 報錯、rescale 按比例換算、skip 跳過'
+                             '（默認：交互終端為 ask，否則 fail；批量模式不能用 ask）')
+    add_atlas_arguments(parser)
+    add_target_arguments(parser)
+    add_tier_arguments(parser)
+    add_trim_arguments(parser, '在每個裁剪框內按內容自動裁剪成居中的正方形')
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    
+    try:
+        sizes = tuple(sorted({int(size) for size in args.sizes.split(',')}, reverse=True))
+    except ValueError:
+        parser.error(f'--sizes 格式錯誤: {args.sizes}')
+    formats = tuple(dict.fromkeys(fmt.strip().lower() for fmt in args.formats.split(',')))
+    if any(size <= 0 for size in sizes):
+        parser.error('--sizes 必須都大於 0')
+    if any(fmt not in FORMAT_INFO for fmt in formats):
+        parser.error(f'--formats 只支持: {", ".join(FORMAT_INFO)}')
+    if args.webp_quality is not None and not 0 <= args.webp_quality <= 100:
+        parser.error('--webp-quality 必須在 0-100 之間')
+    if args.auto_trim and not 0 <= args.threshold <= 255:
+        parser.error('--threshold 必須在 0-255 之間')
+    if args.auto_trim and args.margin < 0:
+        parser.error('--margin 不能為負數')
+    atlas = atlas_options(parser, args) if args.atlas else None
+    trim = (args.threshold, args.margin) if args.auto_trim else None
+    
+    if args.batch:
+        if args.on_mismatch == 'ask':
+            parser.error('批量模式不能使用 --on-mismatch ask')
+        settings = RenderSettings(sizes, formats, args.webp_quality, args.png_tier, args.png_report, trim)
+        ok = apply_batch(args.batch, jobs, settings, atlas, args.force, args.on_mismatch or 'fail',
+                         target_dirs(args), not args.no_publish)
+        sys.exit(0 if ok else 1)
+    
+    mismatch = args.on_mismatch or ('ask' if sys.stdin.isatty() else 'fail')
+    
     # 腳本所在目錄
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -121,5 +706,11 @@ if __name__ == "__main__":
         print(f"錯誤: 找不到原始圖片文件")
         print(f"請確保以下文件之一存在: {', '.join(possible_images)}")
     else:
-        apply_crop_config(config_path, source_image_path, output_dir)
-
+        try:
+            apply_crop_config(config_path, source_image_path, output_dir, jobs,
+                              sizes, formats, args.webp_quality, atlas, args.force, target_dirs(args),
+                              args.png_tier, args.png_report, mismatch, trim=trim)
+        except ValueError as e:
+            print(f"錯誤: {e}")
+            print("可用 --on-mismatch rescale 按比例換算，或 --on-mismatch skip 跳過")
+            sys.exit(1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+句豆頭像自動裁剪（split-avatars.py 和 apply-crop-config.py 共用）
+
+按內容遮罩（有透明通道時用 alpha，否則用與背景色的差異）找出區域內內容的最小包圍框，
+再擴成居中的正方形，不需要手動維護邊距。
+"""
+
+from PIL import Image, ImageChops
+
+DEFAULT_THRESHOLD = 24
+DEFAULT_MARGIN = 0.04
+
+def content_mask(img, threshold=DEFAULT_THRESHOLD):
+    """
+    圖片的內容遮罩（L 模式，內容 = 255）
+
+    有透明通道時按 alpha 判斷；否則以左上角像素為背景色，按各通道最大差異判斷。
+    """
+    if 'A' in img.getbands() or 'transparency' in img.info:
+        alpha = img.convert('RGBA').getchannel('A')
+        return alpha.point(lambda value: 255 if value > threshold else 0)
+
+    rgb = img.convert('RGB')
+    background = Image.new('RGB', rgb.size, rgb.getpixel((0, 0)))
+    diff = ImageChops.difference(rgb, background)
+    r, g, b = diff.split()
+    return ImageChops.lighter(ImageChops.lighter(r, g), b).point(lambda value: 255 if value > threshold else 0)
+
+def trim_box(mask, cell, margin=DEFAULT_MARGIN):
+    """
+    在格子內找內容的最小包圍框，擴成居中的正方形（加 margin 比例的留白）
+
+    正方形不超出格子；格子內沒有內容時返回整個格子。
+    """
+    left, top, right, bottom = cell
+    bbox = mask.crop(cell).getbbox()
+    if bbox is None:
+        return cell
+
+    content_width = bbox[2] - bbox[0]
+    content_height = bbox[3] - bbox[1]
+    side = int(max(content_width, content_height) * (1 + margin * 2))
+    side = min(side, right - left, bottom - top)
+
+    # 以內容中心為中心，再平移回格子範圍內
+    center_x = left + (bbox[0] + bbox[2]) // 2
+    center_y = top + (bbox[1] + bbox[3]) // 2
+    crop_left = min(max(center_x - side // 2, left), right - side)
+    crop_top = min(max(center_y - side // 2, top), bottom - side)
+    return (crop_left, crop_top, crop_left + side, crop_top + side)
+
+def add_trim_arguments(parser, help):
+    """給頭像腳本添加自動裁剪參數；help 為 --auto-trim 的說明"""
+    parser.add_argument('--auto-trim', action='store_true', help=help)
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'自動裁剪的內容閾值 0-255（默認 {DEFAULT_THRESHOLD}）')
+    parser.add_argument('--margin', type=float, default=DEFAULT_MARGIN,
+                        help=f'自動裁剪時內容四周的留白比例（默認 {DEFAULT_MARGIN}）')
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+句豆頭像工具基準測試
+
+生成不同網格和分辨率的合成 RGBA 頭像圖（6x3@1K 到 12x12@8K），分別計時：
+- 串行：解碼、裁剪、縮放、編碼、寫入各階段的總耗時
+- 並行：apply_crop_config 用 --jobs 首次生成（冷構建）
+- 緩存：apply_crop_config 再次運行（構建緩存全部命中）
+並行和緩存的各階段耗時由 apply_crop_config 在工作進程內記錄後累計（含規劃：哈希原圖、
+對照構建緩存），是各進程之和，可能大於牆鐘時間。
+結果寫成 JSON，可與之前的結果比較。
+
+使用方法：
+  python3 benchmark-avatars.py                               # 全部圖，結果寫入 benchmark-avatars.json
+  python3 benchmark-avatars.py --sheets 6x3@1024,6x6@4096     # 只測部分
+  python3 benchmark-avatars.py --png-tier balanced --jobs 4
+  python3 benchmark-avatars.py --baseline old.json            # 與之前的結果比較
+"""
+
+from PIL import Image, ImageDraw
+from contextlib import redirect_stdout
+from datetime import datetime
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+import PIL
+
+from phase_timing import PHASE_LABELS, PHASES, new_phases
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 默認測試的圖：(列數, 行數, 寬度)；高度按格子為正方形計算
+DEFAULT_SHEETS = ['6x3@1024', '6x3@2048', '6x6@4096', '12x12@8192']
+
+# 頭像輸出尺寸（與 apply-crop-config.py 的默認值一致）
+AVATAR_SIZE = 512
+
+# 每張圖的三次運行：(結果鍵前綴, 標籤)
+RUNS = (('serial', '串行'), ('parallel', '並行'), ('cached', '緩存'))
+
+def load_script(filename):
+    """按文件路徑載入帶連字符的腳本模塊"""
+    path = os.path.join(SCRIPT_DIR, filename)
+    spec = importlib.util.spec_from_file_location(filename.replace('-', '_')[:-3], path)
+    module = importlib.util.module_from_spec(spec)
+    # 註冊到 sys.modules，進程池才能按模塊名序列化其中的函數
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def parse_sheet(spec):
+    """'6x3@1024' → (6, 3, 1024)"""
+    grid, width = spec.split('@')
+    cols, rows = grid.lower().split('x')
+    return int(cols), int(rows), int(width)
+
+def make_sheet(cols, rows, width, seed=0):
+    """生成合成頭像圖：透明背景上每格一個帶描邊的彩色圓形和幾個色塊"""
+    cell = width // cols
+    sheet = Image.new('RGBA', (cell * cols, cell * rows), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sheet)
+    rng = random.Random(seed)
+
+    for row in range(rows):
+        for col in range(cols):
+            left, top = col * cell, row * cell
+            margin = int(cell * rng.uniform(0.05, 0.15))
+            color = tuple(rng.randrange(256) for _ in range(3)) + (255,)
+            draw.ellipse((left + margin, top + margin, left + cell - margin, top + cell - margin),
+                         fill=color, outline=(40, 30, 20, 255), width=max(1, cell // 60))
+            for _ in range(6):
+                x, y = left + rng.randrange(cell // 4, cell * 3 // 4), top + rng.randrange(cell // 4, cell * 3 // 4)
+                r = rng.randrange(cell // 20, cell // 8)
+                spot = tuple(rng.randrange(256) for _ in range(3)) + (rng.randrange(128, 256),)
+                draw.ellipse((x - r, y - r, x + r, y + r), fill=spot)
+
+    return sheet
+
+def make_config(sheet, cols, rows):
+    """按網格生成 apply-crop-config 的裁剪配置（每格一個居中的正方形）"""
+    cell = sheet.width // cols
+    return {
+        'imageWidth': sheet.width,
+        'imageHeight': sheet.height,
+        'cropConfigs': [{'x': col * cell, 'y': row * cell, 'size': cell, 'scale': 1.0}
+                        for row in range(rows) for col in range(cols)]
+    }
+
+def encode(image, png_tier, png_tiers):
+    """與 apply-crop-config.py 相同的 PNG 編碼設置，返回字節"""
+    if png_tier:
+        return png_tiers.encode_png(image, png_tier)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+def time_serial(sheet_path, config, output_dir, png_tier, png_tiers):
+    """串行處理，分階段累計耗時（秒）"""
+    phases = new_phases()
+
+    start = time.perf_counter()
+    img = Image.open(sheet_path)
+    img.load()
+    phases['decode'] = time.perf_counter() - start
+
+    for i, crop in enumerate(config['cropConfigs']):
+        box = (crop['x'], crop['y'], crop['x'] + crop['size'], crop['y'] + crop['size'])
+
+        start = time.perf_counter()
+        tile = img.crop(box)
+        tile.load()
+        phases['crop'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        tile = tile.resize((AVATAR_SIZE, AVATAR_SIZE), Image.Resampling.LANCZOS)
+        phases['resize'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        data = encode(tile, png_tier, png_tiers)
+        phases['encode'] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(os.path.join(output_dir, f"avatar_{i + 1}.png"), 'wb') as f:
+            f.write(data)
+        phases['write'] += time.perf_counter() - start
+
+    return phases
+
+def time_apply(apply_module, config_path, sheet_path, output_dir, jobs, png_tier):
+    """運行一次 apply_crop_config（不輸出到其他目錄），返回 (耗時（秒）, 各階段耗時)"""
+    start = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        phases = apply_module.apply_crop_config(config_path, sheet_path, output_dir, jobs, png_tier=png_tier)
+    return time.perf_counter() - start, phases
+
+def bench_sheet(spec, jobs, png_tier, apply_module, png_tiers):
+    cols, rows, width = parse_sheet(spec)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sheet = make_sheet(cols, rows, width)
+        sheet_path = os.path.join(tmp, 'sheet.png')
+        sheet.save(sheet_path, "PNG", compress_level=1)
+        config = make_config(sheet, cols, rows)
+        config_path = os.path.join(tmp, 'config.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(config, f)
+
+        serial_dir = os.path.join(tmp, 'serial')
+        os.makedirs(serial_dir)
+        phases = time_serial(sheet_path, config, serial_dir, png_tier, png_tiers)
+
+        apply_dir = os.path.join(tmp, 'apply')
+        parallel, parallel_phases = time_apply(apply_module, config_path, sheet_path, apply_dir, jobs, png_tier)
+        cached, cached_phases = time_apply(apply_module, config_path, sheet_path, apply_dir, jobs, png_tier)
+
+        return {
+            'sheet': spec,
+            'cols': cols,
+            'rows': rows,
+            'width': sheet.width,
+            'height': sheet.height,
+            'avatars': cols * rows,
+            'sheet_bytes': os.path.getsize(sheet_path),
+            'serial_phases': phases,
+            'serial_seconds': sum(phases.values()),
+            'parallel_phases': parallel_phases,
+            'parallel_seconds': parallel,
+            'cached_phases': cached_phases,
+            'cached_seconds': cached
+        }
+
+def print_results(results, baseline=None):
+    previous = {item['sheet']: item for item in (baseline or {}).get('sheets', [])}
+
+    print(f"\n{'圖':<14}{'運行':<6}" + ''.join(f"{PHASE_LABELS[name]:>8}" for name in PHASES) + f"{'耗時':>9}{'對比基準':>10}")
+    for item in results['sheets']:
+        old = previous.get(item['sheet'])
+        for i, (run, label) in enumerate(RUNS):
+            p = item[f'{run}_phases']
+            seconds = item[f'{run}_seconds']
+            line = (f"{item['sheet'] if i == 0 else '':<14}{label:<6}"
+                    + ''.join(f"{p.get(name, 0.0):>8.2f}" for name in PHASES) + f"{seconds:>9.2f}")
+            if old and seconds:
+                line += f"{old[f'{run}_seconds'] / seconds:>9.2f}x"
+            print(line)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='頭像工具基準測試')
+    parser.add_argument('--sheets', default=','.join(DEFAULT_SHEETS),
+                        help=f'要測試的圖，格式 列x行@寬度，逗號分隔（默認 {",".join(DEFAULT_SHEETS)}）')
+    parser.add_argument('--jobs', type=int, default=0,
+                        help='並行測試的進程數（默認 0 = 全部 CPU 核心）')
+    parser.add_argument('--png-tier', help='PNG 編碼檔位（fast / balanced / max；默認與 apply-crop-config.py 相同）')
+    parser.add_argument('--output', default=os.path.join(SCRIPT_DIR, 'benchmark-avatars.json'),
+                        help='結果 JSON 文件（默認 benchmark-avatars.json）')
+    parser.add_argument('--baseline', help='之前的結果 JSON，打印加速比（基準耗時 / 本次耗時）')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+
+    # 與被測腳本使用相同的模塊
+    sys.path.insert(0, SCRIPT_DIR)
+    apply_module = load_script('apply-crop-config.py')
+    import png_tiers
+
+    if args.png_tier and args.png_tier not in png_tiers.PNG_TIERS:
+        print(f"❌ 未知的編碼檔位: {args.png_tier}")
+        sys.exit(1)
+
+    try:
+        sheets = [spec.strip() for spec in args.sheets.split(',') if spec.strip()]
+        for spec in sheets:
+            parse_sheet(spec)
+    except ValueError:
+        print(f"❌ --sheets 格式錯誤: {args.sheets}（例如 6x3@1024）")
+        sys.exit(1)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'pillow': PIL.__version__,
+        'cpu_count': os.cpu_count(),
+        'jobs': jobs,
+        'png_tier': args.png_tier,
+        'sheets': []
+    }
+
+    for spec in sheets:
+        print(f"📐 測試 {spec} ...")
+        results['sheets'].append(bench_sheet(spec, jobs, args.png_tier, apply_module, png_tiers))
+
+    print_results(results, baseline)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 結果已寫入：{args.output}")
+
+if __name__ == '__main__':
+    main()
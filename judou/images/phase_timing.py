@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+句豆頭像工具分階段計時
+
+渲染函數在所在的進程（串行時為主進程，並行時為工作進程）內記錄各階段耗時，
+隨渲染結果一起返回；調用方把所有頭像的計時相加後打印。
+並行時各階段為所有進程耗時之和，會大於牆鐘時間。
+"""
+
+from contextlib import contextmanager
+import time
+
+# 階段順序；plan（哈希原圖、對照構建緩存）只有 apply-crop-config.py 記錄
+PHASES = ('plan', 'decode', 'crop', 'resize', 'encode', 'write')
+PHASE_LABELS = {'plan': '規劃', 'decode': '解碼', 'crop': '裁剪', 'resize': '縮放', 'encode': '編碼', 'write': '寫入'}
+
+def new_phases():
+    """各階段耗時清零"""
+    return dict.fromkeys(PHASES, 0.0)
+
+@contextmanager
+def timed(phases, name):
+    """把代碼塊的耗時（秒）累加到 phases[name]"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phases[name] += time.perf_counter() - start
+
+def sum_phases(items):
+    """把多組階段耗時相加"""
+    total = new_phases()
+    for phases in items:
+        for name, seconds in phases.items():
+            total[name] += seconds
+    return total
+
+def print_phases(phases):
+    """打印有耗時的階段"""
+    parts = [f"{PHASE_LABELS[name]} {phases[name]:.2f}" for name in PHASES if phases.get(name)]
+    if parts:
+        print(f"⏱️ 階段耗時（秒，各進程累計）: {'、'.join(parts)}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+句豆頭像 PNG 編碼檔位
+
+- fast：真彩色，zlib 級別 1，編碼最快，無損
+- balanced：自適應調色板（256 色，保留 alpha）+ zlib 級別 9
+- max：自適應調色板 + optimize，依次嘗試幾種 zlib 策略，保留最小的結果
+
+卡通頭像的顏色通常很少，調色板量化能把文件縮小數倍；需要逐像素無損時用 fast。
+"""
+
+from PIL import Image
+import io
+import zlib
+
+# 檔位 → (是否量化為調色板, 編碼參數候選列表)
+PNG_TIERS = {
+    'fast': (False, [{'compress_level': 1}]),
+    'balanced': (True, [{'compress_level': 9}]),
+    'max': (True, [{'compress_level': 9}] +
+                  [{'optimize': True, 'compress_type': strategy}
+                   for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE)]),
+}
+
+def quantize(image):
+    """自適應調色板量化（256 色，RGBA 保留透明度）"""
+    if image.mode == 'P':
+        return image
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    return image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+
+def encode_png(image, tier):
+    """按檔位編碼，返回 PNG 字節"""
+    palette, candidates = PNG_TIERS[tier]
+    if palette:
+        image = quantize(image)
+
+    best = None
+    for options in candidates:
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG", **options)
+        if best is None or buffer.tell() < len(best):
+            best = buffer.getvalue()
+    return best
+
+def baseline_size(image, **options):
+    """
+    按腳本原來的 PNG 編碼設置（不指定檔位時使用的 options）編碼的字節數，作為節省量的參照
+
+    apply-crop-config.py 原來用 optimize=True，split-avatars.py 原來用 Pillow 默認設置。
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", **options)
+    return buffer.tell()
+
+def add_tier_arguments(parser):
+    """給頭像腳本添加編碼檔位參數"""
+    parser.add_argument('--png-tier', choices=sorted(PNG_TIERS),
+                        help='PNG 編碼檔位：fast（最快，無損）、balanced（調色板）、max（調色板 + 多種策略取最小）；'
+                             '不指定時沿用原來的編碼設置')
+    parser.add_argument('--png-report', action='store_true',
+                        help='與腳本原來的 PNG 編碼設置比較，列出每個文件節省的字節數')
+
+def print_savings(rows):
+    """打印每個文件的節省量：rows 為 [(文件名, 參照字節數, 實際字節數)]"""
+    if not rows:
+        return
+    print(f"\n{'文件':<20}{'原設置(KB)':>10}{'實際(KB)':>10}{'節省':>8}")
+    for filename, baseline, actual in rows:
+        print(f"{filename:<20}{baseline / 1024:>10.1f}{actual / 1024:>10.1f}{1 - actual / baseline:>8.0%}")
+    total_baseline = sum(row[1] for row in rows)
+    total_actual = sum(row[2] for row in rows)
+    print(f"{'合計':<20}{total_baseline / 1024:>10.1f}{total_actual / 1024:>10.1f}{1 - total_actual / total_baseline:>8.0%}"
+          f"（節省 {(total_baseline - total_actual) / 1024:.0f} KB）")
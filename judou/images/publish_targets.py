@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+句豆頭像輸出目標
+
+頭像只在 judou/images/avatars 渲染一次，再放到每個輸出目標（默認還有
+judou/app/public/images/avatars）：優先硬鏈接，跨文件系統等無法鏈接時複製，
+最後逐個文件校驗（硬鏈接檢查是同一文件，複製檢查 SHA-256），保證兩邊字節相同。
+"""
+
+import hashlib
+import os
+import shutil
+
+# judou/ 目錄（本文件位於 judou/images/）
+JUDOU_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 前端應用使用的頭像目錄
+PUBLIC_AVATARS_DIR = os.path.join(JUDOU_DIR, 'app', 'public', 'images', 'avatars')
+
+def file_digest(path):
+    """文件內容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def place_file(source, dest):
+    """
+    把 source 放到 dest：已經是同一文件或內容相同時不動，否則硬鏈接，失敗再複製
+
+    Returns:
+        'unchanged' / 'linked' / 'copied'
+    """
+    if os.path.exists(dest):
+        if os.path.samefile(source, dest):
+            return 'unchanged'
+        if os.path.getsize(source) == os.path.getsize(dest) and file_digest(source) == file_digest(dest):
+            return 'unchanged'
+        os.remove(dest)
+
+    try:
+        os.link(source, dest)
+        return 'linked'
+    except OSError:
+        # 跨文件系統、不支持硬鏈接等情況
+        shutil.copyfile(source, dest)
+        return 'copied'
+
+def verify_file(source, dest, digest):
+    """校驗目標文件與源文件字節相同"""
+    if os.path.samefile(source, dest):
+        return True
+    return file_digest(dest) == digest
+
+def publish(paths, targets):
+    """
+    把已生成的文件放到每個輸出目標
+
+    Args:
+        paths: 已生成的文件路徑（都在同一個源目錄中）
+        targets: 輸出目錄列表；與源目錄相同的目標會被跳過
+
+    Returns:
+        {'unchanged': n, 'linked': n, 'copied': n}
+
+    Raises:
+        RuntimeError: 有文件校驗失敗
+    """
+    stats = {'unchanged': 0, 'linked': 0, 'copied': 0}
+    failed = []
+
+    for source in paths:
+        digest = None
+        for target in targets:
+            os.makedirs(target, exist_ok=True)
+            if os.path.samefile(os.path.dirname(os.path.abspath(source)), target):
+                continue
+
+            dest = os.path.join(target, os.path.basename(source))
+            stats[place_file(source, dest)] += 1
+
+            if digest is None and not os.path.samefile(source, dest):
+                digest = file_digest(source)
+            if not verify_file(source, dest, digest):
+                failed.append(dest)
+
+    if failed:
+        raise RuntimeError(f"以下文件校驗失敗: {', '.join(failed)}")
+
+    return stats
+
+def add_target_arguments(parser):
+    """給頭像腳本添加輸出目標參數"""
+    parser.add_argument('--target', action='append', dest='targets', metavar='DIR',
+                        help=f'額外的輸出目錄，可重複（默認 {os.path.relpath(PUBLIC_AVATARS_DIR, JUDOU_DIR)}）')
+    parser.add_argument('--no-publish', action='store_true',
+                        help='只輸出到 avatars/，不放到其他目錄')
+
+def target_dirs(args):
+    """根據參數返回輸出目標列表"""
+    if args.no_publish:
+        return []
+    return args.targets or [PUBLIC_AVATARS_DIR]
+
+def report(stats, targets):
+    print(f"\n輸出目標: {', '.join(os.path.relpath(t) for t in targets)}")
+    print(f"  硬鏈接 {stats['linked']} 個，複製 {stats['copied']} 個，已是最新 {stats['unchanged']} 個，全部校驗通過")
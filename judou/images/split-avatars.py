@@ -6,13 +6,71 @@
 使用方法：
 1. 將合併圖片保存為 avatars-combined.png（與此腳本同目錄）
 2. 運行：python3 split-avatars.py
-3. 頭像將保存到 avatars/ 文件夾
+   並行編碼：python3 split-avatars.py --jobs 0（0 = 使用全部 CPU 核心）
+   自動裁剪：python3 split-avatars.py --auto-trim（按每格實際內容裁成居中的正方形）
+   同時打包圖集：python3 split-avatars.py --atlas --atlas-sizes 64,128
+   只輸出到本目錄：python3 split-avatars.py --no-publish
+   PNG 編碼檔位：python3 split-avatars.py --png-tier max --png-report
+3. 頭像將保存到 avatars/ 文件夾，並以硬鏈接（或複製）放到 app/public/images/avatars
+
+自動裁剪：整張圖只計算一次內容遮罩（有透明通道時用 alpha，否則用與背景色的差異），
+每格用 getbbox 找出內容的最小包圍框，再擴成居中的正方形，不需要手動維護 custom_padding。
 """
 
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from sprite_atlas import add_atlas_arguments, atlas_options, write_atlas
+from publish_targets import add_target_arguments, publish, report, target_dirs
+from png_tiers import add_tier_arguments, baseline_size, encode_png, print_savings
+from phase_timing import new_phases, print_phases, sum_phases, timed
+from auto_trim import add_trim_arguments, content_mask, trim_box
+import argparse
+import io
 import os
 
-def split_avatars(input_path, output_dir, cols=6, rows=3, default_padding=0.08):
+# 工作進程中共享的原始圖片（每個進程只接收一次）
+_worker_image = None
+
+def _init_worker(image):
+    """進程池初始化：接收已解碼的圖片（以原始像素傳輸），避免每個任務重新解碼"""
+    global _worker_image
+    _worker_image = image
+
+# 不指定 --png-tier 時的 PNG 編碼設置（Pillow 默認；也是 --png-report 的參照）
+LEGACY_PNG_OPTIONS = {}
+
+def save_tile(img, box, output_path, png_tier=None, png_report=False):
+    """
+    裁剪並保存一個頭像；指定 png_tier 時按檔位編碼，否則使用 Pillow 默認設置
+    
+    返回 ((文件名, 原來編碼的字節數, 實際字節數), 各階段耗時)；png_report 為假時參照字節數為 None。
+    計時在調用所在的進程內進行，並行時由工作進程隨結果返回。
+    """
+    phases = new_phases()
+    with timed(phases, 'crop'):
+        tile = img.crop(box)
+    with timed(phases, 'encode'):
+        if png_tier:
+            data = encode_png(tile, png_tier)
+        else:
+            buffer = io.BytesIO()
+            tile.save(buffer, "PNG", **LEGACY_PNG_OPTIONS)
+            data = buffer.getvalue()
+    with timed(phases, 'write'):
+        with open(output_path, 'wb') as f:
+            f.write(data)
+    size = len(data)
+    baseline = None
+    if png_report:
+        baseline = baseline_size(tile, **LEGACY_PNG_OPTIONS) if png_tier else size
+    return (os.path.basename(output_path), baseline, size), phases
+
+def _save_tile_in_worker(box, output_path, png_tier, png_report):
+    return save_tile(_worker_image, box, output_path, png_tier, png_report)
+
+def split_avatars(input_path, output_dir, cols=6, rows=3, default_padding=0.08, jobs=1,
+                  auto_trim=False, threshold=24, margin=0.04, atlas=None, targets=(),
+                  png_tier=None, png_report=False):
     """
     分割頭像圖片
     
@@ -22,12 +80,23 @@ def split_avatars(input_path, output_dir, cols=6, rows=3, default_padding=0.08):
         cols: 列數（默認 6）
         rows: 行數（默認 3）
         default_padding: 默認邊距比例（默認 8%）
+        jobs: 並行進程數（默認 1，即串行）
+        auto_trim: 按內容自動裁剪成正方形（忽略 padding 設置）
+        threshold: 自動裁剪時判斷為內容的 alpha / 背景差異閾值（0-255）
+        margin: 自動裁剪時在內容四周保留的比例
+        atlas: (尺寸列表, 格式列表)；提供時把分割出的頭像打包成 avatars-atlas 圖集
+        targets: 其他輸出目錄；生成的文件以硬鏈接或複製放到這些目錄
+        png_tier: PNG 編碼檔位（fast / balanced / max；默認使用 Pillow 默認設置）
+        png_report: 列出每個文件相對原來的編碼（Pillow 默認）節省的字節數
     """
     # 創建輸出目錄
     os.makedirs(output_dir, exist_ok=True)
     
     # 打開圖片
-    img = Image.open(input_path)
+    decode = new_phases()
+    with timed(decode, 'decode'):
+        img = Image.open(input_path)
+        img.load()
     width, height = img.size
     
     # 計算每個頭像的尺寸
@@ -36,7 +105,11 @@ def split_avatars(input_path, output_dir, cols=6, rows=3, default_padding=0.08):
     
     print(f"圖片尺寸: {width} x {height}")
     print(f"格子尺寸: {avatar_width} x {avatar_height}")
-    print(f"默認裁剪邊距: {default_padding*100:.0f}%")
+    if auto_trim:
+        print(f"自動裁剪: 閾值 {threshold}，留白 {margin*100:.0f}%")
+        mask = content_mask(img, threshold)
+    else:
+        print(f"默認裁剪邊距: {default_padding*100:.0f}%")
     print(f"總數: {cols} x {rows} = {cols * rows} 個頭像")
     print()
     
@@ -73,39 +146,84 @@ def split_avatars(input_path, output_dir, cols=6, rows=3, default_padding=0.08):
     }
     
     count = 0
+    tasks = []
     for row in range(rows):
         for col in range(cols):
-            # 獲取當前頭像的裁剪比例
-            padding_ratio = custom_padding.get(count, default_padding)
-            padding_x = int(avatar_width * padding_ratio)
-            padding_y = int(avatar_height * padding_ratio)
-            
-            # 計算裁剪區域（加入 padding 去除透明邊距）
-            left = col * avatar_width + padding_x
-            top = row * avatar_height + padding_y
-            right = (col + 1) * avatar_width - padding_x
-            bottom = (row + 1) * avatar_height - padding_y
-            
-            # 裁剪頭像
-            avatar = img.crop((left, top, right, bottom))
-            
             # 生成文件名
             name = avatar_names[count] if count < len(avatar_names) else f"avatar_{count + 1}"
             output_path = os.path.join(output_dir, f"{name}.png")
             
-            # 如果有自定義裁剪，顯示提示
-            if count in custom_padding:
-                print(f"  [自定義裁剪 {padding_ratio*100:.0f}%]", end="")
+            if auto_trim:
+                # 按內容計算居中的正方形裁剪區域
+                cell = (col * avatar_width, row * avatar_height,
+                        (col + 1) * avatar_width, (row + 1) * avatar_height)
+                box = trim_box(mask, cell, margin)
+                print(f"  [自動裁剪 {box[2] - box[0]}px]", end="")
+            else:
+                # 獲取當前頭像的裁剪比例
+                padding_ratio = custom_padding.get(count, default_padding)
+                padding_x = int(avatar_width * padding_ratio)
+                padding_y = int(avatar_height * padding_ratio)
+                
+                # 計算裁剪區域（加入 padding 去除透明邊距）
+                box = (col * avatar_width + padding_x, row * avatar_height + padding_y,
+                       (col + 1) * avatar_width - padding_x, (row + 1) * avatar_height - padding_y)
+                
+                # 如果有自定義裁剪，顯示提示
+                if count in custom_padding:
+                    print(f"  [自定義裁剪 {padding_ratio*100:.0f}%]", end="")
             
-            # 保存頭像
-            avatar.save(output_path, "PNG")
-            print(f"✓ 保存: {output_path}")
+            tasks.append((box, output_path))
+            print(f"⏳ 待渲染: {output_path}")
             
             count += 1
     
+    # 裁剪並保存（jobs > 1 時並行編碼，輸出與串行完全相同）
+    if jobs <= 1 or count <= 1:
+        saved = [save_tile(img, box, output_path, png_tier, png_report) for box, output_path in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, count), initializer=_init_worker,
+                                 initargs=(img,)) as pool:
+            boxes, paths = zip(*tasks)
+            saved = list(pool.map(_save_tile_in_worker, boxes, paths, [png_tier] * count, [png_report] * count))
+    
+    phases = sum_phases([decode] + [item[1] for item in saved])
+    saved = [row for row, _ in saved]
+    for filename, _, size in saved:
+        print(f"✓ 保存: {os.path.join(output_dir, filename)} ({size / 1024:.0f} KB)")
+    
+    if png_report:
+        print_savings(saved)
+    
+    outputs = [output_path for _, output_path in tasks]
+    
+    # 打包圖集（直接使用內存中的裁剪結果）
+    if atlas:
+        sprites = [(os.path.splitext(os.path.basename(output_path))[0], img.crop(box).convert('RGBA'))
+                   for box, output_path in tasks]
+        print()
+        outputs += write_atlas(sprites, output_dir, 'avatars-atlas', *atlas)
+    
+    # 放到其他輸出目標
+    if targets:
+        report(publish(outputs, targets), targets)
+    
+    print()
+    print_phases(phases)
     print(f"\n完成！共分割 {count} 個頭像到 {output_dir}/")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='把合併的頭像圖片分割成獨立文件')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='並行進程數（默認 1；0 = 使用全部 CPU 核心）')
+    add_trim_arguments(parser, '按每格內容自動裁剪成居中的正方形（代替固定邊距）')
+    add_atlas_arguments(parser)
+    add_target_arguments(parser)
+    add_tier_arguments(parser)
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+    atlas = atlas_options(parser, args) if args.atlas else None
+    
     # 腳本所在目錄
     script_dir = os.path.dirname(os.path.abspath(__file__))
     
@@ -119,5 +237,7 @@ if __name__ == "__main__":
         print(f"錯誤: 找不到輸入文件 {input_path}")
         print("請將合併的頭像圖片保存為 'avatars-combined.png'")
     else:
-        split_avatars(input_path, output_dir)
+        split_avatars(input_path, output_dir, jobs=jobs, auto_trim=args.auto_trim,
+                      threshold=args.threshold, margin=args.margin, atlas=atlas,
+                      targets=target_dirs(args), png_tier=args.png_tier, png_report=args.png_report)
 
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+句豆頭像 / 隊伍徽章圖集打包
+
+把一組頭像按網格打包成一張圖集（每個請求的尺寸各一張），並輸出坐標表：
+- {name}.json：每個頭像在網格中的位置及各尺寸圖集的文件名
+- {name}.css：.{name}[data-sprite="書法豆"] 的 background-position（百分比，與顯示尺寸無關）
+頭像選擇頁面只需要請求一張圖片：app 的頭像 Store 會讀取 images/avatars/avatars-atlas.json，
+按坐標表從圖集中顯示頭像；沒有圖集或圖集中缺少某個頭像時，回退到單個文件。
+
+使用方法：
+1. 打包已有的頭像文件夾：python3 sprite_atlas.py avatars
+2. 打包隊伍徽章：python3 sprite_atlas.py team-badges --sizes 64,128 --formats png,webp
+3. split-avatars.py / apply-crop-config.py 可加 --atlas 在生成頭像後直接打包
+"""
+
+from PIL import Image, ImageOps
+import argparse
+import json
+import math
+import os
+
+# 默認每格尺寸（像素）和格式
+DEFAULT_ATLAS_SIZES = (128,)
+DEFAULT_ATLAS_FORMATS = ('png',)
+
+def parse_list(value, cast=str):
+    """解析逗號分隔的參數"""
+    return tuple(cast(item.strip()) for item in value.split(',') if item.strip())
+
+def load_sprites(input_dir):
+    """讀取文件夾中的所有 PNG，按文件名排序，返回 [(名稱, 圖片)]"""
+    sprites = []
+    for filename in sorted(os.listdir(input_dir)):
+        stem, ext = os.path.splitext(filename)
+        # 跳過多尺寸變體（書法豆-64.png）和已生成的圖集
+        if ext.lower() != '.png' or stem.rsplit('-', 1)[-1].isdigit():
+            continue
+        with Image.open(os.path.join(input_dir, filename)) as img:
+            sprites.append((stem, img.convert('RGBA')))
+    return sprites
+
+def grid_shape(count):
+    """接近正方形的網格：返回 (列數, 行數)"""
+    cols = max(1, math.ceil(math.sqrt(count)))
+    return cols, max(1, math.ceil(count / cols))
+
+def build_atlas(sprites, cell_size, cols):
+    """把所有頭像縮放到 cell_size 的正方形格子並拼成一張圖集"""
+    rows = max(1, math.ceil(len(sprites) / cols))
+    atlas = Image.new('RGBA', (cols * cell_size, rows * cell_size), (0, 0, 0, 0))
+
+    for index, (_, image) in enumerate(sprites):
+        # 非正方形的圖片居中放入格子，四周透明
+        cell = ImageOps.pad(image, (cell_size, cell_size), Image.Resampling.LANCZOS, color=(0, 0, 0, 0))
+        atlas.paste(cell, ((index % cols) * cell_size, (index // cols) * cell_size))
+
+    return atlas
+
+def atlas_css(name, cols, rows, frames, image_file):
+    """生成 CSS：背景按網格百分比定位，元素可以任意顯示尺寸"""
+    lines = [
+        f".{name} {{",
+        f"  background-image: url('{image_file}');",
+        f"  background-size: {cols * 100}% {rows * 100}%;",
+        "  background-repeat: no-repeat;",
+        "}",
+    ]
+    for sprite, frame in frames.items():
+        x = frame['col'] * 100 / (cols - 1) if cols > 1 else 0
+        y = frame['row'] * 100 / (rows - 1) if rows > 1 else 0
+        lines.append(f'.{name}[data-sprite="{sprite}"] {{ background-position: {x:g}% {y:g}%; }}')
+    return "\n".join(lines) + "\n"
+
+def write_atlas(sprites, output_dir, name, sizes=DEFAULT_ATLAS_SIZES, formats=DEFAULT_ATLAS_FORMATS):
+    """
+    打包並保存圖集
+
+    Args:
+        sprites: [(名稱, 圖片)]
+        output_dir: 輸出目錄
+        name: 圖集名稱（文件名前綴，也是 CSS 類名）
+        sizes: 每格尺寸列表，每個尺寸一張圖集
+        formats: 輸出格式（png / webp）
+
+    Returns:
+        生成的所有文件路徑（各尺寸圖集、JSON、CSS）
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cols, rows = grid_shape(len(sprites))
+    frames = {sprite: {'index': i, 'col': i % cols, 'row': i // cols} for i, (sprite, _) in enumerate(sprites)}
+    images = []
+
+    for size in sorted(sizes, reverse=True):
+        atlas = build_atlas(sprites, size, cols)
+        for fmt in formats:
+            filename = f"{name}-{size}.{fmt}"
+            path = os.path.join(output_dir, filename)
+            if fmt == 'webp':
+                atlas.save(path, "WEBP", lossless=True, method=6)
+            else:
+                atlas.save(path, "PNG", optimize=True)
+            images.append({'file': filename, 'cell_size': size, 'format': fmt,
+                           'width': atlas.width, 'height': atlas.height,
+                           'bytes': os.path.getsize(path)})
+            print(f"✓ 圖集: {path} ({atlas.width} x {atlas.height}, {images[-1]['bytes'] / 1024:.0f} KB)")
+
+    map_path = os.path.join(output_dir, f"{name}.json")
+    with open(map_path, 'w', encoding='utf-8') as f:
+        json.dump({'name': name, 'cols': cols, 'rows': rows, 'images': images, 'frames': frames},
+                  f, ensure_ascii=False, indent=2)
+
+    # CSS 使用最大尺寸的第一種格式，縮小顯示時保持清晰
+    css_path = os.path.join(output_dir, f"{name}.css")
+    with open(css_path, 'w', encoding='utf-8') as f:
+        f.write(atlas_css(name, cols, rows, frames, images[0]['file']))
+
+    print(f"✓ 坐標表: {map_path}、{css_path}（{len(sprites)} 個，{cols} x {rows} 網格）")
+    return [os.path.join(output_dir, image['file']) for image in images] + [map_path, css_path]
+
+def add_atlas_arguments(parser):
+    """給頭像腳本添加圖集相關參數"""
+    parser.add_argument('--atlas', action='store_true',
+                        help='同時把頭像打包成圖集（含 JSON / CSS 坐標表）')
+    parser.add_argument('--atlas-sizes', default=','.join(map(str, DEFAULT_ATLAS_SIZES)),
+                        help='圖集每格尺寸，逗號分隔（默認 128）')
+    parser.add_argument('--atlas-formats', default=','.join(DEFAULT_ATLAS_FORMATS),
+                        help='圖集格式，逗號分隔：png、webp（默認 png）')
+
+def atlas_options(parser, args):
+    """校驗並返回 (尺寸, 格式)"""
+    try:
+        sizes = parse_list(args.atlas_sizes, int)
+    except ValueError:
+        parser.error(f'--atlas-sizes 格式錯誤: {args.atlas_sizes}')
+    formats = parse_list(args.atlas_formats.lower())
+    if not sizes or any(size <= 0 for size in sizes):
+        parser.error('--atlas-sizes 必須都大於 0')
+    if not formats or any(fmt not in ('png', 'webp') for fmt in formats):
+        parser.error('--atlas-formats 只支持: png, webp')
+    return sizes, formats
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='把頭像 / 徽章文件夾打包成圖集')
+    parser.add_argument('input_dir', help='頭像文件夾（如 avatars、team-badges）')
+    parser.add_argument('--output-dir', help='輸出目錄（默認與輸入相同）')
+    parser.add_argument('--name', help='圖集名稱（默認為文件夾名 + -atlas）')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_ATLAS_SIZES)),
+                        help='每格尺寸，逗號分隔（默認 128）')
+    parser.add_argument('--formats', default=','.join(DEFAULT_ATLAS_FORMATS),
+                        help='格式，逗號分隔：png、webp（默認 png）')
+    args = parser.parse_args()
+    args.atlas_sizes, args.atlas_formats = args.sizes, args.formats
+    sizes, formats = atlas_options(parser, args)
+
+    input_dir = args.input_dir.rstrip('/')
+    if not os.path.isdir(input_dir):
+        print(f"錯誤: 找不到文件夾 {input_dir}")
+    else:
+        sprites = load_sprites(input_dir)
+        if not sprites:
+            print(f"錯誤: {input_dir} 中沒有 PNG 文件")
+        else:
+            name = args.name or f"{os.path.basename(input_dir)}-atlas"
+            write_atlas(sprites, args.output_dir or input_dir, name, sizes, formats)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+導入工具基準測試（完全離線）
+
+用本地替身（supabase_standin.py）代替真實的 Supabase 項目，生成 1k / 10k / 100k 詞的
+合成詞表，分別用 import_hsk_to_supabase.py 的每種模式導入，記錄耗時、吞吐量和請求數。
+不需要 Service Role Key，也不會連接 SUPABASE_URL。
+
+- 默認進程內運行（StandinClient）；--http 時啟動本地 HTTP 替身，通過 supabase-py 發送真實請求
+- 替身的延遲、抖動和唯一約束衝突行為可配置，見 --latency-ms / --conflicts 等參數
+- 每次導入後檢查替身中的行數與詞表一致
+
+使用方法：
+  python3 benchmark_import.py                                   # 全部模式 × 1k / 10k / 100k
+  python3 benchmark_import.py --latency-ms 20 --jitter-ms 10    # 模擬網絡延遲
+  python3 benchmark_import.py --sizes 10000 --modes bulk,concurrent,rpc --preexisting 0.5
+  python3 benchmark_import.py --http                            # 經 HTTP 走 supabase-py 客戶端
+  python3 benchmark_import.py --baseline old.json               # 與之前的結果比較
+"""
+
+from contextlib import redirect_stdout
+from datetime import datetime
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import supabase_standin
+from import_profiler import ImportProfiler
+from supabase_standin import StandinClient, StandinDatabase, add_standin_arguments, standin_options
+
+# 默認測試的詞表大小和模式
+DEFAULT_SIZES = (1000, 10000, 100000)
+MODES = ('serial', 'bulk', 'concurrent', 'rpc')
+
+# 逐詞模式每個詞 2-3 次請求，超過此詞數默認跳過
+DEFAULT_SERIAL_LIMIT = 10000
+
+# 合成詞語使用的字（常用漢字區間）
+CHAR_RANGE = (0x4E00, 0x9FA5)
+
+
+def load_importer(http):
+    """
+    載入導入腳本
+
+    腳本頂層需要 supabase 庫；進程內模式不會用到它，沒有安裝時以替身模塊代替
+    （替身提供同名的 create_client / Client）。--http 模式需要真實的 supabase 庫。
+    """
+    if importlib.util.find_spec('supabase') is None:
+        if http:
+            print("❌ --http 模式需要安裝 supabase 庫：pip3 install supabase")
+            sys.exit(1)
+        sys.modules['supabase'] = supabase_standin
+
+    path = os.path.join(SCRIPT_DIR, 'import_hsk_to_supabase.py')
+    spec = importlib.util.spec_from_file_location('import_hsk_to_supabase', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_words(count, seed=0, duplicate_rate=0.02):
+    """
+    生成合成詞表：6 個第二層級，每個 20 個第三層級，詞長 2-4 字；
+    按 duplicate_rate 讓部分詞在其他分組再次出現（覆蓋「已存在」的統計路徑）
+    """
+    rng = random.Random(seed)
+    seen = set()
+    unique = []
+    while len(unique) < count:
+        word = ''.join(chr(rng.randint(*CHAR_RANGE)) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            unique.append(word)
+
+    words = []
+    for i, word in enumerate(unique):
+        if i and rng.random() < duplicate_rate:
+            word = unique[rng.randrange(i)]
+        level = i * 6 // count
+        unit = (i * 120 // count) % 20
+        words.append({'word': word, 'level_2_tag': f"L{level + 1}", 'level_3_tag': f"L{level + 1}單元{unit + 1}"})
+    return words
+
+
+def seed_database(db, words, fraction, importer):
+    """按比例預先寫入 vocabulary（模擬詞庫中已有部分詞）"""
+    unique = list(dict.fromkeys(item['word'] for item in words))
+    for word in unique[:int(len(unique) * fraction)]:
+        db.add_row('vocabulary', {'word': word, **importer.DEFAULT_VOCAB_FIELDS})
+
+
+def make_client(db, http, importer):
+    """返回 (客戶端, HTTP 服務器或 None)"""
+    if not http:
+        return StandinClient(db), None
+    server, url = supabase_standin.start_server(db)
+    return importer.create_client(url, supabase_standin.STANDIN_KEY), server
+
+
+def run_mode(importer, client, mode, words, chunk_size, concurrency):
+    """按導入腳本的順序執行一次導入，返回導入統計"""
+    if mode == 'rpc':
+        return importer.import_words_rpc(client, words)
+    if mode == 'concurrent':
+        client = importer.with_retries(client)
+
+    wordlist_id, _ = importer.get_or_create_wordlist(client)
+    importer.create_level_tags(client, wordlist_id, words)
+    if mode == 'concurrent':
+        stats = importer.import_words_concurrent(client, wordlist_id, words, chunk_size, concurrency)
+    elif mode == 'bulk':
+        stats = importer.import_words_bulk(client, wordlist_id, words, chunk_size)
+    else:
+        stats = importer.import_words_serial(client, wordlist_id, words, chunk_size)
+    client.table('wordlists').update({'total_words': len(words)}).eq('id', wordlist_id).execute()
+    return stats
+
+
+def verify(db, mode, words):
+    """檢查替身中的行數：詞彙去重後的數量、關聯（或 wordlist_vocabulary）的數量"""
+    unique_words = len({item['word'] for item in words})
+    unique_rows = len({(item['word'], item['level_2_tag'], item['level_3_tag']) for item in words})
+    if mode == 'rpc':
+        return db.count('wordlist_vocabulary') == unique_rows
+    return db.count('vocabulary') == unique_words and db.count('vocabulary_wordlist_mapping') == unique_rows
+
+
+def bench(importer, size, mode, args):
+    words = make_words(size, seed=args.seed)
+    db = StandinDatabase(seed=args.seed, **standin_options(args))
+    if mode != 'rpc':
+        seed_database(db, words, args.preexisting, importer)
+
+    client, server = make_client(db, args.http, importer)
+    profiler = ImportProfiler()
+    profiler.dataset.update({'words': len(words), 'import_words': len(words), 'mode': mode})
+    importer.PROFILER = profiler
+    importer.VOCAB_SCORES.clear()
+
+    # 請求失敗（如 --throttle-rate 下未重試的 429）只記錄，不中斷其他測試
+    failure = None
+    stats = None
+    start = time.perf_counter()
+    try:
+        with redirect_stdout(io.StringIO()), profiler.phase('import_words'):
+            stats = run_mode(importer, profiler.wrap(client), mode, words, args.chunk_size, args.concurrency)
+    except Exception as e:
+        failure = str(e)
+    finally:
+        elapsed = time.perf_counter() - start
+        importer.PROFILER = None
+        if server:
+            server.shutdown()
+
+    report = profiler.report()
+    return {
+        'mode': mode,
+        'words': size,
+        'seconds': round(elapsed, 3),
+        'words_per_second': round(size / elapsed, 1) if elapsed else None,
+        'requests': report['total_requests'],
+        'retries': report['retries'],
+        'errors': report['errors'],
+        'stats': stats,
+        'failure': failure,
+        'verified': failure is None and verify(db, mode, words),
+        'request_breakdown': {key: item['requests'] for key, item in report['requests'].items()},
+        'p95_ms': {key: item['p95_ms'] for key, item in report['requests'].items()}
+    }
+
+
+def print_results(results, baseline=None):
+    previous = {(item['words'], item['mode']): item for item in (baseline or {}).get('runs', [])}
+
+    print(f"\n{'詞數':>8}  {'模式':<12}{'耗時(秒)':>10}{'詞/秒':>12}{'請求':>10}{'重試':>6}{'錯誤':>6}  {'校驗':<4}")
+    for item in results['runs']:
+        line = (f"{item['words']:>8}  {item['mode']:<12}{item['seconds']:>10.2f}{item['words_per_second']:>12.0f}"
+                f"{item['requests']:>10}{item['retries']:>6}{item['errors']:>6}  {'✅' if item['verified'] else '❌'}")
+        old = previous.get((item['words'], item['mode']))
+        if old and old.get('words_per_second') and item['words_per_second']:
+            line += f"  {item['words_per_second'] / old['words_per_second']:.2f}x"
+        if item['failure']:
+            line += f"  失敗: {item['failure']}"
+        print(line)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='導入工具離線基準測試')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='合成詞表的詞數，逗號分隔（默認 1000,10000,100000）')
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help=f'導入模式，逗號分隔（默認 {",".join(MODES)}）')
+    parser.add_argument('--serial-limit', type=int, default=DEFAULT_SERIAL_LIMIT,
+                        help=f'serial 模式只測到此詞數（默認 {DEFAULT_SERIAL_LIMIT}；0 = 不限）')
+    parser.add_argument('--chunk-size', type=int, default=200, help='bulk / concurrent 每批詞數（默認 200）')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent 模式的並發請求數（默認 8）')
+    parser.add_argument('--preexisting', type=float, default=0.0,
+                        help='預先寫入 vocabulary 的詞的比例（0-1，默認 0）')
+    parser.add_argument('--seed', type=int, default=0, help='隨機種子（默認 0）')
+    parser.add_argument('--http', action='store_true',
+                        help='啟動本地 HTTP 替身，經 supabase-py 客戶端發送請求（需要安裝 supabase）')
+    add_standin_arguments(parser)
+    parser.add_argument('--output', default=os.path.join(SCRIPT_DIR, 'benchmark-import.json'),
+                        help='結果 JSON 文件（默認 benchmark-import.json）')
+    parser.add_argument('--baseline', help='之前的結果 JSON，打印吞吐量比（本次 / 基準）')
+    args = parser.parse_args()
+
+    try:
+        args.sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        parser.error(f'--sizes 格式錯誤: {args.sizes}')
+    args.modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = [mode for mode in args.modes if mode not in MODES]
+    if unknown:
+        parser.error(f'未知的模式: {", ".join(unknown)}（可選 {", ".join(MODES)}）')
+    if not 0 <= args.preexisting <= 1:
+        parser.error('--preexisting 必須在 0-1 之間')
+    return args
+
+
+def main():
+    args = parse_args()
+    importer = load_importer(args.http)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'transport': 'http' if args.http else 'in-process',
+        'standin': standin_options(args),
+        'chunk_size': args.chunk_size,
+        'concurrency': args.concurrency,
+        'preexisting': args.preexisting,
+        'runs': []
+    }
+
+    for size in args.sizes:
+        for mode in args.modes:
+            if mode == 'serial' and args.serial_limit and size > args.serial_limit:
+                print(f"⏭️ 跳過 serial × {size}（超過 --serial-limit {args.serial_limit}）")
+                continue
+            print(f"📐 測試 {mode} × {size} ...")
+            results['runs'].append(bench(importer, size, mode, args))
+
+    print_results(results, baseline)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n✅ 結果已寫入：{args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,14 +2,59 @@
 # -*- coding: utf-8 -*-
 """
 直接将 HSK 词表导入到 Supabase 数据库
+
+使用方法：
+  python3 import_hsk_to_supabase.py                    # 逐詞導入（每個詞 2-3 次請求）
+  python3 import_hsk_to_supabase.py --mode bulk        # 批量導入（每批 2-3 次請求）
+  python3 import_hsk_to_supabase.py --mode bulk --chunk-size 500
+  python3 import_hsk_to_supabase.py --mode concurrent --concurrency 8   # 批量 + 並發
+  python3 import_hsk_to_supabase.py --mode bulk --restart  # 忽略斷點，從頭導入
+  python3 import_hsk_to_supabase.py --mode bulk --incremental  # 只同步有變化的分組
+  python3 import_hsk_to_supabase.py --mode rpc         # 服務端函數一次導入（需要遷移 026）
+  python3 import_hsk_to_supabase.py --mode rpc --url http://127.0.0.1:54321  # 導入本地 Supabase
+  python3 import_hsk_to_supabase.py --mode bulk --profile report.json --cprofile import.prof  # 性能記錄
+
+導入中斷後直接重新運行即可：已存在的詞表（按 code）會被復用，
+斷點日誌中已完成的批次會被跳過。
+
+每次無錯誤導入後會在 .wordlist_manifests/ 記錄各 (第二層級, 第三層級) 分組的
+內容哈希；--incremental 只刪除並重新導入哈希變化或已刪除分組的關聯。
+
+rpc 模式把整個詞表作為一個 JSON 數組傳給 import_wordlist_bulk()，由數據庫在
+一個事務內創建詞表、標籤並寫入 wordlist_vocabulary：要麼全部成功，要麼全部回滾，
+因此不需要斷點日誌。rpc 模式寫入的表與其他模式（vocabulary_wordlist_mapping）不同，
+分組清單單獨保存為 <code>.rpc.json，兩者的增量同步互不影響。
+
+導入前用 data/word_scoring.py 為整個詞表離線預評分（難度 1-5、頻率 1-100），
+新詞直接寫入評分，只有標記為需要複核的詞才需要 AI 逐詞評估；--no-scoring 關閉。
+rpc 模式只寫入 wordlist_vocabulary（沒有難度 / 頻率列，也不寫 vocabulary），不做預評分。
 """
 
 import sys
 import os
-import csv
 import json
+import time
+import random
+import hashlib
+import argparse
+import cProfile
+from collections import Counter
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data'))
+from wordlist_reader import iter_wordlist
+from wordlist_manifest import MANIFEST_DIR, GroupHasher, diff_groups, load_manifest, save_manifest
+
+# 離線預評分需要 numpy；沒有安裝時新詞沿用默認值
+try:
+    import word_scoring
+except ImportError:
+    word_scoring = None
+
+from import_profiler import ImportProfiler, print_report
+
 try:
     from supabase import create_client, Client
 except ImportError:
@@ -19,15 +64,24 @@ except ImportError:
 
 # Supabase 配置
 SUPABASE_URL = "https://bjykaipbeokbbykvseyr.supabase.co"
-SUPABASE_KEY = input("请输入 Supabase Service Role Key（从 Supabase Dashboard → Settings → API → service_role key）：\n").strip()
-
-if not SUPABASE_KEY:
-    print("❌ 需要提供 Service Role Key")
-    sys.exit(1)
 
 # CSV 文件路径
 CSV_FILE = '../docs/hsk_standard_traditional.csv'
 
+# 批量模式每批詞數（vocabulary 的 in_ 查詢放在 URL 中，不宜過大）
+DEFAULT_CHUNK_SIZE = 200
+
+# 並發模式的線程數，以及遇到限流（429）時的重試設置
+DEFAULT_CONCURRENCY = 8
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+
+# rpc 模式調用的數據庫函數（supabase/migrations/026_bulk_import_wordlist_rpc.sql）
+BULK_IMPORT_RPC = 'import_wordlist_bulk'
+
+# 斷點日誌目錄（每個詞表 code 一個 JSONL 文件）
+CHECKPOINT_DIR = '.import_checkpoints'
+
 # 词表信息
 WORDLIST_INFO = {
     'name': 'HSK標準詞表 2012版',
@@ -40,178 +94,904 @@ WORDLIST_INFO = {
     }
 }
 
-print("=" * 60)
-print("🚀 HSK 詞表導入工具")
-print("=" * 60)
+# 新詞彙的默認值（稍後可以用 AI 評估）
+DEFAULT_VOCAB_FIELDS = {
+    'difficulty_level': 3,  # 默認中等難度
+    'category': '待分類',
+    'frequency': 50
+}
 
-# 连接 Supabase
-print("\n📡 連接 Supabase...")
-try:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("✅ Supabase 連接成功")
-except Exception as e:
-    print(f"❌ 連接失敗: {e}")
-    sys.exit(1)
+# --profile 時的性能記錄器（階段耗時、請求統計、重試次數），由 main() 創建
+PROFILER = None
 
-# 读取 CSV 文件
-print(f"\n📖 讀取 CSV 文件: {CSV_FILE}")
-words_data = []
+# 離線預評分結果 {詞: {'difficulty_level', 'frequency', ...}}，由 main() 填充
+VOCAB_SCORES = {}
 
-try:
-    with open(CSV_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            word = row['词语'].strip()
-            level_2 = row['第二层级'].strip() if row['第二层级'] else None
-            level_3 = row['第三层级'].strip() if row['第三层级'] else None
-            
-            if word:
-                words_data.append({
-                    'word': word,
-                    'level_2_tag': level_2,
-                    'level_3_tag': level_3
-                })
-    
-    print(f"✅ 讀取成功：{len(words_data)} 個詞彙")
-except Exception as e:
-    print(f"❌ 讀取失敗: {e}")
-    sys.exit(1)
 
-# 统计等级分布
-from collections import Counter
-level_stats = Counter(w['level_2_tag'] for w in words_data if w['level_2_tag'])
-print(f"\n📊 等級分佈:")
-for level in sorted(level_stats.keys()):
-    print(f"  {level}: {level_stats[level]} 個")
-
-# 确认导入
-print("\n" + "=" * 60)
-print("準備導入以下詞表：")
-print(f"  名稱：{WORDLIST_INFO['name']}")
-print(f"  代碼：{WORDLIST_INFO['code']}")
-print(f"  詞彙數：{len(words_data)}")
-print("=" * 60)
-
-confirm = input("\n確認導入？(yes/no): ").strip().lower()
-if confirm != 'yes':
-    print("❌ 取消導入")
-    sys.exit(0)
-
-print("\n🚀 開始導入...\n")
-
-# 1. 創建詞表
-print("1️⃣ 創建詞表記錄...")
-try:
+def profile_phase(name):
+    """記錄一個階段的耗時（沒有開啟 --profile 時不做任何事）"""
+    return PROFILER.phase(name) if PROFILER else nullcontext()
+
+
+def vocab_fields(word):
+    """新詞彙的字段：有預評分時使用評分，否則使用默認值"""
+    fields = dict(DEFAULT_VOCAB_FIELDS)
+    score = VOCAB_SCORES.get(word)
+    if score:
+        fields['difficulty_level'] = score['difficulty_level']
+        fields['frequency'] = score['frequency']
+    return fields
+
+
+def read_words(csv_file):
+    """流式讀取 CSV 詞表，逐個產出 {'word', 'level_2_tag', 'level_3_tag'}"""
+    for row in iter_wordlist(csv_file):
+        yield {
+            'word': row.word,
+            'level_2_tag': row.level_2 or None,
+            'level_3_tag': row.level_3 or None
+        }
+
+
+class ImportJournal:
+    """
+    導入斷點日誌：按詞表 code 記錄已提交的批次（JSONL，每行一條記錄）
+
+    第一行是 header（詞表 ID 和輸入簽名），之後每完成一個批次（或批次之前的步驟，
+    如增量模式刪除舊關聯）追加一行。詞表 ID 或輸入（詞語、批次大小）變化時，舊日誌作廢。
+    """
+
+    def __init__(self, code, directory=CHECKPOINT_DIR):
+        self.path = os.path.join(directory, f'{code}.jsonl')
+        self.done = set()
+        self.steps = set()
+
+    def open(self, wordlist_id, signature, restart=False):
+        """載入日誌並返回已完成的批次數；日誌不匹配時重新開始"""
+        header, done, steps = None, set(), set()
+
+        if not restart and os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # 寫到一半被中斷的最後一行
+                    if record.get('event') == 'start':
+                        header = record
+                    elif record.get('event') == 'chunk':
+                        done.add(record['index'])
+                    elif record.get('event') == 'step':
+                        steps.add(record['name'])
+
+        if header and header['wordlist_id'] == wordlist_id and header['signature'] == signature:
+            self.done, self.steps = done, steps
+        else:
+            self.done, self.steps = set(), set()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({
+                    'event': 'start',
+                    'wordlist_id': wordlist_id,
+                    'signature': signature,
+                    'started_at': datetime.now().isoformat()
+                }) + '\n')
+
+        return len(self.done)
+
+    def mark_chunk(self, index):
+        """記錄一個已提交的批次（立即落盤）"""
+        self.done.add(index)
+        self.append({'event': 'chunk', 'index': index})
+
+    def mark_step(self, name):
+        """記錄一個已完成的步驟（立即落盤）"""
+        self.steps.add(name)
+        self.append({'event': 'step', 'name': name})
+
+    def append(self, record):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        """導入全部成功後刪除日誌"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def input_signature(words_data, chunk_size):
+    """輸入簽名：詞語、層級和批次大小都不變時，批次編號才可以復用"""
+    digest = hashlib.sha256(str(chunk_size).encode('utf-8'))
+    for item in words_data:
+        digest.update(f"{item['word']}\t{item['level_2_tag']}\t{item['level_3_tag']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def iter_chunks(words_data, chunk_size, journal=None):
+    """按批次切分詞語，跳過日誌中已完成的批次，產出 (批次編號, 起始位置, 批次)"""
+    for start in range(0, len(words_data), chunk_size):
+        index = start // chunk_size
+        if journal and index in journal.done:
+            continue
+        yield index, start, words_data[start:start + chunk_size]
+
+
+def new_stats():
+    """導入統計（與逐詞模式的輸出一致）"""
+    return {'new': 0, 'existing': 0, 'mapping': 0, 'error': 0}
+
+
+def build_mapping(vocab_id, wordlist_id, item):
+    """構建詞彙-詞表關聯記錄"""
+    tag_path = [item['level_2_tag']] if item['level_2_tag'] else []
+
+    return {
+        'vocabulary_id': vocab_id,
+        'wordlist_id': wordlist_id,
+        'tag_path': json.dumps(tag_path),
+        'level_2_tag': item['level_2_tag'],
+        'level_3_tag': item['level_3_tag']
+    }
+
+
+def get_or_create_wordlist(supabase):
+    """按 code 復用已有的詞表記錄，沒有則創建，返回 (詞表 ID, 是否新建)"""
+    response = supabase.table('wordlists').select('id').eq('code', WORDLIST_INFO['code']).execute()
+    if response.data:
+        return response.data[0]['id'], False
+
     response = supabase.table('wordlists').insert(WORDLIST_INFO).execute()
-    wordlist = response.data[0]
-    wordlist_id = wordlist['id']
-    print(f"✅ 詞表創建成功: {wordlist_id}")
-except Exception as e:
-    print(f"❌ 創建詞表失敗: {e}")
-    sys.exit(1)
+    return response.data[0]['id'], True
 
-# 2. 創建層級標籤
-print("\n2️⃣ 創建層級標籤...")
-levels = sorted(set(w['level_2_tag'] for w in words_data if w['level_2_tag']))
-level_tag_map = {}
 
-for i, level in enumerate(levels):
-    try:
-        tag_data = {
-            'wordlist_id': wordlist_id,
-            'tag_level': 2,
-            'tag_code': level,
-            'tag_display_name': level,
-            'sort_order': i
+def create_level_tags(supabase, wordlist_id, words_data):
+    """創建第二層級標籤（已存在的直接復用），返回 {標籤: tag_id}"""
+    levels = sorted(set(w['level_2_tag'] for w in words_data if w['level_2_tag']))
+
+    response = supabase.table('wordlist_tags').select('id, tag_code').eq('wordlist_id', wordlist_id).execute()
+    level_tag_map = {row['tag_code']: row['id'] for row in response.data}
+
+    for i, level in enumerate(levels):
+        if level in level_tag_map:
+            print(f"  ♻️ {level}: {level_tag_map[level]}（已存在）")
+            continue
+        try:
+            tag_data = {
+                'wordlist_id': wordlist_id,
+                'tag_level': 2,
+                'tag_code': level,
+                'tag_display_name': level,
+                'sort_order': i
+            }
+            response = supabase.table('wordlist_tags').insert(tag_data).execute()
+            tag_id = response.data[0]['id']
+            level_tag_map[level] = tag_id
+            print(f"  ✅ {level}: {tag_id}")
+        except Exception as e:
+            print(f"  ❌ {level} 創建失敗: {e}")
+
+    return level_tag_map
+
+
+def group_hashes(words_data):
+    """計算每個 (第二層級, 第三層級) 分組的內容哈希"""
+    hasher = GroupHasher()
+    for item in words_data:
+        hasher.add(item['word'], item['level_2_tag'], item['level_3_tag'])
+    return hasher.hashes()
+
+
+def delete_group_mappings(supabase, wordlist_id, groups):
+    """刪除指定分組的全部關聯（分組鍵中的 '' 對應數據庫中的 NULL），返回刪除條數"""
+    deleted = 0
+
+    for level_2, level_3 in groups:
+        query = supabase.table('vocabulary_wordlist_mapping').delete().eq('wordlist_id', wordlist_id)
+        query = query.eq('level_2_tag', level_2) if level_2 else query.is_('level_2_tag', 'null')
+        query = query.eq('level_3_tag', level_3) if level_3 else query.is_('level_3_tag', 'null')
+        deleted += len(query.execute().data)
+
+    return deleted
+
+
+def import_words_serial(supabase, wordlist_id, words_data, chunk_size=DEFAULT_CHUNK_SIZE, journal=None):
+    """逐詞導入：每個詞查詢一次、必要時插入一次、再插入一條關聯"""
+    stats = new_stats()
+
+    for index, start, chunk in iter_chunks(words_data, chunk_size, journal):
+        chunk_errors = stats['error']
+
+        for i, item in enumerate(chunk, start):
+            word = item['word']
+
+            # 顯示進度
+            if (i + 1) % 100 == 0:
+                print(f"進度: {i + 1}/{len(words_data)} ({(i+1)*100//len(words_data)}%)")
+
+            try:
+                # 查找詞彙是否已存在
+                response = supabase.table('vocabulary').select('*').eq('word', word).execute()
+
+                if response.data and len(response.data) > 0:
+                    # 詞彙已存在
+                    vocab = response.data[0]
+                    stats['existing'] += 1
+                else:
+                    # 新詞彙：使用默認值（稍後可以用 AI 評估）
+                    vocab_data = {'word': word, **vocab_fields(word)}
+                    response = supabase.table('vocabulary').insert(vocab_data).execute()
+                    vocab = response.data[0]
+                    stats['new'] += 1
+
+                # 創建詞彙-詞表關聯
+                mapping_data = build_mapping(vocab['id'], wordlist_id, item)
+
+                try:
+                    supabase.table('vocabulary_wordlist_mapping').insert(mapping_data).execute()
+                    stats['mapping'] += 1
+                except Exception as e:
+                    # 如果是重複錯誤（23505），忽略
+                    if '23505' not in str(e):
+                        raise e
+
+            except Exception as e:
+                stats['error'] += 1
+                if stats['error'] <= 10:  # 只顯示前10個錯誤
+                    print(f"  ❌ 處理失敗: {word} - {e}")
+
+        # 整批無錯誤才記入斷點，有錯誤的批次下次重跑
+        if journal and stats['error'] == chunk_errors:
+            journal.mark_chunk(index)
+
+    return stats
+
+
+def lookup_vocabulary(supabase, words):
+    """
+    解析一組（不重複的）詞語的 vocabulary ID，返回 (已存在 {詞: id}, 新插入 {詞: id})
+
+    先用一次 in_ 查詢找出已存在的詞，再以 word 為衝突目標批量 upsert 缺少的詞。
+    """
+    response = supabase.table('vocabulary').select('id, word').in_('word', words).execute()
+    found = {row['word']: row['id'] for row in response.data}
+    missing = [word for word in words if word not in found]
+    inserted = {}
+
+    if missing:
+        response = supabase.table('vocabulary').upsert(
+            [{'word': word, **vocab_fields(word)} for word in missing],
+            on_conflict='word',
+            ignore_duplicates=True
+        ).execute()
+        inserted = {row['word']: row['id'] for row in response.data}
+
+        # 並發寫入時可能被其他進程搶先插入，補查一次
+        raced = [word for word in missing if word not in inserted]
+        if raced:
+            response = supabase.table('vocabulary').select('id, word').in_('word', raced).execute()
+            found.update({row['word']: row['id'] for row in response.data})
+
+    return found, inserted
+
+
+def resolve_vocabulary_chunk(supabase, chunk, vocab_ids, stats):
+    """
+    解析一批詞語的 vocabulary ID
+
+    vocab_ids 跨批次共享：同一個詞在詞表中重複出現時，第二次起按「已存在」計算，
+    與逐詞模式的統計一致。
+    """
+    pending = list(dict.fromkeys(item['word'] for item in chunk if item['word'] not in vocab_ids))
+
+    if pending:
+        found, inserted = lookup_vocabulary(supabase, pending)
+    else:
+        found, inserted = {}, {}
+
+    # 按原始順序統計，保證與逐詞模式一致
+    for item in chunk:
+        word = item['word']
+        if word in inserted:
+            stats['new'] += 1
+            vocab_ids[word] = inserted.pop(word)
+        elif word in found or word in vocab_ids:
+            stats['existing'] += 1
+            vocab_ids.setdefault(word, found.get(word))
+        else:
+            stats['error'] += 1
+
+
+def build_mappings(wordlist_id, chunk, vocab_ids):
+    """構建一批關聯記錄，跳過未能解析 ID 的詞"""
+    return [
+        build_mapping(vocab_ids[item['word']], wordlist_id, item)
+        for item in chunk
+        if vocab_ids.get(item['word'])
+    ]
+
+
+def mapping_key(mapping):
+    """關聯的唯一鍵（NULL 標籤也參與比較）"""
+    return mapping['vocabulary_id'], mapping.get('level_2_tag'), mapping.get('level_3_tag')
+
+
+def upsert_mappings(supabase, mappings):
+    """
+    批量插入一個詞表的關聯，返回實際新建的條數
+
+    HSK 詞表的 level_3_tag 為 NULL，而唯一約束中的 NULL 互不衝突，
+    ON CONFLICT 跳不過這些重複關聯；因此先查出這些詞已有的關聯並排除（批內重複也排除），
+    剩下的再以 ignore_duplicates 插入。
+    """
+    if not mappings:
+        return 0
+
+    response = supabase.table('vocabulary_wordlist_mapping').select(
+        'vocabulary_id, level_2_tag, level_3_tag'
+    ).eq('wordlist_id', mappings[0]['wordlist_id']).in_(
+        'vocabulary_id', list(dict.fromkeys(m['vocabulary_id'] for m in mappings))
+    ).execute()
+    seen = {mapping_key(row) for row in response.data}
+
+    pending = []
+    for mapping in mappings:
+        key = mapping_key(mapping)
+        if key not in seen:
+            seen.add(key)
+            pending.append(mapping)
+
+    if not pending:
+        return 0
+
+    response = supabase.table('vocabulary_wordlist_mapping').upsert(
+        pending,
+        on_conflict='vocabulary_id,wordlist_id,level_2_tag,level_3_tag',
+        ignore_duplicates=True
+    ).execute()
+    return len(response.data)
+
+
+def insert_mappings_chunk(supabase, wordlist_id, chunk, vocab_ids, stats):
+    """批量插入一批詞彙-詞表關聯"""
+    stats['mapping'] += upsert_mappings(supabase, build_mappings(wordlist_id, chunk, vocab_ids))
+
+
+def import_words_bulk(supabase, wordlist_id, words_data, chunk_size=DEFAULT_CHUNK_SIZE, journal=None):
+    """批量導入：每批詞語只需 2-3 次請求（查詢、upsert、關聯）"""
+    stats = new_stats()
+    vocab_ids = {}
+    total = len(words_data)
+
+    for index, start, chunk in iter_chunks(words_data, chunk_size, journal):
+        before = dict(stats)
+        try:
+            resolve_vocabulary_chunk(supabase, chunk, vocab_ids, stats)
+            insert_mappings_chunk(supabase, wordlist_id, chunk, vocab_ids, stats)
+            if journal:
+                journal.mark_chunk(index)
+        except Exception as e:
+            # 失敗批次的每個詞只按錯誤計算一次，撤銷已計入的新增 / 已存在
+            stats.update(before)
+            stats['error'] += len(chunk)
+            print(f"  ❌ 第 {start + 1}-{start + len(chunk)} 個詞處理失敗: {e}")
+
+        done = start + len(chunk)
+        print(f"進度: {done}/{total} ({done*100//total}%)")
+
+    return stats
+
+
+def is_rate_limited(error):
+    """判斷是否為限流錯誤（HTTP 429 / 503）"""
+    code = str(getattr(error, 'code', '') or '')
+    message = str(error).lower()
+    return code in ('429', '503') or '429' in message or 'rate limit' in message or 'too many requests' in message
+
+
+def with_backoff(func, *args, retries=MAX_RETRIES):
+    """執行請求，遇到限流時按指數退避重試（帶隨機抖動），其他錯誤直接拋出"""
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except Exception as e:
+            if attempt == retries or not is_rate_limited(e):
+                raise
+            delay = BACKOFF_BASE_SECONDS * (2 ** attempt) * (1 + random.random())
+            if PROFILER:
+                PROFILER.record_retry()
+            print(f"  ⏳ 觸發限流，{delay:.1f} 秒後重試（第 {attempt + 1}/{retries} 次）")
+            time.sleep(delay)
+
+
+class BackoffClient:
+    """Supabase 客戶端包裝：每個請求的 execute() 都經 with_backoff 執行（並發模式使用）"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, name):
+        return BackoffQuery(self._client.table(name))
+
+    def rpc(self, name, params=None):
+        return BackoffQuery(self._client.rpc(name, params or {}))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class BackoffQuery:
+    """查詢構建器包裝：鏈式調用照常轉發，execute() 遇到限流時重試"""
+
+    def __init__(self, builder):
+        self._builder = builder
+
+    def execute(self):
+        return with_backoff(self._builder.execute)
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return BackoffQuery(result) if hasattr(result, 'execute') else result
+
+        return call
+
+
+def with_retries(supabase):
+    """返回所有請求都帶限流重試的客戶端（已包裝的直接返回）"""
+    return supabase if isinstance(supabase, BackoffClient) else BackoffClient(supabase)
+
+
+def import_words_concurrent(supabase, wordlist_id, words_data,
+                            chunk_size=DEFAULT_CHUNK_SIZE, concurrency=DEFAULT_CONCURRENCY, journal=None):
+    """
+    並發導入：批量請求經有界線程池並行發送
+
+    所有線程共用同一個 Supabase 客戶端（即同一個 keep-alive 連接池），每個請求遇到限流時單獨重試。
+    先把去重後的詞語分批並行解析 ID，再把關聯分批並行插入；
+    每個詞只在一個批次中出現，批次之間不會互相搶插，統計結果與逐詞模式一致。
+    """
+    supabase = with_retries(supabase)
+    stats = new_stats()
+    pending = list(iter_chunks(words_data, chunk_size, journal))
+    pending_words = [item for _, _, chunk in pending for item in chunk]
+    if not pending_words:
+        return stats
+
+    # 1. 並行解析去重後的詞語
+    unique_words = list(dict.fromkeys(item['word'] for item in pending_words))
+    word_chunks = [unique_words[i:i + chunk_size] for i in range(0, len(unique_words), chunk_size)]
+    found, inserted = {}, {}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(lookup_vocabulary, supabase, chunk): chunk for chunk in word_chunks}
+        done = 0
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                chunk_found, chunk_inserted = future.result()
+                found.update(chunk_found)
+                inserted.update(chunk_inserted)
+            except Exception as e:
+                print(f"  ❌ {len(chunk)} 個詞解析失敗（{chunk[0]} …）: {e}")
+            done += len(chunk)
+            print(f"解析進度: {done}/{len(unique_words)} ({done*100//len(unique_words)}%)")
+
+    # 按原始順序統計：首次出現按查詢結果計算，重複出現按「已存在」計算
+    # 每批單獨計數，關聯插入失敗時整批改按錯誤計算（每個詞只計一次）
+    vocab_ids = {}
+    chunk_stats = {}
+    for index, _, chunk in pending:
+        counts = chunk_stats[index] = new_stats()
+        for item in chunk:
+            word = item['word']
+            if word in vocab_ids:
+                counts['existing'] += 1
+            elif word in inserted:
+                counts['new'] += 1
+                vocab_ids[word] = inserted[word]
+            elif word in found:
+                counts['existing'] += 1
+                vocab_ids[word] = found[word]
+            else:
+                counts['error'] += 1
+
+    # 2. 並行插入關聯
+    # 批次之間先去重：NULL 標籤的重複關聯不受唯一約束保護，不能交給並行的請求各自插入
+    # 詞語未能解析的批次不記入斷點，下次重跑
+    seen = set()
+    mapping_chunks = []
+    for index, _, chunk in pending:
+        mappings = []
+        for mapping in build_mappings(wordlist_id, chunk, vocab_ids):
+            if mapping_key(mapping) not in seen:
+                seen.add(mapping_key(mapping))
+                mappings.append(mapping)
+        mapping_chunks.append((index, mappings, len(chunk), all(item['word'] in vocab_ids for item in chunk)))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            pool.submit(upsert_mappings, supabase, mappings): (index, mappings, size, resolved)
+            for index, mappings, size, resolved in mapping_chunks
         }
-        response = supabase.table('wordlist_tags').insert(tag_data).execute()
-        tag_id = response.data[0]['id']
-        level_tag_map[level] = tag_id
-        print(f"  ✅ {level}: {tag_id}")
+        done = 0
+        for future in as_completed(futures):
+            index, mappings, size, resolved = futures[future]
+            try:
+                chunk_stats[index]['mapping'] += future.result()
+                if journal and resolved:
+                    journal.mark_chunk(index)
+            except Exception as e:
+                chunk_stats[index] = {**new_stats(), 'error': size}
+                print(f"  ❌ {len(mappings)} 條關聯插入失敗: {e}")
+            done += 1
+            print(f"關聯進度: {done}/{len(mapping_chunks)} 批")
+
+    for counts in chunk_stats.values():
+        for key, value in counts.items():
+            stats[key] += value
+
+    return stats
+
+
+def import_words_rpc(supabase, words_data, sync_groups=None):
+    """
+    一次 rpc 調用導入整個詞表（詞表記錄、標籤、詞語都在服務端一個事務內完成）
+
+    Args:
+        words_data: 要寫入的詞
+        sync_groups: 增量同步時有變化或已刪除的分組鍵 [(第二層級, 第三層級)]，
+                     這些分組中不在 words_data 裡的詞會被刪除；None 表示只新增
+
+    Returns:
+        數據庫函數返回的統計 {'wordlist_id', 'tags_created', 'words_inserted', ...}
+    """
+    params = {
+        'p_wordlist': WORDLIST_INFO,
+        # 緊湊的數組形式，比逐個對象少一半以上的請求體
+        'p_words': [[item['word'], item['level_2_tag'], item['level_3_tag']] for item in words_data],
+        'p_sync_groups': [list(group) for group in sync_groups] if sync_groups is not None else None
+    }
+    return with_backoff(lambda: supabase.rpc(BULK_IMPORT_RPC, params).execute()).data
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='將 HSK 詞表導入 Supabase')
+    parser.add_argument('--mode', choices=['serial', 'bulk', 'concurrent', 'rpc'], default='serial',
+                        help='serial：逐詞導入；bulk：按批次查詢和 upsert；'
+                             'concurrent：批量請求並發發送；rpc：服務端函數一次導入（默認 serial）')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'bulk/concurrent 模式每批詞數（默認 {DEFAULT_CHUNK_SIZE}）')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'concurrent 模式的並發請求數（默認 {DEFAULT_CONCURRENCY}）')
+    parser.add_argument('--checkpoint-dir', default=CHECKPOINT_DIR,
+                        help=f'斷點日誌目錄（默認 {CHECKPOINT_DIR}）')
+    parser.add_argument('--restart', action='store_true',
+                        help='忽略已有的斷點日誌，所有批次重新導入')
+    parser.add_argument('--incremental', action='store_true',
+                        help='只同步上次導入後內容有變化的分組（沒有分組清單時全量導入）')
+    parser.add_argument('--manifest-dir', default=MANIFEST_DIR,
+                        help=f'分組哈希清單目錄（默認 {MANIFEST_DIR}；rpc 模式的清單為 <code>.rpc.json）')
+    parser.add_argument('--no-scoring', action='store_true',
+                        help='不做離線預評分，新詞使用默認難度和頻率（rpc 模式不寫評分，始終跳過）')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='REPORT.json',
+                        help='記錄各階段耗時、每個表 / 操作的請求數和延遲分佈、重試和錯誤，寫成 JSON 報告'
+                             '（默認文件名 import-profile-<詞表>-<模式>-<時間>.json）')
+    parser.add_argument('--cprofile', metavar='FILE.prof',
+                        help='同時用 cProfile 記錄函數級耗時（需要 --profile）')
+    parser.add_argument('--url', default=SUPABASE_URL,
+                        help='Supabase 項目地址（本地測試可用 supabase start 的 http://127.0.0.1:54321）')
+    parser.add_argument('--csv', default=CSV_FILE, help=f'CSV 文件路徑（默認 {CSV_FILE}）')
+    args = parser.parse_args()
+
+    if args.chunk_size < 1:
+        parser.error('--chunk-size 必須大於 0')
+    if args.concurrency < 1:
+        parser.error('--concurrency 必須大於 0')
+    if args.cprofile and not args.profile:
+        parser.error('--cprofile 需要同時指定 --profile')
+
+    return args
+
+
+def manifest_code(mode):
+    """
+    分組清單的名稱：清單記錄的是目標表中的內容，按寫入的表區分
+
+    rpc 寫 wordlist_vocabulary（<code>.rpc），其他模式寫 vocabulary_wordlist_mapping（<code>）。
+    """
+    if mode == 'rpc':
+        return f"{WORDLIST_INFO['code']}.rpc"
+    return WORDLIST_INFO['code']
+
+
+def import_rpc(supabase, words_data, args):
+    """rpc 模式：增量時只發送有變化分組的詞，成功後更新分組清單"""
+    groups = group_hashes(words_data)
+    import_words = words_data
+    sync_groups = None
+    code = manifest_code(args.mode)
+    previous = load_manifest(code, args.manifest_dir) if args.incremental else None
+
+    if args.incremental and previous is None:
+        print(f"⚠️ 沒有找到 {code} 的分組清單，進行全量導入")
+    elif args.incremental:
+        changed, removed = diff_groups(previous, groups)
+        print(f"🔍 增量同步：{len(changed)} 個分組有變化，{len(removed)} 個分組已刪除")
+        sync_groups = changed + removed
+        changed_keys = set(changed)
+        import_words = [
+            item for item in words_data
+            if (item['level_2_tag'] or '', item['level_3_tag'] or '') in changed_keys
+        ]
+
+    print(f"📡 調用 {BULK_IMPORT_RPC}()（{len(import_words)} 個詞，一次請求）...")
+    if PROFILER:
+        PROFILER.dataset['import_words'] = len(import_words)
+    start = time.perf_counter()
+    try:
+        with profile_phase('import_words'):
+            result = import_words_rpc(supabase, import_words, sync_groups)
+    except Exception as e:
+        print(f"❌ 導入失敗，數據庫已回滾: {e}")
+        if 'PGRST202' in str(e) or BULK_IMPORT_RPC in str(e):
+            print("   請確認已執行遷移 026_bulk_import_wordlist_rpc.sql")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    if PROFILER:
+        PROFILER.result = result
+
+    save_manifest(code, groups, args.manifest_dir)
+
+    print("\n" + "=" * 60)
+    print(f"✅ 導入完成！（{elapsed:.1f} 秒）")
+    print("=" * 60)
+    print(f"\n📊 統計:")
+    print(f"  新建標籤: {result['tags_created']}")
+    print(f"  新增詞語: {result['words_inserted']}")
+    print(f"  已存在詞語: {result['words_existing']}")
+    print(f"  刪除詞語: {result['words_deleted']}")
+    print(f"  詞表總詞數: {result['total_words']}")
+    print(f"\n詞表ID: {result['wordlist_id']}")
+    print(f"詞表代碼: {WORDLIST_INFO['code']}")
+    print("=" * 60)
+
+
+def run_import(args):
+    """交互式導入流程（連接、讀取、確認、導入、更新統計）"""
+    supabase_key = input("请输入 Supabase Service Role Key（从 Supabase Dashboard → Settings → API → service_role key）：\n").strip()
+
+    if not supabase_key:
+        print("❌ 需要提供 Service Role Key")
+        sys.exit(1)
+
+    print("=" * 60)
+    print("🚀 HSK 詞表導入工具")
+    print("=" * 60)
+
+    # 连接 Supabase
+    print("\n📡 連接 Supabase...")
+    try:
+        supabase: Client = create_client(args.url, supabase_key)
+        if PROFILER:
+            supabase = PROFILER.wrap(supabase)
+        # 並發模式更容易觸發限流：詞表、標籤、刪除、統計等所有請求都帶退避重試
+        if args.mode == 'concurrent':
+            supabase = with_retries(supabase)
+        print("✅ Supabase 連接成功")
     except Exception as e:
-        print(f"  ❌ {level} 創建失敗: {e}")
-
-# 3. 導入詞彙
-print(f"\n3️⃣ 導入詞彙（共 {len(words_data)} 個）...")
-print("這可能需要一些時間，請耐心等待...\n")
-
-new_vocab_count = 0
-existing_vocab_count = 0
-mapping_count = 0
-error_count = 0
-
-for i, item in enumerate(words_data):
-    word = item['word']
-    
-    # 顯示進度
-    if (i + 1) % 100 == 0:
-        print(f"進度: {i + 1}/{len(words_data)} ({(i+1)*100//len(words_data)}%)")
-    
+        print(f"❌ 連接失敗: {e}")
+        sys.exit(1)
+
+    # 读取 CSV 文件
+    print(f"\n📖 讀取 CSV 文件: {args.csv}")
     try:
-        # 查找詞彙是否已存在
-        response = supabase.table('vocabulary').select('*').eq('word', word).execute()
-        
-        if response.data and len(response.data) > 0:
-            # 詞彙已存在
-            vocab = response.data[0]
-            existing_vocab_count += 1
+        # 斷點續傳和分批需要按位置訪問，這裡一次性收集
+        with profile_phase('read_csv'):
+            words_data = list(read_words(args.csv))
+        print(f"✅ 讀取成功：{len(words_data)} 個詞彙")
+    except Exception as e:
+        print(f"❌ 讀取失敗: {e}")
+        sys.exit(1)
+
+    # 统计等级分布
+    level_stats = Counter(w['level_2_tag'] for w in words_data if w['level_2_tag'])
+    print(f"\n📊 等級分佈:")
+    for level in sorted(level_stats.keys()):
+        print(f"  {level}: {level_stats[level]} 個")
+
+    # 離線預評分：用倉庫中所有詞表的字頻和階段統計一次性計算難度和頻率
+    # （rpc 模式只寫 wordlist_vocabulary，沒有評分列）
+    if args.mode == 'rpc' and not args.no_scoring:
+        print("\nℹ️ rpc 模式只寫入 wordlist_vocabulary（沒有難度 / 頻率列），不做預評分")
+    elif not args.no_scoring:
+        if word_scoring is None:
+            print("\n⚠️ 未安裝 numpy，跳過預評分，新詞使用默認難度和頻率（pip3 install numpy）")
         else:
-            # 新詞彙：使用默認值（稍後可以用 AI 評估）
-            vocab_data = {
-                'word': word,
-                'difficulty_level': 3,  # 默認中等難度
-                'category': '待分類',
-                'frequency': 50
-            }
-            response = supabase.table('vocabulary').insert(vocab_data).execute()
-            vocab = response.data[0]
-            new_vocab_count += 1
-        
-        # 創建詞彙-詞表關聯
-        tag_path = [item['level_2_tag']] if item['level_2_tag'] else []
-        
-        mapping_data = {
-            'vocabulary_id': vocab['id'],
-            'wordlist_id': wordlist_id,
-            'tag_path': json.dumps(tag_path),
-            'level_2_tag': item['level_2_tag'],
-            'level_3_tag': item['level_3_tag']
-        }
-        
+            print(f"\n🧮 離線預評分...")
+            with profile_phase('scoring'):
+                VOCAB_SCORES.update(word_scoring.score_wordlist([w['word'] for w in words_data]))
+            word_scoring.print_summary(VOCAB_SCORES)
+
+    # 确认导入
+    print("\n" + "=" * 60)
+    print("準備導入以下詞表：")
+    print(f"  名稱：{WORDLIST_INFO['name']}")
+    print(f"  代碼：{WORDLIST_INFO['code']}")
+    print(f"  詞彙數：{len(words_data)}")
+    print(f"  模式：{args.mode}")
+    print("=" * 60)
+
+    confirm = input("\n確認導入？(yes/no): ").strip().lower()
+    if confirm != 'yes':
+        print("❌ 取消導入")
+        sys.exit(0)
+
+    print("\n🚀 開始導入...\n")
+
+    if PROFILER:
+        PROFILER.dataset['words'] = len(words_data)
+
+    if args.mode == 'rpc':
+        import_rpc(supabase, words_data, args)
+        return
+
+    # 1. 創建詞表（按 code 復用已有記錄）
+    print("1️⃣ 創建詞表記錄...")
+    try:
+        with profile_phase('create_wordlist'):
+            wordlist_id, created = get_or_create_wordlist(supabase)
+        if created:
+            print(f"✅ 詞表創建成功: {wordlist_id}")
+        else:
+            print(f"♻️ 詞表已存在，繼續導入: {wordlist_id}")
+    except Exception as e:
+        print(f"❌ 創建詞表失敗: {e}")
+        sys.exit(1)
+
+    # 2. 創建層級標籤
+    print("\n2️⃣ 創建層級標籤...")
+    with profile_phase('create_tags'):
+        create_level_tags(supabase, wordlist_id, words_data)
+
+    # 增量模式：只處理內容有變化的分組，先刪除這些分組的舊關聯
+    groups = group_hashes(words_data)
+    import_words = words_data
+    sync_groups = []
+    previous = load_manifest(manifest_code(args.mode), args.manifest_dir) if args.incremental else None
+
+    if args.incremental and previous is None:
+        print(f"\n⚠️ 沒有找到 {WORDLIST_INFO['code']} 的分組清單，進行全量導入")
+    elif args.incremental:
+        changed, removed = diff_groups(previous, groups)
+        print(f"\n🔍 增量同步：{len(changed)} 個分組有變化，{len(removed)} 個分組已刪除")
+        sync_groups = changed + removed
+        changed_keys = set(changed)
+        import_words = [
+            item for item in words_data
+            if (item['level_2_tag'] or '', item['level_3_tag'] or '') in changed_keys
+        ]
+
+    journal = ImportJournal(WORDLIST_INFO['code'], args.checkpoint_dir)
+    signature = input_signature(import_words, args.chunk_size)
+    skipped = journal.open(wordlist_id, signature, args.restart)
+
+    # 刪除舊關聯作為日誌中的一個步驟：續傳時已刪除過就不再刪除，
+    # 否則會把上次已導入批次的關聯刪掉而不再補回；刪除後之前的批次都作廢，日誌重新開始
+    if sync_groups and 'delete_mappings' in journal.steps:
+        print(f"⏭️ 斷點日誌 {journal.path}：舊關聯已在上次運行中刪除")
+    elif sync_groups:
         try:
-            supabase.table('vocabulary_wordlist_mapping').insert(mapping_data).execute()
-            mapping_count += 1
+            with profile_phase('delete_mappings'):
+                deleted = delete_group_mappings(supabase, wordlist_id, sync_groups)
+            print(f"✅ 已刪除 {deleted} 條舊關聯")
         except Exception as e:
-            # 如果是重複錯誤（23505），忽略
-            if '23505' not in str(e):
-                raise e
-    
+            print(f"❌ 刪除舊關聯失敗: {e}")
+            sys.exit(1)
+        skipped = journal.open(wordlist_id, signature, restart=True)
+        journal.mark_step('delete_mappings')
+
+    if skipped:
+        print(f"⏭️ 斷點日誌 {journal.path}：跳過已完成的 {skipped} 個批次")
+
+    # 3. 導入詞彙
+    print(f"\n3️⃣ 導入詞彙（共 {len(import_words)} 個）...")
+    if PROFILER:
+        PROFILER.dataset['import_words'] = len(import_words)
+    with profile_phase('import_words'):
+        if not import_words:
+            stats = new_stats()
+        elif args.mode == 'concurrent':
+            print(f"並發模式：每批 {args.chunk_size} 個詞，{args.concurrency} 個並發請求\n")
+            stats = import_words_concurrent(supabase, wordlist_id, import_words,
+                                            args.chunk_size, args.concurrency, journal)
+        elif args.mode == 'bulk':
+            print(f"批量模式：每批 {args.chunk_size} 個詞\n")
+            stats = import_words_bulk(supabase, wordlist_id, import_words, args.chunk_size, journal)
+        else:
+            print("這可能需要一些時間，請耐心等待...\n")
+            stats = import_words_serial(supabase, wordlist_id, import_words, args.chunk_size, journal)
+    if PROFILER:
+        PROFILER.result = stats
+
+    # 4. 更新詞表統計
+    print(f"\n4️⃣ 更新詞表統計...")
+    try:
+        with profile_phase('update_stats'):
+            supabase.table('wordlists').update({
+                'total_words': len(words_data)
+            }).eq('id', wordlist_id).execute()
+        print("✅ 統計更新成功")
     except Exception as e:
-        error_count += 1
-        if error_count <= 10:  # 只顯示前10個錯誤
-            print(f"  ❌ 處理失敗: {word} - {e}")
+        print(f"⚠️ 統計更新失敗（不影響數據）: {e}")
+
+    # 全部成功才刪除斷點日誌，否則保留供下次續傳
+    # 分組清單也只在全部成功後更新，否則下次增量會漏掉失敗的分組
+    if stats['error'] == 0:
+        journal.clear()
+        save_manifest(manifest_code(args.mode), groups, args.manifest_dir)
+    else:
+        print(f"\n⚠️ 有 {stats['error']} 個錯誤，斷點日誌保留在 {journal.path}，重新運行即可續傳")
+
+    # 完成
+    print("\n" + "=" * 60)
+    print("✅ 導入完成！")
+    print("=" * 60)
+    print(f"\n📊 統計:")
+    print(f"  新增詞彙: {stats['new']}")
+    print(f"  已存在詞彙: {stats['existing']}")
+    print(f"  創建關聯: {stats['mapping']}")
+    print(f"  錯誤: {stats['error']}")
+    print(f"\n詞表ID: {wordlist_id}")
+    print(f"詞表代碼: {WORDLIST_INFO['code']}")
+    print("\n現在你可以在遊戲中選擇這個詞表了！")
+    print("=" * 60)
+
+
+def default_profile_path(args):
+    """默認報告文件名：import-profile-<詞表>-<模式>-<時間>.json"""
+    return f"import-profile-{WORDLIST_INFO['code']}-{args.mode}-{datetime.now():%Y%m%d-%H%M%S}.json"
+
+
+def main():
+    global PROFILER
+    args = parse_args()
+
+    if not args.profile:
+        run_import(args)
+        return
+
+    PROFILER = ImportProfiler()
+    PROFILER.dataset.update({
+        'csv': args.csv,
+        'wordlist': WORDLIST_INFO['code'],
+        'mode': args.mode,
+        'chunk_size': args.chunk_size,
+        'concurrency': args.concurrency,
+        'incremental': args.incremental,
+        'scoring': args.mode != 'rpc' and not args.no_scoring
+    })
+    profile = cProfile.Profile() if args.cprofile else None
+
+    # 中途退出（sys.exit）時也寫出報告，便於分析失敗的運行
+    try:
+        if profile:
+            profile.enable()
+        run_import(args)
+    finally:
+        if profile:
+            profile.disable()
+            profile.dump_stats(args.cprofile)
+            print(f"\n📈 cProfile 已寫入：{args.cprofile}（可用 python3 -m pstats 或 snakeviz 查看）")
+        report_path = default_profile_path(args) if args.profile is True else args.profile
+        print_report(PROFILER.write_report(report_path))
+        print(f"📈 性能報告已寫入：{report_path}")
 
-# 4. 更新詞表統計
-print(f"\n4️⃣ 更新詞表統計...")
-try:
-    supabase.table('wordlists').update({
-        'total_words': len(words_data)
-    }).eq('id', wordlist_id).execute()
-    print("✅ 統計更新成功")
-except Exception as e:
-    print(f"⚠️ 統計更新失敗（不影響數據）: {e}")
-
-# 完成
-print("\n" + "=" * 60)
-print("✅ 導入完成！")
-print("=" * 60)
-print(f"\n📊 統計:")
-print(f"  新增詞彙: {new_vocab_count}")
-print(f"  已存在詞彙: {existing_vocab_count}")
-print(f"  創建關聯: {mapping_count}")
-print(f"  錯誤: {error_count}")
-print(f"\n詞表ID: {wordlist_id}")
-print(f"詞表代碼: {WORDLIST_INFO['code']}")
-print("\n現在你可以在遊戲中選擇這個詞表了！")
-print("=" * 60)
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+導入工具性能記錄（import_hsk_to_supabase.py --profile 使用）
+
+- 階段耗時：讀取 CSV、預評分、創建詞表、創建標籤、刪除舊關聯、導入詞彙、更新統計
+- 請求：包裝 Supabase 客戶端，按 (表, 操作) 記錄請求數、延遲直方圖和分位數、錯誤數
+  （唯一約束衝突 23505 單獨計數，逐詞模式會忽略這類錯誤）
+- 限流重試次數
+
+報告寫成 JSON，包含數據集和模式信息，便於比較不同運行之間的導入吞吐量。
+"""
+
+import json
+import platform
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# 延遲直方圖的桶上限（毫秒），最後一個桶為「更慢」
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# 會發出請求的查詢構建方法，第一次調用的方法名即為操作類型
+OPERATIONS = ('select', 'insert', 'upsert', 'update', 'delete')
+
+
+def percentile(sorted_values, fraction):
+    """已排序列表的分位數（最近秩）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class RequestStats:
+    """單個 (表, 操作) 的請求統計"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.conflicts = 0
+
+    def report(self):
+        values = sorted(self.latencies)
+        histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for value in values:
+            bucket = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if value <= limit),
+                          len(LATENCY_BUCKETS_MS))
+            histogram[bucket] += 1
+
+        labels = [f"<={limit}ms" for limit in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            'requests': len(values),
+            'errors': self.errors,
+            'conflicts_23505': self.conflicts,
+            'total_ms': round(sum(values), 3),
+            'min_ms': round(values[0], 3) if values else 0,
+            'p50_ms': round(percentile(values, 0.5), 3),
+            'p95_ms': round(percentile(values, 0.95), 3),
+            'p99_ms': round(percentile(values, 0.99), 3),
+            'max_ms': round(values[-1], 3) if values else 0,
+            'histogram': dict(zip(labels, histogram))
+        }
+
+
+class ImportProfiler:
+    """記錄階段耗時、請求統計和重試次數（並發模式下線程安全）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.phases = {}
+        self.requests = defaultdict(RequestStats)
+        self.retries = 0
+        self.started = time.perf_counter()
+        # 數據集和運行參數（CSV、詞數、模式、批次大小等），以及導入統計
+        self.dataset = {}
+        self.result = None
+
+    @contextmanager
+    def phase(self, name):
+        """記錄一個階段的牆鐘時間（同名階段累加）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def record_request(self, table, operation, elapsed_ms, error=None):
+        with self.lock:
+            stats = self.requests[(table, operation)]
+            stats.latencies.append(elapsed_ms)
+            if error is not None:
+                if '23505' in str(error):
+                    stats.conflicts += 1
+                else:
+                    stats.errors += 1
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def wrap(self, client):
+        """返回記錄每個請求的 Supabase 客戶端包裝"""
+        return ProfiledClient(client, self)
+
+    def report(self):
+        """生成報告（可直接寫成 JSON）"""
+        requests = {f"{table}.{operation}": stats.report()
+                    for (table, operation), stats in sorted(self.requests.items())}
+        total_requests = sum(item['requests'] for item in requests.values())
+        import_seconds = self.phases.get('import_words', 0.0)
+        words = self.dataset.get('import_words', self.dataset.get('words', 0))
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'dataset': self.dataset,
+            'result': self.result,
+            'wall_seconds': round(time.perf_counter() - self.started, 3),
+            'phases': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            'words_per_second': round(words / import_seconds, 1) if import_seconds else None,
+            'total_requests': total_requests,
+            'retries': self.retries,
+            'errors': sum(item['errors'] for item in requests.values()),
+            'requests': requests
+        }
+
+    def write_report(self, path):
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+
+def print_report(report):
+    """打印階段耗時和每個 (表, 操作) 的請求摘要"""
+    print(f"\n⏱️ 階段耗時（總計 {report['wall_seconds']:.2f} 秒，含等待輸入）:")
+    for name, seconds in report['phases'].items():
+        print(f"  {name:<20}{seconds:>10.3f} 秒")
+
+    if report['requests']:
+        print(f"\n{'請求':<34}{'次數':>8}{'錯誤':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+        for key, item in report['requests'].items():
+            print(f"{key:<34}{item['requests']:>8}{item['errors']:>6}"
+                  f"{item['p50_ms']:>10.1f}{item['p95_ms']:>10.1f}{item['max_ms']:>10.1f}")
+
+    throughput = f"，{report['words_per_second']} 詞/秒" if report['words_per_second'] else ""
+    print(f"\n共 {report['total_requests']} 次請求，限流重試 {report['retries']} 次，錯誤 {report['errors']} 次{throughput}")
+
+
+class ProfiledClient:
+    """Supabase 客戶端包裝：table() / rpc() 返回記錄請求的查詢構建器"""
+
+    def __init__(self, client, profiler):
+        self._client = client
+        self._profiler = profiler
+
+    def table(self, name):
+        return ProfiledQuery(self._client.table(name), self._profiler, name)
+
+    def rpc(self, name, params=None):
+        return ProfiledQuery(self._client.rpc(name, params or {}), self._profiler, 'rpc', name)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class ProfiledQuery:
+    """
+    查詢構建器包裝：鏈式調用時記住第一個操作（select / insert / ...），
+    execute() 時記錄延遲和錯誤
+    """
+
+    def __init__(self, builder, profiler, table, operation=None):
+        self._builder = builder
+        self._profiler = profiler
+        self._table = table
+        self._operation = operation
+
+    def execute(self):
+        start = time.perf_counter()
+        error = None
+        try:
+            return self._builder.execute()
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self._profiler.record_request(self._table, self._operation or 'request', elapsed_ms, error)
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            operation = self._operation or (name if name in OPERATIONS else None)
+            if hasattr(result, 'execute'):
+                return ProfiledQuery(result, self._profiler, self._table, operation)
+            return result
+
+        return call
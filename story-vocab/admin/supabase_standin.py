@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地 Supabase / PostgREST 替身（導入工具的基準測試和離線調試使用）
+
+在內存中模擬 import_hsk_to_supabase.py 用到的表和 rpc：
+  wordlists、wordlist_tags、vocabulary、vocabulary_wordlist_mapping、wordlist_vocabulary、
+  rpc import_wordlist_bulk（與遷移 026 的語義一致）
+
+唯一約束與遷移中的定義相同，並且和 Postgres 一樣，含 NULL 的鍵互不衝突。
+可配置：
+- latency_ms / jitter_ms：每個請求的延遲（在鎖外等待，並發請求可以重疊）
+- conflicts：普通 insert 遇到唯一約束衝突時，'error' 像 PostgREST 一樣整個請求失敗（23505），
+  'ignore' 跳過衝突的行
+- race_rate：upsert（ignore_duplicates）插入的新行中，按此比例模擬「被其他進程搶先插入」
+  （行寫入了但不在響應中返回）
+- throttle_rate：按此比例返回 429，用於測試退避重試
+
+兩種用法：
+1. 進程內：StandinClient(db) 提供與 supabase-py 相同的 table() / rpc() 鏈式接口
+2. HTTP：python3 supabase_standin.py --port 54321，再用
+   python3 import_hsk_to_supabase.py --url http://127.0.0.1:54321 連接
+   （Service Role Key 隨便填一個 JWT 格式的字符串，如 standin.standin.standin）
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# 各表的唯一約束（與 supabase/migrations 中的定義一致）
+UNIQUE_KEYS = {
+    'wordlists': [('code',)],
+    'wordlist_tags': [('wordlist_id', 'tag_code')],
+    'vocabulary': [('word',)],
+    'vocabulary_wordlist_mapping': [('vocabulary_id', 'wordlist_id', 'level_2_tag', 'level_3_tag')],
+    'wordlist_vocabulary': [('wordlist_id', 'word', 'level_2_tag', 'level_3_tag')],
+}
+
+# 各表的普通（非唯一）單列索引（與遷移 007 的 idx_vocab_mapping_vocab 等一致）
+LOOKUP_COLUMNS = {
+    'vocabulary_wordlist_mapping': ('vocabulary_id',),
+}
+
+# HTTP 模式下可以用作 Service Role Key 的佔位符（supabase-py 要求 JWT 格式）
+STANDIN_KEY = 'standin.standin.standin'
+
+
+class StandinAPIError(Exception):
+    """與 postgrest APIError 相同的錯誤形式：str() 中包含錯誤碼"""
+
+    def __init__(self, code, message, status=400):
+        self.code = code
+        self.message = message
+        self.status = status
+        super().__init__(str({'code': code, 'message': message}))
+
+    def to_json(self):
+        return {'code': self.code, 'message': self.message, 'details': None, 'hint': None}
+
+
+def matches(row, filters):
+    """filters: [(列, 操作, 值)]，操作為 eq / neq / is / in"""
+    for column, op, value in filters:
+        current = row.get(column)
+        if op == 'eq' and not same_value(current, value):
+            return False
+        if op == 'neq' and same_value(current, value):
+            return False
+        if op == 'is' and current is not None:
+            return False
+        if op == 'in' and not any(same_value(current, v) for v in value):
+            return False
+    return True
+
+
+def same_value(current, value):
+    """HTTP 模式的過濾值都是字符串，與存儲的值按字符串比較"""
+    return current is not None and (current == value or str(current) == str(value))
+
+
+def project(row, columns):
+    """按 select 的列名返回行（'*' 為全部列）"""
+    if columns.strip() == '*':
+        return dict(row)
+    return {name: row.get(name) for name in (c.strip() for c in columns.split(',')) if name}
+
+
+class StandinDatabase:
+    """內存中的表，所有寫操作在一把鎖內完成（每個請求相當於一個事務）"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, conflicts='error', race_rate=0.0, throttle_rate=0.0,
+                 seed=0):
+        if conflicts not in ('error', 'ignore'):
+            raise ValueError(f"conflicts 只能是 error 或 ignore: {conflicts}")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.conflicts = conflicts
+        self.race_rate = race_rate
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tables = {name: [] for name in UNIQUE_KEYS}
+        # 唯一索引：表 → 約束列 → {鍵: 行}
+        self.indexes = {name: {key: {} for key in keys} for name, keys in UNIQUE_KEYS.items()}
+        # 普通索引：表 → 列 → {值: [行]}
+        self.lookups = {name: {column: {} for column in LOOKUP_COLUMNS.get(name, ())} for name in UNIQUE_KEYS}
+        self.requests = 0
+
+    # ---------- 內部工具 ----------
+
+    def wait(self):
+        """模擬網絡和數據庫延遲；按比例返回 429"""
+        with self.lock:
+            self.requests += 1
+            throttled = self.throttle_rate and self.random.random() < self.throttle_rate
+            delay = self.latency_ms + (self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+        if throttled:
+            raise StandinAPIError('429', 'Too Many Requests', status=429)
+
+    def table(self, name):
+        if name not in self.tables:
+            raise StandinAPIError('42P01', f'relation "{name}" does not exist', status=404)
+        return self.tables[name]
+
+    def unique_keys(self, name, row):
+        """行的各個唯一鍵；含 NULL 的鍵不參與約束（與 Postgres 一致）"""
+        for columns in UNIQUE_KEYS.get(name, []):
+            key = tuple(row.get(c) for c in columns)
+            if None not in key:
+                yield columns, key
+
+    def find_conflict(self, name, row, columns=None):
+        for cols, key in self.unique_keys(name, row):
+            if columns is None or cols == columns:
+                existing = self.indexes[name][cols].get(key)
+                if existing is not None:
+                    return existing
+        return None
+
+    def add_row(self, name, row):
+        row = {'id': str(uuid.uuid4()), **row}
+        self.tables[name].append(row)
+        for cols, key in self.unique_keys(name, row):
+            self.indexes[name][cols][key] = row
+        for column, index in self.lookups[name].items():
+            index.setdefault(row.get(column), []).append(row)
+        return row
+
+    def reindex(self, name):
+        self.indexes[name] = {cols: {} for cols in UNIQUE_KEYS.get(name, [])}
+        self.lookups[name] = {column: {} for column in LOOKUP_COLUMNS.get(name, ())}
+        for row in self.tables[name]:
+            for cols, key in self.unique_keys(name, row):
+                self.indexes[name][cols][key] = row
+            for column, index in self.lookups[name].items():
+                index.setdefault(row.get(column), []).append(row)
+
+    def lookup(self, name, filters):
+        """能用索引時直接查找（單列唯一約束或普通索引上的 eq / in），否則全表掃描"""
+        for column, op, value in filters:
+            if op not in ('eq', 'in'):
+                continue
+            values = dict.fromkeys([value] if op == 'eq' else value)
+            if (column,) in self.indexes[name]:
+                index = self.indexes[name][(column,)]
+                rows = [index[(v,)] for v in values if (v,) in index]
+                return [row for row in rows if matches(row, filters)]
+            if column in self.lookups[name]:
+                index = self.lookups[name][column]
+                rows = [row for v in values for row in index.get(v, ())]
+                return [row for row in rows if matches(row, filters)]
+        return [row for row in self.table(name) if matches(row, filters)]
+
+    # ---------- 請求 ----------
+
+    def run(self, name, operation, filters=(), payload=None, columns='*', on_conflict=None, ignore_duplicates=False):
+        """
+        執行一個 PostgREST 請求，返回響應中的行
+
+        Args:
+            operation: select / insert / upsert / update / delete
+            filters: [(列, 操作, 值)]
+            payload: insert / upsert 的行（字典或列表）、update 的字段
+            on_conflict: upsert 的衝突目標（逗號分隔的列名；默認為第一個唯一約束）
+            ignore_duplicates: upsert 時跳過衝突行（否則合併更新）
+        """
+        self.wait()
+        filters = list(filters)
+
+        with self.lock:
+            self.table(name)
+            if operation == 'select':
+                return [project(row, columns) for row in self.lookup(name, filters)]
+            if operation == 'insert':
+                return self.insert(name, payload)
+            if operation == 'upsert':
+                return self.upsert(name, payload, on_conflict, ignore_duplicates)
+            if operation == 'update':
+                rows = self.lookup(name, filters)
+                for row in rows:
+                    row.update(payload)
+                self.reindex(name)
+                return [dict(row) for row in rows]
+            if operation == 'delete':
+                rows = self.lookup(name, filters)
+                doomed = {id(row) for row in rows}
+                self.tables[name] = [row for row in self.tables[name] if id(row) not in doomed]
+                self.reindex(name)
+                return [dict(row) for row in rows]
+        raise StandinAPIError('PGRST000', f'不支持的操作: {operation}')
+
+    def insert(self, name, payload):
+        rows = payload if isinstance(payload, list) else [payload]
+        if self.conflicts == 'error':
+            # PostgREST 的 insert 是一條語句：任何一行衝突，整個請求失敗
+            pending = set()
+            for row in rows:
+                for cols, key in self.unique_keys(name, row):
+                    if key in self.indexes[name][cols] or (cols, key) in pending:
+                        raise StandinAPIError(
+                            '23505', f'duplicate key value violates unique constraint "{name}_{"_".join(cols)}_key"',
+                            status=409)
+                    pending.add((cols, key))
+        inserted = []
+        for row in rows:
+            if self.find_conflict(name, row) is None:
+                inserted.append(dict(self.add_row(name, row)))
+        return inserted
+
+    def upsert(self, name, payload, on_conflict=None, ignore_duplicates=False):
+        rows = payload if isinstance(payload, list) else [payload]
+        target = tuple(c.strip() for c in on_conflict.split(',')) if on_conflict else UNIQUE_KEYS[name][0]
+        if target not in self.indexes[name]:
+            raise StandinAPIError('42P10', f'沒有與 ON CONFLICT ({",".join(target)}) 對應的唯一約束')
+
+        returned = []
+        for row in rows:
+            existing = self.find_conflict(name, row, target)
+            if existing is None:
+                added = self.add_row(name, row)
+                # 模擬並發寫入：行已存在於表中，但本請求的 ON CONFLICT DO NOTHING 沒有返回它
+                if not (ignore_duplicates and self.race_rate and self.random.random() < self.race_rate):
+                    returned.append(dict(added))
+            elif not ignore_duplicates:
+                existing.update(row)
+                returned.append(dict(existing))
+        if not ignore_duplicates:
+            self.reindex(name)
+        return returned
+
+    def call(self, function, params):
+        """執行 rpc"""
+        self.wait()
+        if function != 'import_wordlist_bulk':
+            raise StandinAPIError('PGRST202', f'Could not find the function public.{function}', status=404)
+        with self.lock:
+            return self.import_wordlist_bulk(params.get('p_wordlist') or {}, params.get('p_words'),
+                                             params.get('p_sync_groups'))
+
+    def import_wordlist_bulk(self, wordlist, words, sync_groups=None):
+        """與 026_bulk_import_wordlist_rpc.sql 相同的邏輯（整個調用在鎖內，相當於一個事務）"""
+        if not wordlist.get('code'):
+            raise StandinAPIError('P0001', 'p_wordlist 缺少 code')
+        if not isinstance(words, list):
+            raise StandinAPIError('P0001', 'p_words 必須是數組')
+
+        record = self.find_conflict('wordlists', {'code': wordlist['code']})
+        fields = {key: wordlist.get(key) for key in ('name', 'description', 'hierarchy_config')}
+        if record is None:
+            record = self.add_row('wordlists', {'code': wordlist['code'], 'type': wordlist.get('type', 'system'),
+                                                **fields})
+        else:
+            record.update(fields)
+        wordlist_id = record['id']
+
+        def tag(value):
+            return (value or '').strip()
+
+        parsed = [(str(item[0]).strip(), tag(item[1] if len(item) > 1 else None), tag(item[2] if len(item) > 2 else None))
+                  for item in words if item and str(item[0] or '').strip()]
+        distinct = list(dict.fromkeys(parsed))
+
+        tags_created = 0
+        for i, level_2 in enumerate(sorted({l2 for _, l2, _ in parsed if l2})):
+            row = {'wordlist_id': wordlist_id, 'tag_level': 2, 'tag_code': level_2,
+                   'tag_display_name': level_2, 'sort_order': i}
+            if self.find_conflict('wordlist_tags', row) is None:
+                self.add_row('wordlist_tags', row)
+                tags_created += 1
+
+        first_parent = {}
+        for _, level_2, level_3 in parsed:
+            if level_3 and level_3 not in first_parent:
+                first_parent[level_3] = level_2
+        for i, level_3 in enumerate(first_parent):
+            parent = self.find_conflict('wordlist_tags', {'wordlist_id': wordlist_id, 'tag_code': first_parent[level_3]})
+            row = {'wordlist_id': wordlist_id, 'tag_level': 3, 'tag_code': level_3, 'tag_display_name': level_3,
+                   'parent_tag_id': parent['id'] if parent and parent['tag_level'] == 2 else None, 'sort_order': i}
+            if self.find_conflict('wordlist_tags', row) is None:
+                self.add_row('wordlist_tags', row)
+                tags_created += 1
+
+        vocabulary = self.tables['wordlist_vocabulary']
+        group = lambda row: (row.get('level_2_tag') or '', row.get('level_3_tag') or '')
+        key = lambda row: (row['word'], *group(row))
+        words_deleted = 0
+        if sync_groups is not None:
+            groups = {(tag(g[0]), tag(g[1])) for g in sync_groups}
+            keep = set(distinct)
+            remaining = [row for row in vocabulary
+                         if not (row['wordlist_id'] == wordlist_id
+                                 and group(row) in groups
+                                 and key(row) not in keep)]
+            words_deleted = len(vocabulary) - len(remaining)
+            self.tables['wordlist_vocabulary'] = vocabulary = remaining
+            self.reindex('wordlist_vocabulary')
+
+        # 舊數據中層級為 NULL 的行不受唯一約束保護，與 SQL 一樣顯式排除已存在的行
+        existing = {key(row) for row in vocabulary if row['wordlist_id'] == wordlist_id}
+        words_inserted = 0
+        for word, level_2, level_3 in distinct:
+            if (word, level_2, level_3) not in existing:
+                self.add_row('wordlist_vocabulary', {'wordlist_id': wordlist_id, 'word': word,
+                                                     'level_2_tag': level_2, 'level_3_tag': level_3})
+                words_inserted += 1
+
+        total_words = sum(1 for row in self.tables['wordlist_vocabulary'] if row['wordlist_id'] == wordlist_id)
+        record['total_words'] = total_words
+
+        return {
+            'wordlist_id': wordlist_id,
+            'tags_created': tags_created,
+            'words_received': len(parsed),
+            'words_inserted': words_inserted,
+            'words_existing': len(distinct) - words_inserted,
+            'words_deleted': words_deleted,
+            'total_words': total_words
+        }
+
+    def count(self, name):
+        return len(self.tables[name])
+
+
+# ---------- 進程內客戶端 ----------
+
+class StandinResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class StandinQuery:
+    """與 supabase-py / postgrest 相同的鏈式查詢接口（只實現導入工具用到的部分）"""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.operation = None
+        self.payload = None
+        self.columns = '*'
+        self.filters = []
+        self.options = {}
+
+    def select(self, columns='*'):
+        self.operation, self.columns = 'select', columns
+        return self
+
+    def insert(self, payload):
+        self.operation, self.payload = 'insert', payload
+        return self
+
+    def upsert(self, payload, on_conflict=None, ignore_duplicates=False):
+        self.operation, self.payload = 'upsert', payload
+        self.options = {'on_conflict': on_conflict, 'ignore_duplicates': ignore_duplicates}
+        return self
+
+    def update(self, payload):
+        self.operation, self.payload = 'update', payload
+        return self
+
+    def delete(self):
+        self.operation = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, 'eq', value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append((column, 'neq', value))
+        return self
+
+    def is_(self, column, value):
+        self.filters.append((column, 'is', value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append((column, 'in', list(values)))
+        return self
+
+    def execute(self):
+        return StandinResponse(self.db.run(self.name, self.operation, self.filters, self.payload,
+                                           self.columns, **self.options))
+
+
+class StandinRpc:
+    def __init__(self, db, function, params):
+        self.db = db
+        self.function = function
+        self.params = params
+
+    def execute(self):
+        return StandinResponse(self.db.call(self.function, self.params))
+
+
+class StandinClient:
+    """進程內替身客戶端：StandinClient(db).table('vocabulary').select('id').eq(...).execute()"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def table(self, name):
+        return StandinQuery(self.db, name)
+
+    def rpc(self, function, params=None):
+        return StandinRpc(self.db, function, params or {})
+
+
+# 與 supabase-py 同名的入口：沒有安裝 supabase 庫時，benchmark_import.py 用本模塊代替它
+Client = StandinClient
+
+
+def create_client(url, key):
+    """返回連接到一個新的空替身數據庫的進程內客戶端（url 和 key 被忽略）"""
+    return StandinClient(StandinDatabase())
+
+
+# ---------- HTTP（PostgREST 子集）----------
+
+def parse_filter(column, expression):
+    """col=eq.x / neq.x / is.null / in.(a,"b,c") → (列, 操作, 值)"""
+    op, _, value = expression.partition('.')
+    if op == 'in':
+        inner = value[1:-1] if value.startswith('(') and value.endswith(')') else value
+        values, current, quoted = [], '', False
+        for char in inner:
+            if char == '"':
+                quoted = not quoted
+            elif char == ',' and not quoted:
+                values.append(current)
+                current = ''
+            else:
+                current += char
+        values.append(current)
+        return column, 'in', values
+    if op in ('eq', 'neq', 'is'):
+        return column, op, value
+    raise StandinAPIError('PGRST100', f'不支持的過濾條件: {column}={expression}')
+
+
+def make_handler(db):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def read_body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return json.loads(self.rfile.read(length) or b'null')
+
+        def handle_request(self, method):
+            try:
+                url = urlsplit(self.path)
+                if not url.path.startswith('/rest/v1/'):
+                    raise StandinAPIError('PGRST000', f'未知路徑: {url.path}', status=404)
+                name = url.path[len('/rest/v1/'):].strip('/')
+
+                if name.startswith('rpc/'):
+                    if method != 'POST':
+                        raise StandinAPIError('PGRST000', 'rpc 只支持 POST', status=405)
+                    self.send_json(200, db.call(name[len('rpc/'):], self.read_body() or {}))
+                    return
+
+                params = parse_qsl(url.query, keep_blank_values=True)
+                columns = next((v for k, v in params if k == 'select'), '*')
+                on_conflict = next((v for k, v in params if k == 'on_conflict'), None)
+                filters = [parse_filter(k, v) for k, v in params
+                           if k not in ('select', 'on_conflict', 'columns', 'order', 'limit', 'offset')]
+                prefer = self.headers.get('Prefer', '')
+
+                if method == 'GET':
+                    rows = db.run(name, 'select', filters, columns=columns)
+                elif method == 'POST' and 'resolution=' in prefer:
+                    rows = db.run(name, 'upsert', payload=self.read_body(), on_conflict=on_conflict,
+                                  ignore_duplicates='resolution=ignore-duplicates' in prefer)
+                elif method == 'POST':
+                    rows = db.run(name, 'insert', payload=self.read_body())
+                elif method == 'PATCH':
+                    rows = db.run(name, 'update', filters, payload=self.read_body())
+                elif method == 'DELETE':
+                    rows = db.run(name, 'delete', filters)
+                else:
+                    raise StandinAPIError('PGRST000', f'不支持的方法: {method}', status=405)
+
+                if method != 'GET' and 'return=representation' not in prefer:
+                    self.send_response(204)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                else:
+                    self.send_json(201 if method == 'POST' else 200, rows)
+            except StandinAPIError as e:
+                self.send_json(e.status, e.to_json())
+
+        def do_GET(self):
+            self.handle_request('GET')
+
+        def do_POST(self):
+            self.handle_request('POST')
+
+        def do_PATCH(self):
+            self.handle_request('PATCH')
+
+        def do_DELETE(self):
+            self.handle_request('DELETE')
+
+        def do_HEAD(self):
+            self.handle_request('GET')
+
+    return Handler
+
+
+def start_server(db=None, host='127.0.0.1', port=0, **options):
+    """
+    在後台線程啟動 HTTP 替身，返回 (server, 地址)；port=0 時自動選擇空閒端口
+
+    沒有傳入 db 時按 options（latency_ms、throttle_rate 等）創建一個新的空數據庫，
+    可通過 server.db 訪問。
+    """
+    if db is None:
+        db = StandinDatabase(**options)
+    server = ThreadingHTTPServer((host, port), make_handler(db))
+    server.db = db
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_standin_arguments(parser):
+    """替身的延遲和衝突行為參數（本腳本和 benchmark_import.py 共用）"""
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每個請求的延遲（毫秒，默認 0）')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='延遲的隨機抖動上限（毫秒，默認 0）')
+    parser.add_argument('--conflicts', choices=['error', 'ignore'], default='error',
+                        help='普通 insert 遇到唯一約束衝突時：error 返回 23505（默認，與 PostgREST 相同）；ignore 跳過')
+    parser.add_argument('--race-rate', type=float, default=0.0,
+                        help='upsert 新行中模擬被其他進程搶先插入的比例（0-1，默認 0）')
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help='返回 429 限流的請求比例（0-1，默認 0）')
+
+
+def standin_options(args):
+    return {
+        'latency_ms': args.latency_ms,
+        'jitter_ms': args.jitter_ms,
+        'conflicts': args.conflicts,
+        'race_rate': args.race_rate,
+        'throttle_rate': args.throttle_rate
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='本地 Supabase / PostgREST 替身（HTTP）')
+    parser.add_argument('--host', default='127.0.0.1', help='監聽地址（默認 127.0.0.1）')
+    parser.add_argument('--port', type=int, default=54321, help='監聽端口（默認 54321，與 supabase start 相同）')
+    add_standin_arguments(parser)
+    args = parser.parse_args()
+
+    database = StandinDatabase(**standin_options(args))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(database))
+    print(f"🧪 替身已啟動：http://{args.host}:{args.port}（Service Role Key 可填 {STANDIN_KEY}）")
+    print(f"   python3 import_hsk_to_supabase.py --url http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n已停止，共處理 {database.requests} 個請求")
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""導入工具測試的共用 fixture：載入導入腳本，並以本地替身代替 Supabase"""
+
+import os
+import sys
+
+import pytest
+
+ADMIN_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ADMIN_DIR)
+
+from benchmark_import import load_importer
+from supabase_standin import StandinClient, StandinDatabase
+
+
+@pytest.fixture
+def importer(monkeypatch):
+    module = load_importer(http=False)
+    monkeypatch.setattr(module, 'BACKOFF_BASE_SECONDS', 0.001)
+    module.VOCAB_SCORES.clear()
+    return module
+
+
+@pytest.fixture
+def db():
+    return StandinDatabase()
+
+
+@pytest.fixture
+def client(db):
+    return StandinClient(db)
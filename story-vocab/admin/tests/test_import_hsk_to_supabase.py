@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""import_hsk_to_supabase.py 的導入模式測試（本地替身，不連接 Supabase）"""
+
+import importlib.util
+import os
+import time
+
+import pytest
+
+from benchmark_import import make_words, run_mode
+from supabase_standin import STANDIN_KEY, StandinClient, StandinDatabase, start_server
+
+
+def hsk_words():
+    """HSK 形式的詞表：沒有第三層級（level_3_tag 為 NULL），有一個重複詞"""
+    words = [('愛', 'HSK1級'), ('八', 'HSK1級'), ('爸爸', 'HSK1級'), ('杯子', 'HSK1級'),
+             ('北京', 'HSK2級'), ('本', 'HSK2級'), ('不客氣', 'HSK2級'), ('愛', 'HSK2級')]
+    return [{'word': word, 'level_2_tag': level, 'level_3_tag': None} for word, level in words]
+
+
+def import_once(importer, client, mode, words, chunk_size=3):
+    wordlist_id, _ = importer.get_or_create_wordlist(client)
+    if mode == 'concurrent':
+        return importer.import_words_concurrent(client, wordlist_id, words, chunk_size, 4)
+    return importer.import_words_bulk(client, wordlist_id, words, chunk_size)
+
+
+@pytest.mark.parametrize('mode', ['bulk', 'concurrent'])
+def test_reimport_does_not_duplicate_null_tag_mappings(importer, db, client, mode):
+    words = hsk_words()
+    first = import_once(importer, client, mode, words)
+    second = import_once(importer, client, mode, words)
+
+    assert first == {'new': 7, 'existing': 1, 'mapping': 8, 'error': 0}
+    assert second == {'new': 0, 'existing': 8, 'mapping': 0, 'error': 0}
+    assert db.count('vocabulary') == 7
+    assert db.count('vocabulary_wordlist_mapping') == 8
+
+
+def test_failed_bulk_chunk_counts_each_word_once(importer, client, monkeypatch):
+    words = hsk_words()
+    real_upsert = importer.upsert_mappings
+    calls = []
+
+    def flaky_upsert(supabase, mappings):
+        calls.append(len(mappings))
+        if len(calls) == 2:
+            raise RuntimeError('connection reset')
+        return real_upsert(supabase, mappings)
+
+    monkeypatch.setattr(importer, 'upsert_mappings', flaky_upsert)
+    stats = import_once(importer, client, 'bulk', words)
+
+    assert stats['error'] == 3
+    assert stats['new'] + stats['existing'] + stats['error'] == len(words)
+
+
+def table_rows(db):
+    """替身中的詞語和關聯（不含自動生成的 ID），用於比較不同模式的導入結果"""
+    words = {row['id']: row['word'] for row in db.tables['vocabulary']}
+    mappings = sorted((words[row['vocabulary_id']], row['level_2_tag'], row['level_3_tag'])
+                      for row in db.tables['vocabulary_wordlist_mapping'])
+    return sorted(words.values()), mappings
+
+
+def timed_import(importer, mode, transport, words, latency_ms):
+    """在一個有延遲的新替身上完整導入一次，返回 (耗時, 統計, 替身)"""
+    if transport == 'http':
+        server, url = start_server(latency_ms=latency_ms)
+        db, client = server.db, importer.create_client(url, STANDIN_KEY)
+    else:
+        server, db = None, StandinDatabase(latency_ms=latency_ms)
+        client = StandinClient(db)
+
+    try:
+        start = time.perf_counter()
+        stats = run_mode(importer, client, mode, words, chunk_size=20, concurrency=8)
+        return time.perf_counter() - start, stats, db
+    finally:
+        if server:
+            server.shutdown()
+
+
+@pytest.mark.parametrize('transport', ['in-process', 'http'])
+def test_concurrent_is_faster_than_bulk_under_latency(importer, transport):
+    if transport == 'http' and importlib.util.find_spec('supabase') is None:
+        pytest.skip('HTTP 模式需要安裝 supabase 庫')
+
+    words = make_words(300)
+    bulk_seconds, bulk_stats, bulk_db = timed_import(importer, 'bulk', transport, words, latency_ms=15)
+    concurrent_seconds, concurrent_stats, concurrent_db = timed_import(
+        importer, 'concurrent', transport, words, latency_ms=15)
+
+    assert concurrent_stats == bulk_stats
+    assert bulk_stats['error'] == 0
+    assert table_rows(concurrent_db) == table_rows(bulk_db)
+    assert concurrent_seconds < bulk_seconds / 2
+
+
+def test_concurrent_mode_retries_every_request_when_throttled(importer):
+    db = StandinDatabase(throttle_rate=0.3, seed=1)
+    words = make_words(200)
+    stats = run_mode(importer, StandinClient(db), 'concurrent', words, chunk_size=20, concurrency=4)
+
+    assert stats['error'] == 0
+    assert db.count('wordlists') == 1
+    assert db.tables['wordlists'][0]['total_words'] == len(words)
+    assert db.count('vocabulary_wordlist_mapping') == len({(w['word'], w['level_2_tag'], w['level_3_tag'])
+                                                           for w in words})
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('词语,第二层级,第三层级\n')
+        f.writelines(f"{word},{level},\n" for word, level in rows)
+
+
+def run_cli(importer, client, monkeypatch, tmp_path, csv_path, *options):
+    """以命令行參數運行一次完整的交互式導入（自動回答 Key 和確認）"""
+    answers = iter(['service-role-key', 'yes'])
+    monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+    monkeypatch.setattr(importer, 'create_client', lambda url, key: client)
+    monkeypatch.setattr('sys.argv', [
+        'import_hsk_to_supabase.py', '--csv', str(csv_path), '--no-scoring',
+        '--checkpoint-dir', str(tmp_path / 'checkpoints'), '--manifest-dir', str(tmp_path / 'manifests'),
+        *options
+    ])
+    importer.run_import(importer.parse_args())
+
+
+def mapping_count(db, level):
+    return sum(1 for row in db.tables['vocabulary_wordlist_mapping'] if row['level_2_tag'] == level)
+
+
+def test_interrupted_incremental_import_resumes_without_losing_mappings(importer, db, client, monkeypatch, tmp_path):
+    csv_path = tmp_path / 'hsk.csv'
+    write_csv(csv_path, [('愛', 'HSK1級'), ('八', 'HSK1級'), ('爸爸', 'HSK1級'), ('北京', 'HSK2級'), ('本', 'HSK2級')])
+    run_cli(importer, client, monkeypatch, tmp_path, csv_path, '--mode', 'bulk')
+
+    # HSK1級 增加到 7 個詞；第二批關聯寫入失敗，模擬中斷
+    write_csv(csv_path, [('愛', 'HSK1級'), ('八', 'HSK1級'), ('爸爸', 'HSK1級'), ('杯子', 'HSK1級'),
+                         ('不', 'HSK1級'), ('菜', 'HSK1級'), ('茶', 'HSK1級'), ('北京', 'HSK2級'), ('本', 'HSK2級')])
+    real_upsert = importer.upsert_mappings
+    calls = []
+
+    def flaky_upsert(supabase, mappings):
+        calls.append(len(mappings))
+        if len(calls) == 2:
+            raise RuntimeError('connection reset')
+        return real_upsert(supabase, mappings)
+
+    monkeypatch.setattr(importer, 'upsert_mappings', flaky_upsert)
+    options = ('--mode', 'bulk', '--incremental', '--chunk-size', '2')
+    run_cli(importer, client, monkeypatch, tmp_path, csv_path, *options)
+    assert mapping_count(db, 'HSK1級') == 5
+
+    # 續傳：只補上失敗的批次，已導入的關聯不能被再次刪除
+    monkeypatch.setattr(importer, 'upsert_mappings', real_upsert)
+    run_cli(importer, client, monkeypatch, tmp_path, csv_path, *options)
+    assert mapping_count(db, 'HSK1級') == 7
+    assert mapping_count(db, 'HSK2級') == 2
+
+    # 清單已更新，再次增量導入沒有變化
+    run_cli(importer, client, monkeypatch, tmp_path, csv_path, *options)
+    assert db.count('vocabulary_wordlist_mapping') == 9
+
+
+def test_rpc_mode_keeps_its_own_manifest(importer, db, client, monkeypatch, tmp_path):
+    csv_path = tmp_path / 'hsk.csv'
+    write_csv(csv_path, [('愛', 'HSK1級'), ('八', 'HSK1級'), ('北京', 'HSK2級')])
+    run_cli(importer, client, monkeypatch, tmp_path, csv_path, '--mode', 'bulk')
+
+    # 關聯表的清單不能讓 rpc 以為 wordlist_vocabulary 已是最新
+    run_cli(importer, client, monkeypatch, tmp_path, csv_path, '--mode', 'rpc', '--incremental')
+    assert db.count('wordlist_vocabulary') == 3
+    code = importer.WORDLIST_INFO['code']
+    assert sorted(os.listdir(tmp_path / 'manifests')) == [f'{code}.json', f'{code}.rpc.json']
+
+
+def test_rpc_mode_stores_missing_levels_like_generated_sql(importer, db, client):
+    # generate_import_sql.py 把沒有的層級寫成 ''，rpc 必須用同一表示才能與它去重
+    wordlist_id, _ = importer.get_or_create_wordlist(client)
+    db.add_row('wordlist_vocabulary', {'wordlist_id': wordlist_id, 'word': '愛',
+                                       'level_2_tag': 'HSK1級', 'level_3_tag': ''})
+    words = hsk_words()
+    importer.import_words_rpc(client, words)
+    importer.import_words_rpc(client, words, sync_groups=[('HSK1級', ''), ('HSK2級', '')])
+
+    rows = db.tables['wordlist_vocabulary']
+    assert len(rows) == 8
+    assert {row['level_3_tag'] for row in rows} == {''}
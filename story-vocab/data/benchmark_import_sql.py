@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+比較 generate_import_sql.py 的 VALUES 和 COPY 兩種輸出格式
+
+生成一份合成詞表（默認 20 萬詞），分別生成兩種 SQL，記錄生成時間和文件大小；
+提供本地 Postgres 連接時，再用 psql 在獨立 schema 中實際載入並計時。
+
+使用方法：
+  python3 benchmark_import_sql.py                                  # 只比較生成
+  python3 benchmark_import_sql.py --dsn postgresql://localhost/postgres
+  python3 benchmark_import_sql.py --words 200000 --json results.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATOR = os.path.join(SCRIPT_DIR, 'generate_import_sql.py')
+
+# 基準測試用的 schema，每次載入前重建
+BENCH_SCHEMA = 'bench_import_sql'
+
+# 生成的 SQL 依賴的最小表結構（約束與生成語句的 ON CONFLICT 目標一致）
+SCHEMA_SQL = """
+DROP SCHEMA IF EXISTS {schema} CASCADE;
+CREATE SCHEMA {schema};
+SET search_path = {schema};
+
+CREATE TABLE wordlists (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  name TEXT NOT NULL,
+  code TEXT UNIQUE NOT NULL,
+  type TEXT NOT NULL,
+  owner_id UUID,
+  hierarchy_config JSONB,
+  description TEXT,
+  total_words INT DEFAULT 0,
+  is_public BOOLEAN DEFAULT false,
+  updated_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE wordlist_tags (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  wordlist_id UUID NOT NULL REFERENCES wordlists(id) ON DELETE CASCADE,
+  tag_level INT NOT NULL,
+  tag_code TEXT NOT NULL,
+  tag_display_name TEXT NOT NULL,
+  sort_order INT DEFAULT 0,
+  UNIQUE(wordlist_id, tag_level, tag_code)
+);
+
+CREATE TABLE wordlist_vocabulary (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  wordlist_id UUID NOT NULL REFERENCES wordlists(id) ON DELETE CASCADE,
+  word TEXT NOT NULL,
+  level_2_tag TEXT,
+  level_3_tag TEXT,
+  created_at TIMESTAMP DEFAULT NOW(),
+  UNIQUE(wordlist_id, word, level_2_tag, level_3_tag)
+);
+"""
+
+
+def write_synthetic_csv(path, words):
+    """生成合成詞表：每 500 個詞一個單元，每 50 個詞一篇課文"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('詞語,第二層級,第三層級\n')
+        for i in range(words):
+            f.write(f"詞{i},單元{i // 500},課文{i // 50}\n")
+
+
+def generate(csv_path, output_path, fmt, manifest_dir):
+    """
+    運行生成腳本，返回耗時（秒）
+
+    分組清單寫到 manifest_dir（臨時目錄），合成詞表不能覆蓋倉庫中真實詞表的清單。
+    """
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, GENERATOR, '--input', csv_path, '--output', output_path, '--format', fmt,
+         '--manifest-dir', manifest_dir],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    return time.perf_counter() - start
+
+
+def run_psql(dsn, sql_file=None, command=None):
+    """在基準 schema 中執行 SQL，返回耗時（秒）"""
+    args = ['psql', dsn, '-X', '-q', '-v', 'ON_ERROR_STOP=1']
+    args += ['-f', sql_file] if sql_file else ['-c', command]
+    env = dict(os.environ, PGOPTIONS=f'-c search_path={BENCH_SCHEMA} -c client_min_messages=warning')
+
+    start = time.perf_counter()
+    subprocess.run(args, check=True, env=env, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def load(dsn, sql_file):
+    """重建 schema 後載入生成的 SQL，返回載入耗時（秒）"""
+    run_psql(dsn, command=SCHEMA_SQL.format(schema=BENCH_SCHEMA))
+    return run_psql(dsn, sql_file=sql_file)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='比較 VALUES 和 COPY 兩種 SQL 輸出格式')
+    parser.add_argument('--words', type=int, default=200000, help='合成詞表的詞數（默認 200000）')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help='本地 Postgres 連接串（默認讀取 $DATABASE_URL；不提供則跳過載入）')
+    parser.add_argument('--json', help='把結果寫入 JSON 文件')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.dsn and not shutil.which('psql'):
+        print("❌ 找不到 psql，無法測試載入")
+        sys.exit(1)
+
+    results = {'words': args.words, 'formats': {}}
+
+    with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory() as manifest_dir:
+        csv_path = os.path.join(tmp, 'synthetic.csv')
+        print(f"📝 生成合成詞表：{args.words} 個詞")
+        write_synthetic_csv(csv_path, args.words)
+
+        for fmt in ('values', 'copy'):
+            sql_path = os.path.join(tmp, f'import_{fmt}.sql')
+            result = {
+                'generate_seconds': generate(csv_path, sql_path, fmt, manifest_dir),
+                'bytes': os.path.getsize(sql_path)
+            }
+            if args.dsn:
+                result['load_seconds'] = load(args.dsn, sql_path)
+                result['words_per_second'] = args.words / result['load_seconds']
+            results['formats'][fmt] = result
+
+        if args.dsn:
+            run_psql(args.dsn, command=f'DROP SCHEMA IF EXISTS {BENCH_SCHEMA} CASCADE;')
+
+    print(f"\n{'格式':<8}{'生成(秒)':>10}{'大小(KB)':>12}{'載入(秒)':>10}{'詞/秒':>12}")
+    for fmt, result in results['formats'].items():
+        load_seconds = f"{result['load_seconds']:.2f}" if 'load_seconds' in result else '-'
+        rate = f"{result['words_per_second']:.0f}" if 'words_per_second' in result else '-'
+        print(f"{fmt:<8}{result['generate_seconds']:>10.2f}{result['bytes'] / 1024:>12.0f}{load_seconds:>10}{rate:>12}")
+
+    if not args.dsn:
+        print("\n💡 提供 --dsn（或 $DATABASE_URL）可同時測試載入時間")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n✅ 結果已寫入：{args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,44 +3,64 @@
 """
 CSV 詞表轉 JSON 工具
 將 CSV 格式的詞表轉換為前端可用的 JSON 格式
+
+輸出格式：
+  nested  - 原有的嵌套對象格式（xxx.json，縮進 2 格）
+  compact - 緊湊格式（xxx.compact.json）：壓縮空白、詞語字符串表 + 整數偏移，
+            文件頭帶標籤索引，前端 wordlist-loader.js 加載完整詞表時使用
+  shards  - 分片格式（xxx/manifest.json + 每個第二層級一個分片）：清單只含名稱、
+            詞數和第三層級，詞語按需加載；wordlist-loader.js 瀏覽標籤時優先使用
+  index   - 跨詞表倒排索引（word-index.json）：所有詞表的詞語排序去重，
+            每個詞對應所在分組（詞表 + 第二 / 第三層級）的編號，前端二分查找
+
+內容哈希（--hashed）：緊湊格式和分片清單另存為帶內容哈希的文件名
+（primary_chinese_2025.compact.<哈希>.json、<code>/manifest.<哈希>.json，分片為 NN.<哈希>.json，
+倒排索引為 word-index.<哈希>.json），
+同時生成預壓縮的 .gz（安裝了 brotli 時還有 .br），並在詞表目錄寫入 index.json：
+code → 當前的哈希文件名。前端只需重新驗證 index.json，其餘文件可以永久緩存。
+
+使用方法：
+  python3 csv-to-wordlist-json.py                   # 所有格式都生成（默認）
+  python3 csv-to-wordlist-json.py --format compact
+  python3 csv-to-wordlist-json.py --hashed          # 同時生成帶哈希的文件和 index.json
 """
 
-import csv
+import argparse
+import gzip
+import hashlib
 import json
 import os
+import re
 from collections import defaultdict
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from wordlist_reader import iter_wordlist
+
+# 內容哈希產物的索引文件（與詞表 JSON 同目錄）
+ARTIFACT_INDEX = 'index.json'
+
+# 文件名中內容哈希的長度（十六進制字符）
+HASH_LENGTH = 10
+
+# 跨詞表倒排索引的文件名（不含 .json）
+WORD_INDEX = 'word-index'
+
 def read_csv_wordlist(csv_path):
-    """讀取 CSV 詞表文件"""
-    words_data = []
-    
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            word = row.get('詞語') or row.get('词语', '').strip()
-            level2 = row.get('第二層級') or row.get('第二层级', '').strip()
-            level3 = row.get('第三層級') or row.get('第三层级', '').strip()
-            
-            # 跳過空行
-            if not word:
-                continue
-                
-            words_data.append({
-                'word': word,
-                'level2': level2,
-                'level3': level3 if level3 else None
-            })
-    
-    return words_data
+    """流式讀取 CSV 詞表文件，逐行產出 WordRow(word, level_2, level_3)"""
+    return iter_wordlist(csv_path)
 
 def build_hierarchy(words_data):
-    """構建層級結構"""
+    """構建層級結構（words_data 可以是生成器）"""
     hierarchy = defaultdict(lambda: defaultdict(list))
     
     for item in words_data:
-        level2 = item['level2']
-        level3 = item['level3']
-        word = item['word']
+        level2 = item.level_2
+        level3 = item.level_3
+        word = item.word
         
         if level3:
             # 三層結構：level2 -> level3 -> words
@@ -58,19 +78,247 @@ def build_hierarchy(words_data):
     
     return result
 
-def convert_csv_to_json(csv_path, output_path, wordlist_id, wordlist_name, wordlist_code):
-    """轉換 CSV 到 JSON"""
-    print(f"\n📖 讀取 CSV: {csv_path}")
-    words_data = read_csv_wordlist(csv_path)
-    print(f"✅ 共讀取 {len(words_data)} 個詞語")
+def build_compact(hierarchy):
+    """
+    構建緊湊格式的數據部分
+
+    words: 去重後的詞語字符串表（按首次出現順序）
+    index: [[第二層級, [分組, ...]], ...]，第三層級可能是 "_all"；分組有兩種寫法：
+      [第三層級, 起始偏移, 詞數]  分組的詞恰好是字符串表中連續的一段（絕大多數情況）
+      [第三層級, [偏移, ...]]     分組含有之前出現過的詞，逐個列出偏移
+    """
+    index = []
+    words = []
+    offsets = {}
+
+    for level2, level3_dict in hierarchy.items():
+        groups = []
+        for level3, group_words in level3_dict.items():
+            start = len(words)
+            refs = []
+            for word in group_words:
+                if word not in offsets:
+                    offsets[word] = len(words)
+                    words.append(word)
+                refs.append(offsets[word])
+
+            if refs == list(range(start, start + len(refs))):
+                groups.append([level3, start, len(refs)])
+            else:
+                groups.append([level3, refs])
+        index.append([level2, groups])
+
+    return index, words
+
+def compact_path(output_path):
+    """xxx.json → xxx.compact.json"""
+    base, ext = os.path.splitext(output_path)
+    return f"{base}.compact{ext}"
+
+def write_json(path, data, compact=False):
+    """寫入 JSON 文件並返回文件大小"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        else:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return os.path.getsize(path)
+
+def precompress(path, body):
+    """寫出預壓縮的 .gz（固定 mtime，內容相同時字節相同）和 .br（需要 brotli 模塊）"""
+    with open(f"{path}.gz", 'wb') as f:
+        f.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(f"{path}.br", 'wb') as f:
+            f.write(brotli.compress(body, quality=11))
+
+def write_hashed_json(directory, stem, data):
+    """
+    以緊湊 JSON 寫入 {stem}.{內容哈希}.json 並預壓縮，返回 (文件名, 文件大小)
+    """
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    filename = f"{stem}.{hashlib.sha256(body).hexdigest()[:HASH_LENGTH]}.json"
+    path = os.path.join(directory, filename)
+    with open(path, 'wb') as f:
+        f.write(body)
+    precompress(path, body)
+    return filename, len(body)
+
+def remove_hashed(directory, stem):
+    """刪除之前生成的 {stem}.{哈希}.json 及其 .gz / .br"""
+    pattern = re.compile(rf"{re.escape(stem)}\.[0-9a-f]{{{HASH_LENGTH}}}\.json(\.gz|\.br)?$")
+    for name in os.listdir(directory):
+        if pattern.match(name):
+            os.remove(os.path.join(directory, name))
+
+def load_artifact_index(directory):
+    """讀取 index.json，沒有時返回空索引"""
+    path = os.path.join(directory, ARTIFACT_INDEX)
+    if not os.path.exists(path):
+        return {"version": 1, "wordlists": {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_artifact_index(directory, index):
+    """寫回 index.json；沒有任何條目時刪除文件"""
+    path = os.path.join(directory, ARTIFACT_INDEX)
+    if index["wordlists"] or index.get("word_index"):
+        write_json(path, index)
+    elif os.path.exists(path):
+        os.remove(path)
+
+def update_artifact_index(directory, code, artifacts):
+    """
+    更新 index.json 中某個詞表的條目
+
+    artifacts: {'compact': 文件名或 None, 'manifest': 文件名或 None}；None 表示本次生成了
+    不帶哈希的版本，刪除對應的條目（前端退回固定文件名）
+    """
+    index = load_artifact_index(directory)
+    entry = index["wordlists"].get(code, {})
+    for kind, filename in artifacts.items():
+        if filename:
+            entry[kind] = filename
+        else:
+            entry.pop(kind, None)
+
+    if entry:
+        index["wordlists"][code] = entry
+    else:
+        index["wordlists"].pop(code, None)
+
+    save_artifact_index(directory, index)
+
+def shard_dir(output_path, wordlist_code):
+    """分片目錄：與 JSON 文件同級、以詞表代碼命名"""
+    return os.path.join(os.path.dirname(output_path), wordlist_code)
+
+def write_shards(directory, metadata, hierarchy, hashed=False):
+    """
+    寫出分片格式，返回 (清單大小, 分片總大小, 帶哈希的清單文件名或 None)
+
+    manifest.json: 詞表元數據 + level2 列表 [{name, count, level3, shard}]
+    NN.json:       單個第二層級的緊湊數據 {name, words, groups}（分組寫法同緊湊格式）
+    hashed 時分片為 NN.<哈希>.json，清單另存一份 manifest.<哈希>.json，並帶 "hashed": true
+    """
+    os.makedirs(directory, exist_ok=True)
+    
+    # 清理上次生成的分片（單元數量可能變少）
+    for name in os.listdir(directory):
+        if name.endswith(('.json', '.json.gz', '.json.br')):
+            os.remove(os.path.join(directory, name))
+    
+    width = max(2, len(str(len(hierarchy) - 1)))
+    level2_entries = []
+    shards_size = 0
     
-    print(f"\n🏗️  構建層級結構...")
-    hierarchy = build_hierarchy(words_data)
+    for i, (level2, level3_dict) in enumerate(hierarchy.items()):
+        [[_, groups]], words = build_compact({level2: level3_dict})
+        shard_data = {
+            "name": level2,
+            "words": words,
+            "groups": groups
+        }
+        if hashed:
+            shard, size = write_hashed_json(directory, f"{i:0{width}d}", shard_data)
+        else:
+            shard = f"{i:0{width}d}.json"
+            size = write_json(os.path.join(directory, shard), shard_data, compact=True)
+        shards_size += size
+        level2_entries.append({
+            "name": level2,
+            "count": sum(len(v) for v in level3_dict.values()),
+            "level3": list(level3_dict.keys()),
+            "shard": shard
+        })
+    
+    manifest = {
+        "format": "shards",
+        "version": 1,
+        **metadata,
+        "level2": level2_entries
+    }
+    if hashed:
+        manifest["hashed"] = True
+    manifest_size = write_json(os.path.join(directory, 'manifest.json'), manifest, compact=True)
+    hashed_manifest = write_hashed_json(directory, 'manifest', manifest)[0] if hashed else None
+    
+    return manifest_size, shards_size, hashed_manifest
+
+def js_sort_key(word):
+    """按 UTF-16 編碼單元排序，與 JavaScript 的字符串比較（<、>）一致"""
+    return word.encode('utf-16-be')
+
+def build_word_index(wordlists):
+    """
+    構建跨詞表倒排索引
+
+    wordlists: [(詞表代碼, hierarchy)]
+    tags:      [[詞表序號, 第二層級, 第三層級或 null], ...]，列表下標即分組編號
+    words:     所有詞表的詞語，去重後按 UTF-16 排序（前端可直接二分查找）
+    postings:  與 words 對齊，每個詞所在的分組編號；只有一個時直接寫整數，否則為升序數組
+    """
+    tags = []
+    word_tags = defaultdict(set)
+
+    for list_index, (_, hierarchy) in enumerate(wordlists):
+        for level2, level3_dict in hierarchy.items():
+            for level3, group_words in level3_dict.items():
+                tag_id = len(tags)
+                tags.append([list_index, level2, None if level3 == '_all' else level3])
+                for word in group_words:
+                    word_tags[word].add(tag_id)
+
+    words = sorted(word_tags, key=js_sort_key)
+    postings = []
+    for word in words:
+        ids = sorted(word_tags[word])
+        postings.append(ids[0] if len(ids) == 1 else ids)
+
+    return {
+        "format": "word-index",
+        "version": 1,
+        "wordlists": [code for code, _ in wordlists],
+        "tags": tags,
+        "words": words,
+        "postings": postings
+    }
+
+def write_word_index(directory, wordlists, hashed=False):
+    """寫出倒排索引（hashed 時另存帶內容哈希的文件並記入 index.json），返回數據"""
+    data = build_word_index(wordlists)
+    path = os.path.join(directory, f"{WORD_INDEX}.json")
+    print(f"\n💾 寫入倒排索引: {path}")
+    file_size = write_json(path, data, compact=True)
+    print(f"✅ 文件大小: {file_size / 1024:.1f} KB（{len(data['words'])} 個詞語，{len(data['tags'])} 個分組）")
+
+    remove_hashed(directory, WORD_INDEX)
+    index = load_artifact_index(directory)
+    index.pop("word_index", None)
+    if hashed:
+        index["word_index"], _ = write_hashed_json(directory, WORD_INDEX, data)
+        print(f"✅ 內容哈希: {index['word_index']}（含預壓縮文件）")
+    save_artifact_index(directory, index)
+
+    return data
+
+def convert_csv_to_json(csv_path, output_path, wordlist_id, wordlist_name, wordlist_code, formats=('nested',),
+                        hashed=False):
+    """
+    轉換 CSV 到 JSON（formats 可包含 'nested'、'compact'、'shards'）
+
+    hashed 時緊湊格式和分片另存帶內容哈希的文件名並預壓縮，更新 index.json
+    """
+    print(f"\n📖 讀取 CSV: {csv_path}")
+    print(f"🏗️  構建層級結構...")
+    hierarchy = build_hierarchy(read_csv_wordlist(csv_path))
     
     # 統計信息
+    total_words = sum(len(words) for level3_dict in hierarchy.values() for words in level3_dict.values())
     level2_count = len(hierarchy)
     level3_count = sum(len(v) for v in hierarchy.values())
     
+    print(f"✅ 共讀取 {total_words} 個詞語")
     print(f"✅ 第二層級數量: {level2_count}")
     print(f"✅ 第三層級數量: {level3_count}")
     
@@ -79,26 +327,75 @@ def convert_csv_to_json(csv_path, output_path, wordlist_id, wordlist_name, wordl
         "id": wordlist_id,
         "name": wordlist_name,
         "code": wordlist_code,
-        "total_words": len(words_data),
+        "total_words": total_words,
         "hierarchy": hierarchy
     }
     
     # 確保輸出目錄存在
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    output_dir = os.path.dirname(output_path)
+    os.makedirs(output_dir, exist_ok=True)
+    artifacts = {}
     
     # 寫入 JSON 文件
-    print(f"\n💾 寫入 JSON: {output_path}")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(json_data, f, ensure_ascii=False, indent=2)
+    if 'nested' in formats:
+        print(f"\n💾 寫入 JSON: {output_path}")
+        file_size = write_json(output_path, json_data)
+        print(f"✅ 文件大小: {file_size / 1024:.1f} KB")
     
-    # 顯示文件大小
-    file_size = os.path.getsize(output_path)
-    print(f"✅ 文件大小: {file_size / 1024:.1f} KB")
+    if 'compact' in formats:
+        index, words = build_compact(hierarchy)
+        compact_data = {
+            "format": "compact",
+            "version": 1,
+            "id": wordlist_id,
+            "name": wordlist_name,
+            "code": wordlist_code,
+            "total_words": total_words,
+            "index": index,
+            "words": words
+        }
+        path = compact_path(output_path)
+        print(f"\n💾 寫入緊湊 JSON: {path}")
+        file_size = write_json(path, compact_data, compact=True)
+        print(f"✅ 文件大小: {file_size / 1024:.1f} KB（{len(words)} 個不重複詞語）")
+        
+        stem = f"{wordlist_code}.compact"
+        remove_hashed(output_dir, stem)
+        artifacts['compact'] = None
+        if hashed:
+            artifacts['compact'], _ = write_hashed_json(output_dir, stem, compact_data)
+            print(f"✅ 內容哈希: {artifacts['compact']}（含預壓縮文件）")
+    
+    if 'shards' in formats:
+        directory = shard_dir(output_path, wordlist_code)
+        metadata = {key: json_data[key] for key in ('id', 'name', 'code', 'total_words')}
+        print(f"\n💾 寫入分片: {directory}/")
+        manifest_size, shards_size, hashed_manifest = write_shards(directory, metadata, hierarchy, hashed)
+        print(f"✅ 清單: {manifest_size / 1024:.1f} KB，{level2_count} 個分片共 {shards_size / 1024:.1f} KB")
+        artifacts['manifest'] = f"{wordlist_code}/{hashed_manifest}" if hashed_manifest else None
+    
+    if artifacts:
+        update_artifact_index(output_dir, wordlist_code, artifacts)
+        if hashed:
+            print(f"✅ 已更新 {os.path.join(output_dir, ARTIFACT_INDEX)}"
+                  + ("" if brotli else "（未安裝 brotli，只生成 .gz）"))
     
     return json_data
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='CSV 詞表轉 JSON')
+    parser.add_argument('--format', choices=['all', 'nested', 'compact', 'shards', 'index'], default='all',
+                        help='all：所有格式都生成（默認）；nested：嵌套對象；compact：緊湊格式；'
+                             'shards：清單 + 按第二層級分片；index：跨詞表倒排索引')
+    parser.add_argument('--hashed', action='store_true',
+                        help='緊湊格式和分片另存帶內容哈希的文件名，生成 .gz / .br 和 index.json')
+    return parser.parse_args()
+
 def main():
     """主函數"""
+    args = parse_args()
+    formats = ('nested', 'compact', 'shards', 'index') if args.format == 'all' else (args.format,)
+    
     print("=" * 60)
     print("🔄 CSV 詞表轉 JSON 工具")
     print("=" * 60)
@@ -119,32 +416,55 @@ def main():
     print("\n" + "=" * 60)
     print("📚 轉換：小學中文字詞表（2025）")
     print("=" * 60)
-    convert_csv_to_json(
+    primary_data = convert_csv_to_json(
         csv_path=primary_csv,
         output_path=primary_json,
         wordlist_id="56b4c50c-bc8c-4998-a625-1a672792d4d3",
         wordlist_name="小學中文字詞表（2025）",
-        wordlist_code="primary_chinese_2025"
+        wordlist_code="primary_chinese_2025",
+        formats=formats,
+        hashed=args.hashed
     )
     
     # 轉換 HSK 詞表
     print("\n" + "=" * 60)
     print("📚 轉換：HSK 標準詞表")
     print("=" * 60)
-    convert_csv_to_json(
+    hsk_data = convert_csv_to_json(
         csv_path=hsk_csv,
         output_path=hsk_json,
         wordlist_id="hsk-standard-traditional",
         wordlist_name="HSK 標準詞表（繁體）",
-        wordlist_code="hsk_standard_2012"
+        wordlist_code="hsk_standard_2012",
+        formats=formats,
+        hashed=args.hashed
     )
     
+    # 跨詞表倒排索引（覆蓋上面所有詞表）
+    if 'index' in formats:
+        print("\n" + "=" * 60)
+        print("🔎 生成跨詞表倒排索引")
+        print("=" * 60)
+        write_word_index(
+            os.path.dirname(primary_json),
+            [(data['code'], data['hierarchy']) for data in (primary_data, hsk_data)],
+            hashed=args.hashed
+        )
+    
     print("\n" + "=" * 60)
     print("✅ 轉換完成！")
     print("=" * 60)
     print(f"\n生成的文件：")
-    print(f"  - {primary_json}")
-    print(f"  - {hsk_json}")
+    for path in (primary_json, hsk_json):
+        if 'nested' in formats:
+            print(f"  - {path}")
+        if 'compact' in formats:
+            print(f"  - {compact_path(path)}")
+    if 'shards' in formats:
+        for path, code in ((primary_json, 'primary_chinese_2025'), (hsk_json, 'hsk_standard_2012')):
+            print(f"  - {shard_dir(path, code)}/")
+    if 'index' in formats:
+        print(f"  - {os.path.join(os.path.dirname(primary_json), WORD_INDEX + '.json')}")
     print(f"\n下一步：運行前端應用測試加載")
     print()
 
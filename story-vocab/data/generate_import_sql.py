@@ -3,38 +3,55 @@
 
 """
 生成小學中文字詞表的完整 SQL 導入腳本
+
+使用方法：
+  python3 generate_import_sql.py                                  # 一條 INSERT，一個事務
+  python3 generate_import_sql.py --chunk-size 5000                # 詞語分批插入，每批一個事務
+  python3 generate_import_sql.py --chunk-size 5000 --split-files  # 每批寫成一個編號 .sql 文件
+  python3 generate_import_sql.py --format copy                    # COPY 載入（需用 psql -f 執行）
+  python3 generate_import_sql.py --manifest-dir .wordlist_manifests  # 全量生成並記錄分組清單
+  python3 generate_import_sql.py --incremental                    # 只同步上次生成後有變化的分組
+  python3 generate_import_sql.py --input other.csv --wordlist-code other_code --wordlist-name 其他詞表 \\
+      --level-2-label 級別 --level-3-label 主題                      # 其他詞表
+
+--incremental 在 .wordlist_manifests/（或 --manifest-dir）中按詞表 code 記錄各 (第二層級, 第三層級)
+分組的內容哈希，據此只輸出有變化分組的刪除和插入；沒有清單時所有分組按新增處理。
+全量生成只有指定 --manifest-dir 時才寫清單，生成其他 CSV 不會覆蓋真實詞表的清單。
+生成的 SQL 需要實際執行，否則請刪除清單文件，下次改用全量生成。
 """
 
-import csv
+import argparse
+import json
+import os
+import re
+import shutil
+import tempfile
+from itertools import chain, islice
+
+from wordlist_reader import iter_wordlist
+from wordlist_manifest import MANIFEST_DIR, GroupHasher, diff_groups, load_manifest, save_manifest
 
 # 讀取 CSV 文件
 input_file = "小學中文字詞表_轉換後.csv"
 output_file = "import_primary_wordlist_full.sql"
+incremental_output_file = "import_primary_wordlist_incremental.sql"
+wordlist_code = "primary_chinese_2025"
+wordlist_name = "小學中文字詞表（2025）"
+wordlist_description = "香港小學中文課本字詞表（一年級至五年級），包含 {word_count} 個核心詞語，按單元和課文組織。"
+level_2_label = "單元"
+level_3_label = "課文"
 
-print(f"📖 讀取文件：{input_file}")
-
-with open(input_file, 'r', encoding='utf-8') as f:
-    reader = csv.DictReader(f)
-    rows = list(reader)
+# 寫出緩衝區大小，以及每攢多少行寫一次
+WRITE_BUFFER_SIZE = 1 << 20
+LINES_PER_WRITE = 4096
 
-print(f"✅ 讀取完成，共 {len(rows)} 個詞語")
+# 模板中的詞表字段（{code}、{name}、{level_2_label} 等）由 wordlist_fields() 填入
 
-# 提取唯一的標籤
-level_2_tags = sorted(set(row['第二層級'] for row in rows if row['第二層級']))
-level_3_tags = sorted(set(row['第三層級'] for row in rows if row['第三層級']))
-
-print(f"📊 統計：")
-print(f"   - 第二層級標籤：{len(level_2_tags)} 個")
-print(f"   - 第三層級標籤：{len(level_3_tags)} 個")
-
-# 生成 SQL 腳本
-print(f"📝 生成 SQL 腳本...")
-
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write("""-- =====================================================
--- 小學中文字詞表 (2025) - 完整 SQL 導入腳本
+# 文件頭：詞表記錄 + 第二層級標籤（另需 word_count）
+HEADER_TEMPLATE = """-- =====================================================
+-- {title} - 完整 SQL 導入腳本
 -- 自動生成於：2025-10-17
--- 總詞語數：{} 個
+-- 總詞語數：{word_count} 個
 -- =====================================================
 
 BEGIN;
@@ -53,13 +70,13 @@ INSERT INTO wordlists (
   total_words,
   is_public
 ) VALUES (
-  '小學中文字詞表（2025）',
-  'primary_chinese_2025',
+  '{name}',
+  '{code}',
   'system',
   NULL,
-  '{{"level_2_label": "單元", "level_3_label": "課文"}}'::jsonb,
-  '香港小學中文課本字詞表（一年級至五年級），包含 {} 個核心詞語，按單元和課文組織。',
-  {},
+  '{hierarchy}'::jsonb,
+  '{description}',
+  {word_count},
   true
 )
 ON CONFLICT (code) DO UPDATE
@@ -73,85 +90,109 @@ SET
 -- 2. 創建層級標籤
 -- ========================================
 
--- 第二層級標籤（單元）
+-- 第二層級標籤（{level_2_label}）
 INSERT INTO wordlist_tags (wordlist_id, tag_level, tag_code, tag_display_name, sort_order)
 SELECT 
-  (SELECT id FROM wordlists WHERE code = 'primary_chinese_2025'),
+  (SELECT id FROM wordlists WHERE code = '{code}'),
   2,
   tag_name,
   tag_name,
   ROW_NUMBER() OVER (ORDER BY tag_name)
 FROM (VALUES
-""".format(len(rows), len(rows), len(rows)))
+"""
 
-    # 寫入第二層級標籤
-    for i, tag in enumerate(level_2_tags):
-        tag_escaped = tag.replace("'", "''")
-        line = f"  ('{tag_escaped}')"
-        if i < len(level_2_tags) - 1:
-            line += ","
-        f.write(line + "\n")
-    
-    f.write(""") AS tags(tag_name)
+# 第三層級標籤
+LEVEL_3_TAGS_HEAD = """) AS tags(tag_name)
 ON CONFLICT (wordlist_id, tag_level, tag_code) DO NOTHING;
 
--- 第三層級標籤（課文）
+-- 第三層級標籤（{level_3_label}）
 INSERT INTO wordlist_tags (wordlist_id, tag_level, tag_code, tag_display_name, sort_order)
 SELECT 
-  (SELECT id FROM wordlists WHERE code = 'primary_chinese_2025'),
+  (SELECT id FROM wordlists WHERE code = '{code}'),
   3,
   tag_name,
   tag_name,
   ROW_NUMBER() OVER (ORDER BY tag_name)
 FROM (VALUES
-""")
+"""
 
-    # 寫入第三層級標籤
-    for i, tag in enumerate(level_3_tags):
-        tag_escaped = tag.replace("'", "''")
-        line = f"  ('{tag_escaped}')"
-        if i < len(level_3_tags) - 1:
-            line += ","
-        f.write(line + "\n")
-    
-    f.write(""") AS tags(tag_name)
+TAGS_TAIL = """) AS tags(tag_name)
 ON CONFLICT (wordlist_id, tag_level, tag_code) DO NOTHING;
+"""
 
+VOCAB_SECTION = """
 -- ========================================
 -- 3. 導入詞彙數據
 -- ========================================
 
--- 批量插入所有詞語
-INSERT INTO wordlist_vocabulary (wordlist_id, word, level_2_tag, level_3_tag)
+"""
+
+VOCAB_INSERT_HEAD = """INSERT INTO wordlist_vocabulary (wordlist_id, word, level_2_tag, level_3_tag)
 SELECT 
-  (SELECT id FROM wordlists WHERE code = 'primary_chinese_2025'),
+  (SELECT id FROM wordlists WHERE code = '{code}'),
   word,
   level_2_tag,
   level_3_tag
 FROM (VALUES
-""".format(len(rows), len(rows), len(rows)))
-
-    # 寫入所有詞語數據
-    for i, row in enumerate(rows):
-        word = row['詞語'].replace("'", "''")  # 轉義單引號
-        level_2 = row['第二層級'].replace("'", "''") if row['第二層級'] else ''
-        level_3 = row['第三層級'].replace("'", "''") if row['第三層級'] else ''
-        
-        # 格式化為 SQL
-        line = f"  ('{word}', '{level_2}', '{level_3}')"
-        
-        # 最後一行不加逗號
-        if i < len(rows) - 1:
-            line += ","
-        
-        f.write(line + "\n")
-    
-    f.write(""") AS t(word, level_2_tag, level_3_tag)
+"""
+
+VOCAB_INSERT_TAIL = """) AS t(word, level_2_tag, level_3_tag)
 ON CONFLICT (wordlist_id, word, level_2_tag, level_3_tag) DO NOTHING;
+"""
 
-COMMIT;
+# COPY 格式：先 COPY 到臨時表，再合併進詞彙表（保留 ON CONFLICT DO NOTHING 的語義）
+STAGING_TABLE = """CREATE TEMP TABLE wordlist_vocabulary_staging (
+  word TEXT,
+  level_2_tag TEXT,
+  level_3_tag TEXT
+) ON COMMIT DROP;
+"""
 
--- ========================================
+COPY_HEAD = STAGING_TABLE + """
+COPY wordlist_vocabulary_staging (word, level_2_tag, level_3_tag) FROM STDIN;
+"""
+
+STAGING_MERGE = """INSERT INTO wordlist_vocabulary (wordlist_id, word, level_2_tag, level_3_tag)
+SELECT 
+  (SELECT id FROM wordlists WHERE code = '{code}'),
+  word,
+  level_2_tag,
+  level_3_tag
+FROM wordlist_vocabulary_staging
+ON CONFLICT (wordlist_id, word, level_2_tag, level_3_tag) DO NOTHING;
+"""
+
+COPY_TAIL = """\\.
+
+""" + STAGING_MERGE
+
+# 增量模式：刪除變化分組中已不存在的詞（空標籤兼容 '' 和 NULL）
+INCREMENTAL_DELETE = """CREATE TEMP TABLE wordlist_changed_groups (
+  level_2_tag TEXT,
+  level_3_tag TEXT
+) ON COMMIT DROP;
+
+INSERT INTO wordlist_changed_groups (level_2_tag, level_3_tag) VALUES
+{groups};
+
+DELETE FROM wordlist_vocabulary v
+USING wordlist_changed_groups g
+WHERE v.wordlist_id = (SELECT id FROM wordlists WHERE code = '{code}')
+  AND COALESCE(v.level_2_tag, '') = g.level_2_tag
+  AND COALESCE(v.level_3_tag, '') = g.level_3_tag
+  AND NOT EXISTS (
+    SELECT 1 FROM wordlist_vocabulary_staging s
+    WHERE s.word = v.word
+      AND s.level_2_tag = g.level_2_tag
+      AND s.level_3_tag = g.level_3_tag
+  );
+"""
+
+# COPY 文本格式需要轉義的字符
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+COPY_SPECIAL = re.compile('[\\\\\t\n\r]')
+
+VERIFY_BLOCK = """-- ========================================
 -- 驗證導入結果
 -- ========================================
 
@@ -166,19 +207,19 @@ BEGIN
   -- 獲取詞表 ID
   SELECT id INTO v_wordlist_id
   FROM wordlists
-  WHERE code = 'primary_chinese_2025';
+  WHERE code = '{code}';
   
   -- 統計詞彙數量
   SELECT COUNT(*) INTO v_word_count
   FROM wordlist_vocabulary
   WHERE wordlist_id = v_wordlist_id;
   
-  -- 統計單元數量
+  -- 統計{level_2_label}數量
   SELECT COUNT(DISTINCT level_2_tag) INTO v_unit_count
   FROM wordlist_vocabulary
   WHERE wordlist_id = v_wordlist_id;
   
-  -- 統計課文數量
+  -- 統計{level_3_label}數量
   SELECT COUNT(DISTINCT level_3_tag) INTO v_lesson_count
   FROM wordlist_vocabulary
   WHERE wordlist_id = v_wordlist_id;
@@ -191,12 +232,12 @@ BEGIN
   RAISE NOTICE '詞表信息：';
   RAISE NOTICE '  - 詞表 ID: %', v_wordlist_id;
   RAISE NOTICE '  - 總詞語數: %', v_word_count;
-  RAISE NOTICE '  - 單元數量: %', v_unit_count;
-  RAISE NOTICE '  - 課文數量: %', v_lesson_count;
+  RAISE NOTICE '  - {level_2_label}數量: %', v_unit_count;
+  RAISE NOTICE '  - {level_3_label}數量: %', v_lesson_count;
   RAISE NOTICE '';
   
-  -- 顯示各單元的詞彙數量
-  RAISE NOTICE '各單元詞彙數量：';
+  -- 顯示各{level_2_label}的詞彙數量
+  RAISE NOTICE '各{level_2_label}詞彙數量：';
   FOR r IN (
     SELECT 
       level_2_tag,
@@ -209,7 +250,9 @@ BEGIN
     RAISE NOTICE '  - %: % 個詞語', r.level_2_tag, r.count;
   END LOOP;
 END $$;
+"""
 
+USAGE_NOTES = """
 -- =====================================================
 -- 使用說明
 -- =====================================================
@@ -226,13 +269,385 @@ END $$;
 -- - 執行時間取決於數據庫性能，約需 5-10 秒
 --
 -- =====================================================
-""")
+"""
+
+
+def sql_quote(value):
+    """轉義單引號"""
+    return value.replace("'", "''")
+
+
+def wordlist_fields(args):
+    """
+    模板中的詞表字段（已轉義，可直接放進 SQL 字符串；title 只用於註釋）
+
+    描述中的 {word_count} 在寫文件頭時換成總詞數。
+    """
+    hierarchy = json.dumps({'level_2_label': args.level_2_label, 'level_3_label': args.level_3_label},
+                           ensure_ascii=False)
+    return {
+        'code': sql_quote(args.wordlist_code),
+        'name': sql_quote(args.wordlist_name),
+        'title': ' '.join(args.wordlist_name.split()),
+        'description': sql_quote(args.description),
+        'hierarchy': sql_quote(hierarchy),
+        'level_2_label': sql_quote(args.level_2_label),
+        'level_3_label': sql_quote(args.level_3_label),
+    }
+
+
+def for_wordlist(sql, fields, **values):
+    """把詞表字段（和其他 values）填入模板"""
+    return sql.format(**fields, **values)
+
+
+def collect_tags(rows, level_2_tags, level_3_tags, hasher=None):
+    """邊讀邊收集標籤（和分組哈希），原樣轉發每一行"""
+    for row in rows:
+        if hasher:
+            hasher.add(*row)
+        if row.level_2:
+            level_2_tags.add(row.level_2)
+        if row.level_3:
+            level_3_tags.add(row.level_3)
+        yield row
+
+
+def write_values(out, rows):
+    """寫出一組詞語 VALUES 行（逗號寫在下一行之前，最後一行不帶逗號），返回行數"""
+    count = 0
+    pending = []
+
+    for row in rows:
+        separator = ",\n" if count else ""
+        pending.append(f"{separator}  ('{sql_quote(row.word)}', '{sql_quote(row.level_2)}', '{sql_quote(row.level_3)}')")
+        count += 1
+
+        if len(pending) >= LINES_PER_WRITE:
+            out.write(''.join(pending))
+            pending.clear()
+
+    if count:
+        pending.append("\n")
+    out.write(''.join(pending))
+    return count
+
+
+def write_copy_rows(out, rows):
+    """寫出一組 COPY 文本格式的行（Tab 分隔，轉義反斜槓、Tab 和換行），返回行數"""
+    count = 0
+    pending = []
+
+    for row in rows:
+        word, level_2, level_3 = row
+        # 絕大多數行不含特殊字符，先整體檢查一次再決定是否逐欄轉義
+        if COPY_SPECIAL.search(f"{word}{level_2}{level_3}"):
+            word, level_2, level_3 = (value.translate(COPY_ESCAPES) for value in row)
+        pending.append(f"{word}\t{level_2}\t{level_3}\n")
+        count += 1
+
+        if len(pending) >= LINES_PER_WRITE:
+            out.write(''.join(pending))
+            pending.clear()
+
+    out.write(''.join(pending))
+    return count
+
+
+# 輸出格式 → (語句開頭, 行寫出函數, 語句結尾)
+FORMATS = {
+    'values': (VOCAB_INSERT_HEAD, write_values, VOCAB_INSERT_TAIL),
+    'copy': (COPY_HEAD, write_copy_rows, COPY_TAIL),
+}
+
+
+def iter_chunks(rows, chunk_size):
+    """把行生成器切成每批最多 chunk_size 行的子生成器"""
+    for first in rows:
+        yield chain([first], islice(rows, chunk_size - 1))
+
+
+def numbered_path(path, index):
+    """import_xxx.sql → import_xxx_0001.sql"""
+    base, ext = os.path.splitext(path)
+    return f"{base}_{index:04d}{ext}"
+
+
+def write_chunks(rows, chunk_size, spool, split_path, fields, fmt='values'):
+    """
+    按批次寫出詞語，每批一條 INSERT、一個事務
+
+    split_path 為 None 時寫到 spool；否則每批寫到一個編號文件（從 _0002 開始，
+    _0001 留給詞表和標籤）。返回 (詞數, 批次數)。
+    """
+    head, write_rows, tail = FORMATS[fmt]
+    head, tail = for_wordlist(head, fields), for_wordlist(tail, fields)
+    word_count = 0
+    chunk_count = 0
+
+    for chunk in iter_chunks(rows, chunk_size):
+        chunk_count += 1
+        out = spool
+        if split_path:
+            out = open(numbered_path(split_path, chunk_count + 1), 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+            out.write(f"-- {fields['title']} - 詞語第 {chunk_count} 批（從第 {word_count + 1} 個詞開始）\n\n")
+        else:
+            out.write(f"-- 第 {chunk_count} 批詞語（從第 {word_count + 1} 個詞開始）\n")
+
+        out.write("BEGIN;\n\n")
+        out.write(head)
+        word_count += write_rows(out, chunk)
+        out.write(tail)
+        out.write("\nCOMMIT;\n\n")
+
+        if split_path:
+            out.close()
+
+    return word_count, chunk_count
+
+
+def write_header(f, word_count, level_2_tags, level_3_tags, fields):
+    """寫出詞表記錄和兩個層級的標籤"""
+    description = fields['description'].replace('{word_count}', str(word_count))
+    f.write(for_wordlist(HEADER_TEMPLATE, dict(fields, description=description), word_count=word_count))
+
+    # 寫入第二層級標籤
+    if level_2_tags:
+        f.write(",\n".join(f"  ('{sql_quote(tag)}')" for tag in level_2_tags) + "\n")
+
+    f.write(for_wordlist(LEVEL_3_TAGS_HEAD, fields))
+
+    # 寫入第三層級標籤
+    if level_3_tags:
+        f.write(",\n".join(f"  ('{sql_quote(tag)}')" for tag in level_3_tags) + "\n")
+
+    f.write(TAGS_TAIL)
+
+
+def write_incremental(args):
+    """
+    增量模式：與上次的分組清單比較，只同步內容有變化或已刪除的分組
+
+    第一遍流式計算分組哈希和標籤，第二遍只把變化分組的詞寫入臨時表；
+    沒有清單時所有分組都視為新增。
+    """
+    print(f"📖 讀取文件：{args.input}")
+
+    level_2_tags = set()
+    level_3_tags = set()
+    hasher = GroupHasher()
+    word_count = sum(1 for _ in collect_tags(iter_wordlist(args.input), level_2_tags, level_3_tags, hasher))
+    groups = hasher.hashes()
+
+    code = args.wordlist_code
+    fields = wordlist_fields(args)
+    manifest_dir = args.manifest_dir or MANIFEST_DIR
+    previous = load_manifest(code, manifest_dir)
+    changed, removed = diff_groups(previous, groups)
+
+    print(f"✅ 讀取完成，共 {word_count} 個詞語，{len(groups)} 個分組")
+    if previous is None:
+        print(f"⚠️ 沒有找到 {code} 的分組清單，所有分組按新增處理")
+    print(f"📊 變化分組：{len(changed)} 個，刪除分組：{len(removed)} 個")
+
+    if not changed and not removed:
+        print("✅ 沒有變化，不需要生成 SQL")
+        return
+
+    changed_keys = set(changed)
+    write_rows = FORMATS[args.format][1]
+
+    with open(args.output, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        write_header(f, word_count, sorted(level_2_tags), sorted(level_3_tags), fields)
+
+        f.write(VOCAB_SECTION)
+        f.write(f"-- 增量同步：{len(changed)} 個分組有變化，{len(removed)} 個分組已刪除\n")
+        f.write(STAGING_TABLE)
+        f.write("\n")
+
+        # 只有刪除的分組時臨時表保持為空
+        rows = (row for row in iter_wordlist(args.input) if (row.level_2, row.level_3) in changed_keys)
+        staged = 0
+        if changed and args.format == 'copy':
+            f.write("COPY wordlist_vocabulary_staging (word, level_2_tag, level_3_tag) FROM STDIN;\n")
+            staged = write_rows(f, rows)
+            f.write("\\.\n\n")
+        elif changed:
+            f.write("INSERT INTO wordlist_vocabulary_staging (word, level_2_tag, level_3_tag) VALUES\n")
+            staged = write_rows(f, rows)
+            f.write(";\n\n")
+
+        f.write(for_wordlist(INCREMENTAL_DELETE, fields, groups=",\n".join(
+            f"  ('{sql_quote(level_2)}', '{sql_quote(level_3)}')" for level_2, level_3 in changed + removed
+        )))
+        f.write("\n")
+        f.write(for_wordlist(STAGING_MERGE, fields))
+        f.write("\nCOMMIT;\n\n")
+        f.write(for_wordlist(VERIFY_BLOCK, fields))
+        f.write(USAGE_NOTES)
+
+    manifest = save_manifest(code, groups, manifest_dir)
+
+    print(f"✅ SQL 腳本已生成：{args.output}")
+    print(f"📊 寫入 {staged} 個詞語（共 {word_count} 個），刪除 {len(removed)} 個分組")
+    print(f"🗂️ 分組清單已更新：{manifest}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='生成小學中文字詞表的 SQL 導入腳本')
+    parser.add_argument('--input', default=input_file, help=f'CSV 文件（默認 {input_file}）')
+    parser.add_argument('--output', default=None,
+                        help=f'輸出 SQL 文件（默認 {output_file}；增量模式默認 {incremental_output_file}）')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='values',
+                        help='values：INSERT ... VALUES，可在 SQL Editor 執行（默認）；'
+                             'copy：COPY ... FROM STDIN，載入更快，需用 psql -f 執行')
+    parser.add_argument('--chunk-size', type=int, default=None,
+                        help='每條詞語 INSERT 最多包含的詞數；不設置時生成一條 INSERT（默認）')
+    parser.add_argument('--split-files', action='store_true',
+                        help='配合 --chunk-size：每批寫成一個編號 .sql 文件，按編號順序執行')
+    parser.add_argument('--incremental', action='store_true',
+                        help='只同步上次生成後內容有變化的 (第二層級, 第三層級) 分組')
+    parser.add_argument('--wordlist-code', default=wordlist_code,
+                        help=f'生成的 SQL 寫入的詞表 code，也是分組清單的文件名（默認 {wordlist_code}）')
+    parser.add_argument('--wordlist-name', default=None,
+                        help=f'詞表名稱（默認 {wordlist_name}；指定其他 --wordlist-code 時必填）')
+    parser.add_argument('--description', default=None,
+                        help='詞表描述，{word_count} 會換成總詞數（默認為小學中文字詞表的描述；其他詞表默認為空）')
+    parser.add_argument('--level-2-label', default=level_2_label,
+                        help=f'第二層級的名稱，寫入 hierarchy_config（默認 {level_2_label}）')
+    parser.add_argument('--level-3-label', default=level_3_label,
+                        help=f'第三層級的名稱，寫入 hierarchy_config（默認 {level_3_label}）')
+    parser.add_argument('--manifest-dir', default=None,
+                        help=f'分組哈希清單目錄；全量生成只有指定時才記錄清單（增量模式默認 {MANIFEST_DIR}）')
+    args = parser.parse_args()
+
+    if args.output is None:
+        args.output = incremental_output_file if args.incremental else output_file
+
+    if args.chunk_size is not None and args.chunk_size < 1:
+        parser.error('--chunk-size 必須大於 0')
+    if args.split_files and args.chunk_size is None:
+        parser.error('--split-files 需要同時指定 --chunk-size')
+    if args.incremental and args.chunk_size is not None:
+        parser.error('--incremental 不支持 --chunk-size')
+
+    # 其他詞表不能沿用小學中文字詞表的名稱和描述，否則 ON CONFLICT 會把它改名
+    primary = args.wordlist_code == wordlist_code
+    if args.wordlist_name is None:
+        if not primary:
+            parser.error('指定其他 --wordlist-code 時需要同時指定 --wordlist-name')
+        args.wordlist_name = wordlist_name
+    if args.description is None:
+        args.description = wordlist_description if primary else ''
+
+    return args
+
+
+def main():
+    args = parse_args()
+
+    if args.incremental:
+        write_incremental(args)
+        return
+
+    print(f"📖 讀取文件：{args.input}")
+
+    # 單遍讀取：一邊收集標籤，一邊把詞語 VALUES 行寫到臨時文件
+    # （文件頭需要總詞數、標籤要寫在詞語之前，所以詞語先落到臨時文件）
+    fields = wordlist_fields(args)
+    level_2_tags = set()
+    level_3_tags = set()
+    hasher = GroupHasher()
+    rows = collect_tags(iter_wordlist(args.input), level_2_tags, level_3_tags, hasher)
+    spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+    if args.chunk_size:
+        split_path = args.output if args.split_files else None
+        word_count, chunk_count = write_chunks(rows, args.chunk_size, spool, split_path, fields, args.format)
+    else:
+        word_count, chunk_count = FORMATS[args.format][1](spool, rows), 1
+    spool.seek(0)
+
+    level_2_tags = sorted(level_2_tags)
+    level_3_tags = sorted(level_3_tags)
+
+    print(f"✅ 讀取完成，共 {word_count} 個詞語")
+
+    print(f"📊 統計：")
+    print(f"   - 第二層級標籤：{len(level_2_tags)} 個")
+    print(f"   - 第三層級標籤：{len(level_3_tags)} 個")
+
+    # 生成 SQL 腳本
+    print(f"📝 生成 SQL 腳本...")
+
+    header_file = numbered_path(args.output, 1) if args.split_files else args.output
+
+    with open(header_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        write_header(f, word_count, level_2_tags, level_3_tags, fields)
+
+        if args.chunk_size:
+            # 分批模式：詞表和標籤先單獨提交，每批詞語各自一個事務
+            f.write("\nCOMMIT;\n")
+            if not args.split_files:
+                f.write(VOCAB_SECTION)
+                shutil.copyfileobj(spool, f, WRITE_BUFFER_SIZE)
+                f.write(for_wordlist(VERIFY_BLOCK, fields))
+                f.write(USAGE_NOTES)
+        else:
+            head, _, tail = FORMATS[args.format]
+            f.write(VOCAB_SECTION)
+            if args.format == 'copy':
+                f.write("-- 用 COPY 載入所有詞語，再合併進詞彙表\n")
+            else:
+                f.write("-- 批量插入所有詞語\n")
+            f.write(for_wordlist(head, fields))
+
+            # 寫入所有詞語數據（從臨時文件整塊複製）
+            shutil.copyfileobj(spool, f, WRITE_BUFFER_SIZE)
+
+            f.write(for_wordlist(tail, fields))
+            f.write("\nCOMMIT;\n\n")
+            f.write(for_wordlist(VERIFY_BLOCK, fields))
+            f.write(USAGE_NOTES)
+
+    spool.close()
+
+    # 指定了 --manifest-dir 才記錄分組哈希，供下次 --incremental 比較
+    manifest = save_manifest(args.wordlist_code, hasher.hashes(), args.manifest_dir) if args.manifest_dir else None
+
+    output_files = [header_file]
+    if args.split_files:
+        output_files += [numbered_path(args.output, i + 2) for i in range(chunk_count)]
+        verify_file = numbered_path(args.output, chunk_count + 2)
+        with open(verify_file, 'w', encoding='utf-8') as f:
+            f.write(for_wordlist(VERIFY_BLOCK, fields))
+            f.write(USAGE_NOTES)
+        output_files.append(verify_file)
+
+    if len(output_files) > 1:
+        print(f"✅ SQL 腳本已生成：{len(output_files)} 個文件（{output_files[0]} … {output_files[-1]}）")
+    else:
+        print(f"✅ SQL 腳本已生成：{header_file}")
+    if args.chunk_size:
+        print(f"📊 包含 {word_count} 個詞語，分 {chunk_count} 批插入（每批最多 {args.chunk_size} 個）")
+    else:
+        print(f"📊 包含 {word_count} 個詞語的完整導入語句")
+    if manifest:
+        print(f"🗂️ 分組清單已更新：{manifest}")
+    print(f"\n💡 使用方法：")
+    if args.format == 'copy':
+        # COPY ... FROM STDIN 只能由 psql 這類客戶端執行，SQL Editor 不支持
+        for path in output_files:
+            print(f"   psql \"$DATABASE_URL\" -v ON_ERROR_STOP=1 -f {path}")
+        return
+    print(f"   1. 打開 Supabase Dashboard 的 SQL Editor")
+    if len(output_files) > 1:
+        print(f"   2. 按編號順序逐個複製 {output_files[0]} … {output_files[-1]} 的內容")
+    else:
+        print(f"   2. 複製 {header_file} 的內容")
+    print(f"   3. 貼上並執行")
+    print(f"   4. 查看執行結果")
 
-print(f"✅ SQL 腳本已生成：{output_file}")
-print(f"📊 包含 {len(rows)} 個詞語的完整導入語句")
-print(f"\n💡 使用方法：")
-print(f"   1. 打開 Supabase Dashboard 的 SQL Editor")
-print(f"   2. 複製 {output_file} 的內容")
-print(f"   3. 貼上並執行")
-print(f"   4. 查看執行結果")
 
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+詞語難度 / 頻率離線預評分（admin/import_hsk_to_supabase.py 導入時使用）
+
+彙總倉庫中所有詞表 CSV 的統計，一次性為整個詞表打分，不需要逐詞調用 AI：
+- 階段：每個詞表按第二層級首次出現的順序排列（HSK1級 → HSK6級、
+  一上單元一 → 五下單元二），歸一化到 0-1
+- 字頻：每個字在所有詞表的詞語中出現的次數
+- 字階段：每個字最早出現的階段
+- 詞長
+
+難度為 1-5（與 L1-L5 對應），頻率為 1-100。詞語本身的階段與用字推算的階段
+相差較大、或詞語不在任何詞表中時，標記為「需要 AI 複核」。
+
+使用方法：
+  python3 word_scoring.py                          # 給倉庫中所有詞表打分，打印分佈
+  python3 word_scoring.py --csv ../docs/hsk_standard_traditional.csv --output scores.json
+"""
+
+import argparse
+import glob
+import json
+import os
+from collections import Counter
+
+import numpy as np
+
+from wordlist_reader import iter_wordlist
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+STORY_VOCAB_DIR = os.path.dirname(DATA_DIR)
+
+# 參與統計的詞表 CSV（倉庫中的全部詞表）
+SOURCE_PATTERNS = (
+    os.path.join(DATA_DIR, '*.csv'),
+    os.path.join(STORY_VOCAB_DIR, 'docs', '*.csv'),
+)
+
+# 難度等級範圍（L1-L5）
+MIN_DIFFICULTY = 1
+MAX_DIFFICULTY = 5
+
+# 難度各特徵的權重：詞語階段、最難字的階段、最罕見字的字頻、詞長
+DIFFICULTY_WEIGHTS = (0.5, 0.25, 0.15, 0.1)
+
+# 詞語階段與用字階段相差超過此值時需要 AI 複核
+REVIEW_STAGE_GAP = 0.4
+
+
+def source_files():
+    """倉庫中所有詞表 CSV（按路徑排序，保證統計穩定）"""
+    return sorted({path for pattern in SOURCE_PATTERNS for path in glob.glob(pattern)})
+
+
+class CorpusStats:
+    """
+    所有詞表的字 / 詞統計
+
+    字以整數編號存儲，各項統計都是按編號索引的 numpy 數組，
+    打分時可以對整個詞表一次性做向量運算。
+    """
+
+    def __init__(self, csv_paths):
+        self.char_ids = {}
+        char_counts = Counter()
+        char_stage = {}
+        self.word_stage = {}
+        self.word_count = Counter()
+
+        for path in csv_paths:
+            rows = list(iter_wordlist(path))
+            tags = list(dict.fromkeys(row.level_2 for row in rows))
+            stage_of = {tag: i / max(len(tags) - 1, 1) for i, tag in enumerate(tags)}
+
+            for row in rows:
+                stage = stage_of[row.level_2]
+                self.word_count[row.word] += 1
+                self.word_stage[row.word] = min(stage, self.word_stage.get(row.word, 1.0))
+                for char in row.word:
+                    self.char_ids.setdefault(char, len(self.char_ids))
+                    char_counts[char] += 1
+                    char_stage[char] = min(stage, char_stage.get(char, 1.0))
+
+        size = len(self.char_ids)
+        self.char_count = np.zeros(size, dtype=np.float64)
+        self.char_stage = np.ones(size, dtype=np.float64)
+        for char, index in self.char_ids.items():
+            self.char_count[index] = char_counts[char]
+            self.char_stage[index] = char_stage[char]
+
+        # 對數字頻歸一化到 0-1
+        self.char_log_freq = np.log1p(self.char_count) / max(np.log1p(self.char_count.max(initial=0)), 1e-9)
+        self.max_word_count = max(self.word_count.values(), default=1)
+
+    def encode(self, words):
+        """把詞語編碼成 (詞數, 最大詞長) 的字編號矩陣，不足處和未知字為 -1"""
+        width = max((len(word) for word in words), default=1)
+        ids = np.full((len(words), width), -1, dtype=np.int64)
+        for row, word in enumerate(words):
+            ids[row, :len(word)] = [self.char_ids.get(char, -1) for char in word]
+        return ids
+
+
+def score_words(words, stats):
+    """
+    一次性為一組詞語打分
+
+    Args:
+        words: 詞語列表（可重複）
+        stats: CorpusStats
+
+    Returns:
+        {詞: {'difficulty_level', 'frequency', 'needs_review'}}
+    """
+    words = list(dict.fromkeys(words))
+    if not words:
+        return {}
+
+    ids = stats.encode(words)
+    known = ids >= 0
+    lengths = np.array([len(word) for word in words], dtype=np.float64)
+    safe_ids = np.where(known, ids, 0)
+
+    # 未知字按最罕見、最晚階段處理
+    char_freq = np.where(known, stats.char_log_freq[safe_ids], 0.0)
+    char_stage = np.where(known, stats.char_stage[safe_ids], 1.0)
+    padding = np.arange(ids.shape[1]) >= lengths[:, None]
+
+    rarest = np.where(padding, np.inf, char_freq).min(axis=1)
+    mean_freq = np.where(padding, 0.0, char_freq).sum(axis=1) / lengths
+    hardest_char_stage = np.where(padding, 0.0, char_stage).max(axis=1)
+
+    listed = np.array([word in stats.word_stage for word in words])
+    word_stage = np.array([stats.word_stage.get(word, np.nan) for word in words])
+    # 不在任何詞表中的詞，用字階段代替詞語階段
+    stage = np.where(listed, word_stage, hardest_char_stage)
+    length_score = np.clip((lengths - 1) / 3, 0, 1)
+
+    w_stage, w_char, w_rare, w_length = DIFFICULTY_WEIGHTS
+    raw = w_stage * stage + w_char * hardest_char_stage + w_rare * (1 - rarest) + w_length * length_score
+    levels = MAX_DIFFICULTY - MIN_DIFFICULTY + 1
+    difficulty = np.clip(MIN_DIFFICULTY + np.floor(raw * levels), MIN_DIFFICULTY, MAX_DIFFICULTY).astype(int)
+
+    # 頻率：常用字多、出現階段早、被多個詞表收錄的詞更常見
+    listings = np.array([stats.word_count.get(word, 0) for word in words], dtype=np.float64)
+    breadth = listings / stats.max_word_count
+    frequency = np.clip(np.rint(100 * (0.5 * mean_freq + 0.35 * (1 - stage) + 0.15 * breadth)), 1, 100).astype(int)
+
+    needs_review = ~listed | (np.abs(stage - hardest_char_stage) > REVIEW_STAGE_GAP)
+
+    return {
+        word: {
+            'difficulty_level': int(difficulty[i]),
+            'frequency': int(frequency[i]),
+            'needs_review': bool(needs_review[i])
+        }
+        for i, word in enumerate(words)
+    }
+
+
+def score_wordlist(words, csv_paths=None):
+    """用倉庫中所有詞表（或指定的 CSV）的統計為 words 打分"""
+    return score_words(words, CorpusStats(csv_paths or source_files()))
+
+
+def print_summary(scores):
+    """打印難度分佈和需要複核的詞數"""
+    distribution = Counter(item['difficulty_level'] for item in scores.values())
+    review = sum(item['needs_review'] for item in scores.values())
+    print(f"📊 難度分佈（共 {len(scores)} 個詞）:")
+    for level in range(MIN_DIFFICULTY, MAX_DIFFICULTY + 1):
+        print(f"  L{level}: {distribution.get(level, 0)} 個")
+    print(f"🔍 需要 AI 複核: {review} 個（{review / max(len(scores), 1):.0%}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='離線預評分詞語難度和頻率')
+    parser.add_argument('--csv', action='append',
+                        help='要打分的詞表 CSV，可重複（默認倉庫中的所有詞表）')
+    parser.add_argument('--output', help='把評分寫成 JSON（{詞: {difficulty_level, frequency, needs_review}}）')
+    args = parser.parse_args()
+
+    sources = source_files()
+    targets = args.csv or sources
+    words = [row.word for path in targets for row in iter_wordlist(path)]
+
+    print(f"📖 統計來源: {', '.join(os.path.relpath(path) for path in sources)}")
+    scores = score_wordlist(words, sources)
+    print_summary(scores)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(scores, f, ensure_ascii=False, indent=2)
+        print(f"✅ 評分已寫入: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
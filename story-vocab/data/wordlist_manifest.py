@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+詞表分組內容哈希清單（generate_import_sql.py、admin/import_hsk_to_supabase.py 的增量模式共用）
+
+按 (第二層級, 第三層級) 分組，對每組的詞語按出現順序計算 SHA-256。
+與上次導入時保存的清單比較，只有哈希變化或消失的分組需要重新同步。
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# 默認清單目錄（每個詞表 code 一個 JSON 文件）
+MANIFEST_DIR = '.wordlist_manifests'
+
+
+class GroupHasher:
+    """流式累計每個分組的哈希，不保存詞語本身"""
+
+    def __init__(self):
+        self._digests = {}
+
+    def add(self, word, level_2, level_3):
+        """加入一個詞；空標籤統一用 '' 表示"""
+        key = (level_2 or '', level_3 or '')
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = hashlib.sha256()
+        digest.update(word.encode('utf-8') + b'\n')
+
+    def hashes(self):
+        """返回 {(level_2, level_3): 哈希}"""
+        return {key: digest.hexdigest() for key, digest in self._digests.items()}
+
+
+def manifest_path(code, directory=MANIFEST_DIR):
+    return os.path.join(directory, f'{code}.json')
+
+
+def load_manifest(code, directory=MANIFEST_DIR):
+    """讀取上次導入的分組哈希；沒有清單時返回 None（需要全量導入）"""
+    path = manifest_path(code, directory)
+    if not os.path.exists(path):
+        return None
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    return {(level_2, level_3): digest for level_2, level_3, digest in data['groups']}
+
+
+def save_manifest(code, groups, directory=MANIFEST_DIR):
+    """保存本次導入後的分組哈希"""
+    os.makedirs(directory, exist_ok=True)
+    path = manifest_path(code, directory)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'code': code,
+            'updated_at': datetime.now().isoformat(),
+            'groups': [[level_2, level_3, digest] for (level_2, level_3), digest in sorted(groups.items())]
+        }, f, ensure_ascii=False, indent=2)
+
+    return path
+
+
+def diff_groups(old, new):
+    """比較新舊清單，返回 (內容有變化或新增的分組, 已刪除的分組)，均按標籤排序"""
+    old = old or {}
+    changed = sorted(key for key, digest in new.items() if old.get(key) != digest)
+    removed = sorted(key for key in old if key not in new)
+    return changed, removed
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+詞表 CSV 流式讀取（generate_import_sql.py、csv-to-wordlist-json.py、
+admin/import_hsk_to_supabase.py 共用）
+
+逐行產出 WordRow(word, level_2, level_3)，不把整個文件讀進內存；
+簡體 / 繁體表頭（词语 / 詞語、第二层级 / 第二層級 ...）在這裡統一處理。
+"""
+
+import csv
+from collections import namedtuple
+
+# 每行一個緊湊的元組；空標籤為 ''
+WordRow = namedtuple('WordRow', ['word', 'level_2', 'level_3'])
+
+# 欄位 → 可接受的表頭（繁體優先）
+HEADER_ALIASES = {
+    'word': ('詞語', '词语'),
+    'level_2': ('第二層級', '第二层级'),
+    'level_3': ('第三層級', '第三层级'),
+}
+
+
+def resolve_columns(header):
+    """根據表頭找出各欄位的列號；缺少可選的層級列時返回 None"""
+    positions = {name.strip(): i for i, name in enumerate(header)}
+    columns = {}
+
+    for field, aliases in HEADER_ALIASES.items():
+        columns[field] = next((positions[a] for a in aliases if a in positions), None)
+
+    if columns['word'] is None:
+        raise ValueError(f"CSV 缺少詞語列（{' / '.join(HEADER_ALIASES['word'])}），表頭：{header}")
+
+    return columns
+
+
+def iter_wordlist(csv_path):
+    """逐行讀取詞表 CSV，產出 WordRow；跳過詞語為空的行"""
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+
+        columns = resolve_columns(header)
+        word_col, level_2_col, level_3_col = columns['word'], columns['level_2'], columns['level_3']
+
+        for row in reader:
+            word = row[word_col].strip() if word_col < len(row) else ''
+            if not word:
+                continue
+
+            level_2 = row[level_2_col].strip() if level_2_col is not None and level_2_col < len(row) else ''
+            level_3 = row[level_3_col].strip() if level_3_col is not None and level_3_col < len(row) else ''
+
+            yield WordRow(word, level_2, level_3)
@@ -1,11 +1,121 @@
 /**
  * 詞表加載器
  * 負責加載和管理系統詞表的 JSON 數據
+ *
+ * 有分片格式（{code}/manifest.json）時，瀏覽標籤只加載幾 KB 的清單，
+ * 詞語按第二層級分片按需加載；沒有分片時退回加載完整詞表。
+ *
+ * 有 index.json（csv-to-wordlist-json.py --hashed）時，優先加載帶內容哈希的文件：
+ * 只有 index.json 需要重新驗證，其餘文件內容不變、直接使用瀏覽器緩存。
+ *
+ * 跨詞表倒排索引（word-index.json）用於查詢某個詞在哪些詞表、哪些分組中，
+ * 詞語已排序，lookupWord() 在本地二分查找，不需要查詢數據庫。
  */
 
 // 詞表緩存
 const wordlistCache = new Map();
 
+// 詞表索引緩存（分片清單或由完整詞表生成的索引）
+const indexCache = new Map();
+
+// 分片緩存：`${wordlistCode}/${shard}` → 第三層級數據
+const shardCache = new Map();
+
+// 內容哈希文件索引（index.json）的 Promise；沒有索引時結果為 null
+let artifactIndexPromise = null;
+
+// 跨詞表倒排索引的 Promise；沒有索引文件時結果為 null
+let wordIndexPromise = null;
+
+// 帶內容哈希的文件永不改變，允許直接使用瀏覽器緩存而不重新驗證
+const HASHED_FETCH_OPTIONS = { cache: 'force-cache' };
+
+/**
+ * 詞表文件目錄
+ * 本地開發：服務器在 story-vocab/ 目錄，使用 /assets/...
+ * GitHub Pages：使用 /story-vocab/assets/...
+ */
+function getWordlistBasePath() {
+  const isLocalDev = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1';
+  const pathPrefix = isLocalDev ? '' : '/story-vocab';
+  return `${pathPrefix}/assets/data/wordlists`;
+}
+
+/**
+ * 加載內容哈希文件索引（每次頁面加載只請求一次，並要求重新驗證）
+ * @returns {Promise<Object|null>} { version, wordlists: { code: { compact, manifest } }, word_index }
+ */
+function loadArtifactIndex() {
+  if (!artifactIndexPromise) {
+    artifactIndexPromise = fetch(`${getWordlistBasePath()}/index.json`, { cache: 'no-cache' })
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  return artifactIndexPromise;
+}
+
+/**
+ * 獲取帶內容哈希的文件路徑
+ * @param {string} wordlistCode - 詞表代碼
+ * @param {string} kind - 'compact' 或 'manifest'
+ * @returns {Promise<string|null>} 文件 URL；索引中沒有時返回 null
+ */
+async function getHashedPath(wordlistCode, kind) {
+  const index = await loadArtifactIndex();
+  const filename = index?.wordlists?.[wordlistCode]?.[kind];
+  return filename ? `${getWordlistBasePath()}/${filename}` : null;
+}
+
+/**
+ * 依次嘗試帶哈希的文件和固定文件名，返回第一個成功的響應
+ * @param {string|null} hashedPath - 帶內容哈希的文件 URL
+ * @param {Array<string>} fallbackPaths - 固定文件名的 URL
+ */
+async function fetchFirstAvailable(hashedPath, fallbackPaths) {
+  let response = null;
+  if (hashedPath) {
+    response = await fetch(hashedPath, HASHED_FETCH_OPTIONS).catch(() => null);
+  }
+  for (const path of fallbackPaths) {
+    if (response && response.ok) break;
+    response = await fetch(path);
+  }
+  return response;
+}
+
+/**
+ * 把緊湊格式的分組還原為 { 第三層級: 詞語數組 }
+ * @param {Array} groups - [第三層級, 起始偏移, 詞數] 或 [第三層級, [偏移, ...]]
+ * @param {Array<string>} words - 詞語字符串表
+ */
+function expandGroups(groups, words) {
+  const level3Data = {};
+  for (const group of groups) {
+    level3Data[group[0]] = Array.isArray(group[1])
+      ? group[1].map(offset => words[offset])
+      : words.slice(group[1], group[1] + group[2]);
+  }
+  return level3Data;
+}
+
+/**
+ * 將緊湊格式（csv-to-wordlist-json.py --format compact）還原為嵌套的 hierarchy
+ * @param {Object} data - 緊湊格式數據 { index, words, ... }
+ * @returns {Object} 與嵌套格式相同結構的詞表數據
+ */
+function expandCompactWordlist(data) {
+  const { index, words, ...metadata } = data;
+  const hierarchy = {};
+  
+  for (const [level2, groups] of index) {
+    hierarchy[level2] = expandGroups(groups, words);
+  }
+  
+  delete metadata.format;
+  delete metadata.version;
+  return { ...metadata, hierarchy };
+}
+
 /**
  * 加載詞表 JSON 文件
  * @param {string} wordlistCode - 詞表代碼（如 'primary_chinese_2025'）
@@ -21,19 +131,18 @@ export async function loadWordlist(wordlistCode) {
   try {
     console.log(`📥 加載詞表 JSON: ${wordlistCode}`);
     
-    // 自動檢測路徑前綴
-    // 本地開發：服務器在 story-vocab/ 目錄，使用 /assets/...
-    // GitHub Pages：使用 /story-vocab/assets/...
-    const isLocalDev = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1';
-    const pathPrefix = isLocalDev ? '' : '/story-vocab';
+    const basePath = `${getWordlistBasePath()}/${wordlistCode}`;
     
-    const response = await fetch(`${pathPrefix}/assets/data/wordlists/${wordlistCode}.json`);
+    // 優先加載帶哈希的緊湊格式，其次固定文件名的緊湊格式，最後退回嵌套格式
+    const hashedPath = await getHashedPath(wordlistCode, 'compact');
+    const response = await fetchFirstAvailable(hashedPath, [`${basePath}.compact.json`, `${basePath}.json`]);
     
     if (!response.ok) {
       throw new Error(`HTTP ${response.status}: ${response.statusText}`);
     }
     
-    const data = await response.json();
+    const raw = await response.json();
+    const data = raw.format === 'compact' ? expandCompactWordlist(raw) : raw;
     
     // 存入緩存
     wordlistCache.set(wordlistCode, data);
@@ -52,14 +161,102 @@ export async function loadWordlist(wordlistCode) {
   }
 }
 
+/**
+ * 加載詞表索引（元數據 + 每個第二層級的名稱、詞數和第三層級）
+ * 優先使用分片清單；沒有分片時由完整詞表生成
+ * @param {string} wordlistCode - 詞表代碼
+ * @returns {Promise<Object>} { id, name, code, total_words, level2: [{ name, count, level3, shard }] }
+ */
+async function loadWordlistIndex(wordlistCode) {
+  if (indexCache.has(wordlistCode)) {
+    return indexCache.get(wordlistCode);
+  }
+  
+  let index = null;
+  
+  try {
+    const hashedPath = await getHashedPath(wordlistCode, 'manifest');
+    const response = await fetchFirstAvailable(hashedPath, [`${getWordlistBasePath()}/${wordlistCode}/manifest.json`]);
+    if (response.ok) {
+      index = await response.json();
+      console.log(`✅ 詞表清單加載成功: ${wordlistCode}（${index.level2.length} 個分片）`);
+    }
+  } catch (error) {
+    console.warn(`⚠️ 詞表清單加載失敗，改為加載完整詞表: ${wordlistCode}`, error);
+  }
+  
+  if (!index) {
+    const wordlist = await loadWordlist(wordlistCode);
+    index = {
+      id: wordlist.id,
+      name: wordlist.name,
+      code: wordlist.code,
+      total_words: wordlist.total_words,
+      level2: Object.entries(wordlist.hierarchy).map(([name, level3Data]) => ({
+        name,
+        count: Object.values(level3Data).reduce((sum, words) => sum + words.length, 0),
+        level3: Object.keys(level3Data),
+        shard: null
+      }))
+    };
+  }
+  
+  indexCache.set(wordlistCode, index);
+  return index;
+}
+
+/**
+ * 加載某個第二層級的數據（分片按需加載）
+ * @param {string} wordlistCode - 詞表代碼
+ * @param {string} level2Tag - 第二層級標籤
+ * @returns {Promise<Object|null>} { 第三層級: 詞語數組 }，找不到時返回 null
+ */
+async function loadLevel2Data(wordlistCode, level2Tag) {
+  const index = await loadWordlistIndex(wordlistCode);
+  const entry = index.level2.find(item => item.name === level2Tag);
+  
+  if (!entry) {
+    return null;
+  }
+  
+  if (!entry.shard) {
+    const wordlist = await loadWordlist(wordlistCode);
+    return wordlist.hierarchy[level2Tag];
+  }
+  
+  const cacheKey = `${wordlistCode}/${entry.shard}`;
+  if (!shardCache.has(cacheKey)) {
+    // 緩存 Promise，並發請求同一分片時只下載一次
+    // 帶哈希的分片（清單中 hashed 為 true）可直接使用瀏覽器緩存
+    const promise = fetch(`${getWordlistBasePath()}/${cacheKey}`, index.hashed ? HASHED_FETCH_OPTIONS : undefined)
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return response.json();
+      })
+      .then(shard => {
+        console.log(`📥 分片加載成功: ${wordlistCode} > ${level2Tag}`);
+        return expandGroups(shard.groups, shard.words);
+      })
+      .catch(error => {
+        shardCache.delete(cacheKey);
+        throw error;
+      });
+    shardCache.set(cacheKey, promise);
+  }
+  
+  return shardCache.get(cacheKey);
+}
+
 /**
  * 獲取第二層級標籤列表
  * @param {string} wordlistCode - 詞表代碼
  * @returns {Promise<Array<string>>} 第二層級標籤數組
  */
 export async function getLevel2Tags(wordlistCode) {
-  const wordlist = await loadWordlist(wordlistCode);
-  return Object.keys(wordlist.hierarchy);
+  const index = await loadWordlistIndex(wordlistCode);
+  return index.level2.map(entry => entry.name);
 }
 
 /**
@@ -69,17 +266,16 @@ export async function getLevel2Tags(wordlistCode) {
  * @returns {Promise<Array<string>>} 第三層級標籤數組
  */
 export async function getLevel3Tags(wordlistCode, level2Tag) {
-  const wordlist = await loadWordlist(wordlistCode);
+  const index = await loadWordlistIndex(wordlistCode);
+  const entry = index.level2.find(item => item.name === level2Tag);
   
-  if (!wordlist.hierarchy[level2Tag]) {
+  if (!entry) {
     console.warn(`⚠️ 未找到第二層級: ${level2Tag}`);
     return [];
   }
   
-  const level3Data = wordlist.hierarchy[level2Tag];
-  
   // 過濾掉特殊鍵 "_all"（用於兩層結構）
-  const level3Tags = Object.keys(level3Data).filter(key => key !== '_all');
+  const level3Tags = entry.level3.filter(key => key !== '_all');
   
   console.log(`📖 ${level2Tag} 的第三層級:`, level3Tags.length, '個');
   
@@ -94,15 +290,13 @@ export async function getLevel3Tags(wordlistCode, level2Tag) {
  * @returns {Promise<Array<string>>} 詞語數組
  */
 export async function getWords(wordlistCode, level2Tag, level3Tag = null) {
-  const wordlist = await loadWordlist(wordlistCode);
+  const level3Data = await loadLevel2Data(wordlistCode, level2Tag);
   
-  if (!wordlist.hierarchy[level2Tag]) {
+  if (!level3Data) {
     console.warn(`⚠️ 未找到第二層級: ${level2Tag}`);
     return [];
   }
   
-  const level3Data = wordlist.hierarchy[level2Tag];
-  
   if (level3Tag) {
     // 獲取特定第三層級的詞語
     const words = level3Data[level3Tag] || [];
@@ -125,12 +319,12 @@ export async function getWords(wordlistCode, level2Tag, level3Tag = null) {
  * @returns {Promise<Object>} 詞表元數據（不包含 hierarchy）
  */
 export async function getWordlistMetadata(wordlistCode) {
-  const wordlist = await loadWordlist(wordlistCode);
+  const index = await loadWordlistIndex(wordlistCode);
   return {
-    id: wordlist.id,
-    name: wordlist.name,
-    code: wordlist.code,
-    total_words: wordlist.total_words
+    id: index.id,
+    name: index.name,
+    code: index.code,
+    total_words: index.total_words
   };
 }
 
@@ -155,11 +349,62 @@ export async function preloadWordlists(wordlistCodes) {
   console.log(`✅ 預加載完成`);
 }
 
+/**
+ * 加載跨詞表倒排索引（有 index.json 時優先使用帶內容哈希的文件）
+ * @returns {Promise<Object|null>} { wordlists, tags, words, postings }；沒有索引文件時為 null
+ */
+function loadWordIndex() {
+  if (!wordIndexPromise) {
+    wordIndexPromise = (async () => {
+      const index = await loadArtifactIndex();
+      const hashedPath = index?.word_index ? `${getWordlistBasePath()}/${index.word_index}` : null;
+      const response = await fetchFirstAvailable(hashedPath, [`${getWordlistBasePath()}/word-index.json`]);
+      return response && response.ok ? response.json() : null;
+    })().catch(() => null);
+  }
+  return wordIndexPromise;
+}
+
+/**
+ * 查詢詞語所在的詞表和分組（二分查找倒排索引）
+ * @param {string} word - 詞語
+ * @returns {Promise<Array|null>} [{ wordlistCode, level2, level3 }]，不在任何詞表中時為空數組；
+ *   沒有索引文件時返回 null（調用方可退回查詢數據庫）
+ */
+export async function lookupWord(word) {
+  const data = await loadWordIndex();
+  if (!data) return null;
+
+  const { words } = data;
+  let low = 0;
+  let high = words.length - 1;
+  while (low <= high) {
+    const mid = (low + high) >> 1;
+    if (words[mid] === word) {
+      const posting = data.postings[mid];
+      return (Array.isArray(posting) ? posting : [posting]).map(tagId => {
+        const [listIndex, level2, level3] = data.tags[tagId];
+        return { wordlistCode: data.wordlists[listIndex], level2, level3 };
+      });
+    }
+    if (words[mid] < word) {
+      low = mid + 1;
+    } else {
+      high = mid - 1;
+    }
+  }
+  return [];
+}
+
 /**
  * 清除緩存（用於調試）
  */
 export function clearCache() {
   wordlistCache.clear();
+  indexCache.clear();
+  shardCache.clear();
+  artifactIndexPromise = null;
+  wordIndexPromise = null;
   console.log('🗑️ 詞表緩存已清空');
 }
 
@@ -169,12 +414,12 @@ export function clearCache() {
  * @returns {Promise<Array>} 標籤對象數組
  */
 export async function generateTagsFromJSON(wordlistCode) {
-  const wordlist = await loadWordlist(wordlistCode);
+  const wordlist = await loadWordlistIndex(wordlistCode);
   const tags = [];
   let tagIdCounter = 1;
   
   // 遍歷第二層級
-  for (const [level2Name, level3Data] of Object.entries(wordlist.hierarchy)) {
+  for (const { name: level2Name, level3: level3Names } of wordlist.level2) {
     // 創建第二層級標籤
     const level2Tag = {
       id: `tag_${tagIdCounter++}`,
@@ -188,7 +433,7 @@ export async function generateTagsFromJSON(wordlistCode) {
     tags.push(level2Tag);
     
     // 遍歷第三層級
-    for (const level3Name of Object.keys(level3Data)) {
+    for (const level3Name of level3Names) {
       // 跳過特殊鍵 "_all"（用於沒有第三層級的詞表）
       if (level3Name === '_all') continue;
       
@@ -0,0 +1,222 @@
+-- =====================================================
+-- 服務端批量導入詞表
+-- 創建日期：2026-10-17
+-- 目的：整個詞表作為一個 JSON 數組傳入，在一個事務內集合式完成
+--       詞表記錄、層級標籤和詞語的寫入（導入一個詞表只需一次請求）
+-- =====================================================
+
+BEGIN;
+
+-- ========================================
+-- 1. 創建批量導入函數
+-- ========================================
+
+-- p_wordlist：詞表記錄（name, code, type, description, hierarchy_config），按 code 創建或更新
+-- p_words：[[詞語, 第二層級, 第三層級], ...]，層級為空字符串或 null 表示沒有
+-- p_sync_groups：[[第二層級, 第三層級], ...]，這些分組中不在 p_words 裡的詞會被刪除；
+--                null 表示只新增不刪除
+CREATE OR REPLACE FUNCTION import_wordlist_bulk(
+  p_wordlist JSONB,
+  p_words JSONB,
+  p_sync_groups JSONB DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_wordlist_id UUID;
+  v_tags_created INT := 0;
+  v_count INT;
+  v_words_deleted INT := 0;
+  v_words_inserted INT := 0;
+  v_words_total INT;
+  v_words_distinct INT;
+  v_total_words INT;
+BEGIN
+  IF p_wordlist->>'code' IS NULL THEN
+    RAISE EXCEPTION 'p_wordlist 缺少 code';
+  END IF;
+
+  IF jsonb_typeof(p_words) IS DISTINCT FROM 'array' THEN
+    RAISE EXCEPTION 'p_words 必須是數組';
+  END IF;
+
+  -- 1. 詞表記錄（按 code 復用）
+  INSERT INTO wordlists (name, code, type, description, hierarchy_config)
+  VALUES (
+    p_wordlist->>'name',
+    p_wordlist->>'code',
+    COALESCE(p_wordlist->>'type', 'system'),
+    p_wordlist->>'description',
+    COALESCE(p_wordlist->'hierarchy_config', '{"level_2_label": null, "level_3_label": null}'::jsonb)
+  )
+  ON CONFLICT (code) DO UPDATE SET
+    name = EXCLUDED.name,
+    description = EXCLUDED.description,
+    hierarchy_config = EXCLUDED.hierarchy_config,
+    updated_at = NOW()
+  RETURNING id INTO v_wordlist_id;
+
+  -- 2. 解析輸入（沒有的層級存為空字符串，與 generate_import_sql.py 寫入的一致；
+  --    唯一約束中的 NULL 互不衝突，用空字符串兩邊才能互相去重）
+  DROP TABLE IF EXISTS _import_words;
+  CREATE TEMP TABLE _import_words ON COMMIT DROP AS
+  SELECT
+    ord,
+    btrim(item->>0) AS word,
+    COALESCE(btrim(item->>1), '') AS level_2_tag,
+    COALESCE(btrim(item->>2), '') AS level_3_tag
+  FROM jsonb_array_elements(p_words) WITH ORDINALITY AS t(item, ord)
+  WHERE NULLIF(btrim(item->>0), '') IS NOT NULL;
+
+  SELECT COUNT(*), COUNT(DISTINCT (word, level_2_tag, level_3_tag))
+  INTO v_words_total, v_words_distinct
+  FROM _import_words;
+
+  -- 3. 第二層級標籤（按名稱排序，已存在的保留原有排序）
+  INSERT INTO wordlist_tags (wordlist_id, tag_level, tag_code, tag_display_name, sort_order)
+  SELECT v_wordlist_id, 2, level_2_tag, level_2_tag,
+         (ROW_NUMBER() OVER (ORDER BY level_2_tag) - 1)::INT
+  FROM (SELECT DISTINCT level_2_tag FROM _import_words WHERE level_2_tag <> '') l2
+  ON CONFLICT (wordlist_id, tag_code) DO NOTHING;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  v_tags_created := v_tags_created + v_count;
+
+  -- 4. 第三層級標籤（父標籤為首次出現時所屬的第二層級）
+  INSERT INTO wordlist_tags (wordlist_id, tag_level, tag_code, tag_display_name, parent_tag_id, sort_order)
+  SELECT v_wordlist_id, 3, l3.level_3_tag, l3.level_3_tag, parent.id,
+         (ROW_NUMBER() OVER (ORDER BY l3.first_ord) - 1)::INT
+  FROM (
+    SELECT DISTINCT ON (level_3_tag) level_3_tag, level_2_tag, ord AS first_ord
+    FROM _import_words
+    WHERE level_3_tag <> ''
+    ORDER BY level_3_tag, ord
+  ) l3
+  LEFT JOIN wordlist_tags parent
+    ON parent.wordlist_id = v_wordlist_id
+   AND parent.tag_level = 2
+   AND parent.tag_code = l3.level_2_tag
+  ON CONFLICT (wordlist_id, tag_code) DO NOTHING;
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  v_tags_created := v_tags_created + v_count;
+
+  -- 5. 同步分組：刪除這些分組中已不在輸入裡的詞
+  IF p_sync_groups IS NOT NULL THEN
+    DELETE FROM wordlist_vocabulary wv
+    USING (
+      SELECT COALESCE(btrim(g->>0), '') AS level_2_tag, COALESCE(btrim(g->>1), '') AS level_3_tag
+      FROM jsonb_array_elements(p_sync_groups) AS g
+    ) sg
+    WHERE wv.wordlist_id = v_wordlist_id
+      AND COALESCE(wv.level_2_tag, '') = sg.level_2_tag
+      AND COALESCE(wv.level_3_tag, '') = sg.level_3_tag
+      AND NOT EXISTS (
+        SELECT 1 FROM _import_words iw
+        WHERE iw.word = wv.word
+          AND iw.level_2_tag = COALESCE(wv.level_2_tag, '')
+          AND iw.level_3_tag = COALESCE(wv.level_3_tag, '')
+      );
+
+    GET DIAGNOSTICS v_words_deleted = ROW_COUNT;
+  END IF;
+
+  -- 6. 詞語：舊數據中可能有層級為 NULL 的行，唯一約束擋不住，需要顯式排除
+  INSERT INTO wordlist_vocabulary (wordlist_id, word, level_2_tag, level_3_tag)
+  SELECT v_wordlist_id, iw.word, iw.level_2_tag, iw.level_3_tag
+  FROM (
+    SELECT DISTINCT word, level_2_tag, level_3_tag FROM _import_words
+  ) iw
+  WHERE NOT EXISTS (
+    SELECT 1 FROM wordlist_vocabulary wv
+    WHERE wv.wordlist_id = v_wordlist_id
+      AND wv.word = iw.word
+      AND COALESCE(wv.level_2_tag, '') = iw.level_2_tag
+      AND COALESCE(wv.level_3_tag, '') = iw.level_3_tag
+  )
+  ON CONFLICT (wordlist_id, word, level_2_tag, level_3_tag) DO NOTHING;
+
+  GET DIAGNOSTICS v_words_inserted = ROW_COUNT;
+
+  -- 7. 更新詞表統計
+  SELECT COUNT(*) INTO v_total_words FROM wordlist_vocabulary WHERE wordlist_id = v_wordlist_id;
+
+  UPDATE wordlists SET total_words = v_total_words, updated_at = NOW()
+  WHERE id = v_wordlist_id;
+
+  RETURN jsonb_build_object(
+    'wordlist_id', v_wordlist_id,
+    'tags_created', v_tags_created,
+    'words_received', v_words_total,
+    'words_inserted', v_words_inserted,
+    'words_existing', v_words_distinct - v_words_inserted,
+    'words_deleted', v_words_deleted,
+    'total_words', v_total_words
+  );
+END;
+$$ LANGUAGE plpgsql VOLATILE SECURITY INVOKER SET search_path = public;
+
+-- ========================================
+-- 2. 權限：只允許 service_role 調用
+-- ========================================
+
+REVOKE EXECUTE ON FUNCTION import_wordlist_bulk(JSONB, JSONB, JSONB) FROM PUBLIC;
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    REVOKE EXECUTE ON FUNCTION import_wordlist_bulk(JSONB, JSONB, JSONB) FROM anon;
+  END IF;
+  IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    REVOKE EXECUTE ON FUNCTION import_wordlist_bulk(JSONB, JSONB, JSONB) FROM authenticated;
+  END IF;
+  IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+    GRANT EXECUTE ON FUNCTION import_wordlist_bulk(JSONB, JSONB, JSONB) TO service_role;
+  END IF;
+END $$;
+
+-- ========================================
+-- 3. 添加函數註釋
+-- ========================================
+
+COMMENT ON FUNCTION import_wordlist_bulk IS '
+批量導入詞表：p_wordlist 為詞表記錄，p_words 為 [[詞語, 第二層級, 第三層級], ...]
+在一個事務內創建詞表、層級標籤並寫入 wordlist_vocabulary；重複調用是冪等的
+p_sync_groups 指定的分組會刪除輸入中沒有的詞（增量同步）
+由 admin/import_hsk_to_supabase.py --mode rpc 調用
+';
+
+-- ========================================
+-- 4. 完成信息
+-- ========================================
+
+DO $$
+BEGIN
+  RAISE NOTICE '';
+  RAISE NOTICE '========================================';
+  RAISE NOTICE '✅ 批量導入函數創建完成！';
+  RAISE NOTICE '========================================';
+  RAISE NOTICE '';
+  RAISE NOTICE '📋 新增函數：';
+  RAISE NOTICE '  - import_wordlist_bulk()（僅 service_role 可調用）';
+  RAISE NOTICE '';
+  RAISE NOTICE '🎯 使用方式：';
+  RAISE NOTICE '  python3 admin/import_hsk_to_supabase.py --mode rpc';
+  RAISE NOTICE '';
+END $$;
+
+COMMIT;
+
+-- =====================================================
+-- 說明
+-- =====================================================
+-- 本地測試（supabase start 之後，或任意已執行過之前遷移的 Postgres）：
+--
+--   psql "$DATABASE_URL" -f supabase/migrations/026_bulk_import_wordlist_rpc.sql
+--   psql "$DATABASE_URL" -c "SELECT import_wordlist_bulk(
+--     '{\"name\": \"測試詞表\", \"code\": \"test_bulk\", \"type\": \"system\"}',
+--     '[[\"學校\", \"HSK1級\", \"\"], [\"老師\", \"HSK1級\", null], [\"學校\", \"HSK1級\", \"\"]]'
+--   );"
+--
+-- 再次運行同一調用應返回 words_inserted = 0（冪等）。
+-- 也可以用導入腳本連接本地 Supabase：
+--   python3 admin/import_hsk_to_supabase.py --mode rpc --url http://127.0.0.1:54321